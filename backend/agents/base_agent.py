@@ -2,24 +2,46 @@
 Base agent class for all LangGraph agents
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
-from langchain_anthropic import ChatAnthropic
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple, Type, TypeVar, Union
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from pydantic import BaseModel, ValidationError
 from app.core.config import settings
 from app.core.logger import app_logger
+from app.core.metrics import token_usage
+from app.services.llm_cache import llm_cache
+from app.services.llm_clients import llm_clients
+from app.services.json_stream import IncrementalJSONParser, parse_json
+from app.services.llm_scheduler import estimate_tokens, llm_scheduler
+import asyncio
+
+StructuredModel = TypeVar("StructuredModel", bound=BaseModel)
+
+
+class AgentError(RuntimeError):
+    """An agent response that reports failure instead of usable content"""
+
+
+def require_success(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Return an agent response, raising AgentError unless its status is success"""
+    if response.get("status") != "success":
+        error = response.get("metadata", {}).get("error") or f"status {response.get('status')!r}"
+        raise AgentError(f"{response.get('agent', 'Agent')} failed: {error}")
+    return response
 
 
 class BaseAgent(ABC):
     """Base class for all agents in the system"""
 
-    def __init__(self, name: str, description: str):
+    def __init__(self, name: str, description: str, model: Optional[str] = None):
         self.name = name
         self.description = description
-        self.llm = ChatAnthropic(
-            model=settings.CLAUDE_MODEL,
-            anthropic_api_key=settings.ANTHROPIC_API_KEY,
-            max_tokens=settings.MAX_TOKENS,
-            temperature=0.7
-        )
+        self.model = model or settings.CLAUDE_MODEL
+        self.max_tokens = llm_clients.model_settings(self.model)["max_tokens"]
+        self.temperature = 0.7
+        # Shared with every other agent on the same model settings
+        self.llm = llm_clients.get(self.model, self.temperature, self.max_tokens)
+        self.usage = token_usage(name)
+        self._structured_llms: Dict[type, Any] = {}
         app_logger.info(f"Initialized agent: {name}")
 
     @abstractmethod
@@ -44,14 +66,286 @@ Context: {context}
 
 Please analyze the provided context and complete your assigned task."""
 
-    async def invoke_llm(self, prompt: str) -> str:
-        """Invoke the LLM with a prompt"""
+    @property
+    def system_prompt(self) -> str:
+        """Agent identity sent ahead of every instruction block"""
+        return f"You are {self.name}, a specialized AI agent.\nDescription: {self.description}"
+
+    def build_messages(
+        self,
+        prompt: str,
+        instructions: Optional[str] = None,
+        context: Optional[str] = None
+    ) -> Union[str, List[BaseMessage]]:
+        """
+        Build the model input for a call
+
+        Without instructions or context the prompt is sent as-is. With
+        instructions, the agent identity and the instructions form a system
+        message that ends in a cache breakpoint. Context is data shared by a
+        series of calls (e.g. a pinned document asked several questions); it
+        opens the user message as a second block ending in its own
+        breakpoint. The prompt (the per-call data) follows last. Neither
+        instructions nor context may contain per-call values, or the provider
+        cannot reuse the cached prefix. Prefixes shorter than the model's
+        minimum cacheable length are simply processed uncached.
+        """
+        if instructions is None and context is None:
+            return prompt
+
+        messages: List[BaseMessage] = []
+        if instructions is not None:
+            messages.append(SystemMessage(content=[self._cacheable_block(f"{self.system_prompt}\n\n{instructions}")]))
+        if context is None:
+            messages.append(HumanMessage(content=prompt))
+        else:
+            messages.append(HumanMessage(content=[self._cacheable_block(context), {"type": "text", "text": prompt}]))
+        return messages
+
+    @staticmethod
+    def _cacheable_block(text: str) -> Dict[str, Any]:
+        """A text content block ending in a cache breakpoint (when prompt caching is enabled)"""
+        block: Dict[str, Any] = {"type": "text", "text": text}
+        if settings.LLM_PROMPT_CACHING:
+            block["cache_control"] = {"type": "ephemeral"}
+        return block
+
+    @staticmethod
+    def _cache_payload(prompt: str, instructions: Optional[str], context: Optional[str]) -> Any:
+        """What a response cache key is computed over"""
+        if context is not None:
+            return [instructions, context, prompt]
+        return [instructions, prompt] if instructions else prompt
+
+    async def invoke_llm(
+        self,
+        prompt: str,
+        use_cache: bool = True,
+        instructions: Optional[str] = None,
+        context: Optional[str] = None
+    ) -> str:
+        """
+        Invoke the LLM with a prompt
+
+        Identical calls are served from the response cache unless
+        use_cache is False (e.g. for explicitly "fresh" analyses). Static
+        instructions and shared context passed separately are sent as
+        cacheable prefixes (see build_messages). Errors that outlast the scheduler's retries are logged and re-raised,
+        never returned as response text.
+        """
+        messages = self.build_messages(prompt, instructions, context)
+        cache_key = None
+        if use_cache and llm_cache.enabled:
+            cache_key = llm_cache.make_key(self.model, self.temperature, self.max_tokens, self._cache_payload(prompt, instructions, context))
+            cached = await llm_cache.get(cache_key)
+            if cached is not None:
+                app_logger.debug(f"LLM cache hit for {self.name}")
+                return cached
+
         try:
-            response = await self.llm.ainvoke(prompt)
+            # Queued behind the process-wide concurrency/rate budgets; transient errors are retried there
+            response = await llm_scheduler.run(
+                lambda: self.llm.ainvoke(messages),
+                tokens=estimate_tokens(messages),
+                usage=self._used_tokens
+            )
+            self._record_usage([response])
+            if cache_key:
+                await llm_cache.set(cache_key, response.content)
             return response.content
         except Exception as e:
             app_logger.error(f"Error invoking LLM for {self.name}: {e}")
-            return f"Error: {str(e)}"
+            raise
+
+    async def stream_llm(
+        self,
+        prompt: str,
+        use_cache: bool = True,
+        instructions: Optional[str] = None,
+        context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream the LLM completion for a prompt as text chunks
+
+        A cached completion is yielded as a single chunk; a streamed one is
+        cached once it finishes. Errors are logged and re-raised so callers
+        can report them out of band instead of mixing them into the text.
+        """
+        messages = self.build_messages(prompt, instructions, context)
+        cache_key = None
+        if use_cache and llm_cache.enabled:
+            cache_key = llm_cache.make_key(self.model, self.temperature, self.max_tokens, self._cache_payload(prompt, instructions, context))
+            cached = await llm_cache.get(cache_key)
+            if cached is not None:
+                app_logger.debug(f"LLM cache hit for {self.name}")
+                yield cached
+                return
+
+        parts = []
+        async for chunk in self._stream_chunks(self.llm, messages):
+            text = self._chunk_text(chunk.content)
+            if text:
+                parts.append(text)
+                yield text
+
+        if cache_key:
+            await llm_cache.set(cache_key, "".join(parts))
+
+    async def stream_structured(
+        self,
+        prompt: str,
+        schema: Type[StructuredModel],
+        use_cache: bool = True,
+        instructions: Optional[str] = None,
+        context: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a structured response as it is generated
+
+        The model is made to call a tool whose input schema is `schema`, and
+        the tool input is parsed as it streams in. Yields
+            {"type": "delta", "field": ..., "text": ...}   as top-level string fields grow
+            {"type": "field", "field": ..., "value": ...}  as each top-level field completes
+            {"type": "result", "value": <schema instance>} once, at the end
+
+        Output that fails validation goes through repair_json before giving
+        up with a ValueError; it is never re-requested. Only validated
+        results are cached.
+        """
+        messages = self.build_messages(prompt, instructions, context)
+        cache_key = None
+        cached = None
+        if use_cache and llm_cache.enabled:
+            payload = [schema.__name__, instructions, prompt] if context is None else [schema.__name__, instructions, context, prompt]
+            cache_key = llm_cache.make_key(self.model, self.temperature, self.max_tokens, payload)
+            cached = await llm_cache.get(cache_key)
+
+        parser = IncrementalJSONParser()
+        if cached is not None:
+            app_logger.debug(f"LLM cache hit for {self.name}")
+            for event in parser.feed(cached):
+                yield self._structured_event(event)
+        else:
+            async for chunk in self._stream_chunks(self._structured_llm(schema), messages):
+                for tool_chunk in getattr(chunk, "tool_call_chunks", None) or []:
+                    for event in parser.feed(tool_chunk.get("args") or ""):
+                        yield self._structured_event(event)
+
+        result = self.validate_structured(parser.text, schema)
+        if cache_key and cached is None:
+            await llm_cache.set(cache_key, result.model_dump_json())
+        yield {"type": "result", "value": result}
+
+    async def invoke_structured(
+        self,
+        prompt: str,
+        schema: Type[StructuredModel],
+        use_cache: bool = True,
+        instructions: Optional[str] = None,
+        context: Optional[str] = None
+    ) -> StructuredModel:
+        """Run a structured call to completion and return the validated model"""
+        result = None
+        async for event in self.stream_structured(prompt, schema, use_cache=use_cache, instructions=instructions, context=context):
+            if event["type"] == "result":
+                result = event["value"]
+        return result
+
+    @staticmethod
+    def validate_structured(text: str, schema: Type[StructuredModel]) -> StructuredModel:
+        """Validate tool input JSON against a schema, repairing malformed or truncated JSON once"""
+        try:
+            return schema.model_validate_json(text)
+        except ValidationError as e:
+            app_logger.warning(f"Repairing structured {schema.__name__} output: {e.error_count()} errors")
+        return schema.model_validate(parse_json(text))
+
+    def _structured_llm(self, schema: Type[BaseModel]):
+        """The shared client bound to a single forced tool for `schema`"""
+        if schema not in self._structured_llms:
+            tool = {
+                "name": schema.__name__,
+                "description": (schema.__doc__ or schema.__name__).strip(),
+                "input_schema": schema.model_json_schema()
+            }
+            self._structured_llms[schema] = self.llm.bind_tools([tool], tool_choice=schema.__name__)
+        return self._structured_llms[schema]
+
+    @staticmethod
+    def _structured_event(event: Tuple[str, str, Any]) -> Dict[str, Any]:
+        kind, field, value = event
+        if kind == "delta":
+            return {"type": "delta", "field": field, "text": value}
+        return {"type": "field", "field": field, "value": value}
+
+    async def _stream_chunks(self, llm: Any, messages: Union[str, List[BaseMessage]]) -> AsyncIterator[Any]:
+        """
+        Stream raw message chunks under the LLM scheduler, recording token usage
+
+        Failures are retried only before the first chunk has been yielded;
+        after that they are logged and re-raised.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            started = False
+            try:
+                async with llm_scheduler.slot(estimate_tokens(messages)) as slot:
+                    usage_chunks = []
+                    async for chunk in llm.astream(messages):
+                        if getattr(chunk, "usage_metadata", None):
+                            usage_chunks.append(chunk)
+                        started = True
+                        yield chunk
+                    slot["used_tokens"] = sum(self._used_tokens(chunk) or 0 for chunk in usage_chunks) or None
+                    self._record_usage(usage_chunks)
+                return
+            except Exception as e:
+                delay = None if started else llm_scheduler.note_failure(attempt, e)
+                if delay is None:
+                    app_logger.error(f"Error streaming LLM for {self.name}: {e}")
+                    raise
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _used_tokens(message: Any) -> Optional[int]:
+        """Input plus output tokens reported on a response or stream chunk"""
+        usage = getattr(message, "usage_metadata", None)
+        return usage.get("total_tokens") if usage else None
+
+    def _record_usage(self, messages: List[Any]):
+        """
+        Add a call's token usage to this agent's counters
+
+        Usage may be spread over several stream chunks. Input tokens are
+        split into uncached, cache reads and cache writes.
+        """
+        totals = {"input": 0, "output": 0, "cache_read": 0, "cache_creation": 0}
+        for message in messages:
+            usage = getattr(message, "usage_metadata", None)
+            if not usage:
+                continue
+            details = usage.get("input_token_details") or {}
+            cache_read = details.get("cache_read") or 0
+            cache_creation = details.get("cache_creation") or 0
+            totals["cache_read"] += cache_read
+            totals["cache_creation"] += cache_creation
+            # usage_metadata input_tokens already include the cached portions
+            totals["input"] += max(0, (usage.get("input_tokens") or 0) - cache_read - cache_creation)
+            totals["output"] += usage.get("output_tokens") or 0
+
+        if any(totals.values()):
+            self.usage.record(totals["input"], totals["output"], totals["cache_read"], totals["cache_creation"])
+
+    @staticmethod
+    def _chunk_text(content: Any) -> str:
+        """Extract text from a streamed message chunk (plain string or content blocks)"""
+        if isinstance(content, str):
+            return content
+        return "".join(
+            block.get("text", "") for block in content
+            if isinstance(block, dict) and block.get("type") in ("text", "text_delta")
+        )
 
     def format_response(self, content: str, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
         """Format agent response"""
@@ -6,6 +6,21 @@ from agents.base_agent import BaseAgent
 from app.core.logger import app_logger
 import json
 
+# Static instructions for analyze_competitor, sent as the cacheable system prefix
+ANALYSIS_INSTRUCTIONS = """You are a competitive intelligence analyst. Each request contains a competitor's information and the analysis type.
+
+Provide a comprehensive analysis including:
+1. Market Position & Strategy
+2. Strengths & Weaknesses (SWOT)
+3. Product/Service Portfolio
+4. Pricing Strategy
+5. Target Market & Customer Segments
+6. Recent Developments & News
+7. Threat Level Assessment
+8. Recommended Monitoring Areas
+
+Format your response as structured JSON with clear sections."""
+
 
 class CompetitiveIntelligenceAgent(BaseAgent):
     """
@@ -23,18 +38,20 @@ class CompetitiveIntelligenceAgent(BaseAgent):
         Execute competitive intelligence analysis
 
         Args:
-            task: Contains competitor_data, analysis_type
+            task: Contains competitor_data, analysis_type, and optional fresh
+                flag to bypass the LLM response cache
 
         Returns:
             Comprehensive competitive intelligence findings
         """
         competitor_data = task.get("competitor_data", {})
         analysis_type = task.get("analysis_type", "comprehensive")
+        use_cache = not task.get("fresh", False)
 
         app_logger.info(f"Analyzing competitor: {competitor_data.get('name', 'Unknown')}")
 
         # Perform analysis
-        analysis = await self.analyze_competitor(competitor_data, analysis_type)
+        analysis = await self.analyze_competitor(competitor_data, analysis_type, use_cache=use_cache)
 
         return self.format_response(
             content=analysis,
@@ -44,29 +61,19 @@ class CompetitiveIntelligenceAgent(BaseAgent):
             }
         )
 
-    async def analyze_competitor(self, competitor_data: Dict[str, Any], analysis_type: str) -> str:
+    async def analyze_competitor(self, competitor_data: Dict[str, Any], analysis_type: str, use_cache: bool = True) -> str:
         """Perform detailed competitor analysis"""
 
-        prompt = f"""You are a competitive intelligence analyst. Analyze the following competitor:
+        # The competitor information is a cacheable block of its own, shared by analyses of other types
+        context = f"""Analyze the following competitor:
 
 Competitor Information:
-{json.dumps(competitor_data, indent=2)}
-
-Analysis Type: {analysis_type}
+{json.dumps(competitor_data, indent=2, sort_keys=True)}"""
 
-Provide a comprehensive analysis including:
-1. Market Position & Strategy
-2. Strengths & Weaknesses (SWOT)
-3. Product/Service Portfolio
-4. Pricing Strategy
-5. Target Market & Customer Segments
-6. Recent Developments & News
-7. Threat Level Assessment
-8. Recommended Monitoring Areas
-
-Format your response as structured JSON with clear sections."""
-
-        analysis = await self.invoke_llm(prompt)
+        analysis = await self.invoke_llm(
+            f"Analysis Type: {analysis_type}", use_cache=use_cache,
+            instructions=ANALYSIS_INSTRUCTIONS, context=context
+        )
         return analysis
 
     async def identify_competitive_advantages(self, competitor_data: Dict[str, Any]) -> List[str]:
@@ -0,0 +1,243 @@
+"""
+Executable multi-agent plans
+
+An ExecutionPlan is a DAG of PlanNodes, each one call to an agent's
+execute(). A node's task is built from the workflow parameters and the
+outputs of the nodes it depends on, so results flow along the edges. Nodes
+start as soon as their own dependencies have finished (not stage by stage),
+with at most AGENT_MAX_CONCURRENCY running at once, and each is bounded by
+its own timeout (AGENT_TASK_TIMEOUT_SECONDS unless the node sets one). A
+node whose dependency failed is skipped instead of running on missing input;
+independent branches still complete.
+
+A node fails when its agent raises, times out or returns a response whose
+status is not "success"; failed outputs are never cached or passed on.
+
+Successful node outputs are stored in the LLM response cache under a hash of
+(agent, task). Re-running a workflow with unchanged inputs therefore reuses
+every unchanged step, including downstream steps whose upstream outputs came
+back the same, and a retried workflow job only re-runs the steps that did not
+finish. Runs with use_cache=False bypass the lookup.
+
+Every run returns a trace with each node's start offset, duration and
+outcome; durations of executed nodes also feed the plan_node_<agent>
+latency trackers.
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+from app.core.config import settings
+from app.core.logger import app_logger
+from app.core.metrics import latency_tracker
+from app.services.llm_cache import llm_cache
+import asyncio
+import hashlib
+import json
+import time
+
+# (workflow parameters, upstream outputs by node id) -> agent task
+TaskBuilder = Callable[[Dict[str, Any], Dict[str, Dict[str, Any]]], Dict[str, Any]]
+# (agent name, task) -> agent response
+NodeRunner = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+# Called with each node's trace entry as soon as the node settles
+NodeCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+SUCCEEDED = ("completed", "cached")
+
+
+class PlanNode:
+    """One agent step: which agent runs, on what task, after which steps"""
+
+    def __init__(
+        self,
+        node_id: str,
+        agent: str,
+        build_task: TaskBuilder,
+        depends_on: Sequence[str] = (),
+        timeout_seconds: Optional[float] = None
+    ):
+        self.id = node_id
+        self.agent = agent
+        self.build_task = build_task
+        self.depends_on = tuple(depends_on)
+        self.timeout_seconds = timeout_seconds
+
+
+def node_cache_key(agent: str, task: Dict[str, Any]) -> str:
+    """Content-addressed cache key for one node's output"""
+    payload = json.dumps([agent, task], sort_keys=True, ensure_ascii=False, default=str)
+    return "plan_node:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ExecutionPlan:
+    """A validated DAG of agent steps for one task type"""
+
+    def __init__(self, task_type: str, nodes: List[PlanNode], priority: str = "medium"):
+        self.task_type = task_type
+        self.priority = priority
+        self.nodes = self._topological_order(nodes)
+        depended_on = {dep for node in self.nodes for dep in node.depends_on}
+        self.outputs = [node.id for node in self.nodes if node.id not in depended_on]
+
+    @staticmethod
+    def _topological_order(nodes: List[PlanNode]) -> List[PlanNode]:
+        """Order nodes so every node follows its dependencies; rejects unknown ids and cycles"""
+        ids = [node.id for node in nodes]
+        if len(set(ids)) != len(ids):
+            raise ValueError(f"Duplicate node ids in plan: {ids}")
+
+        remaining = {node.id: set(node.depends_on) for node in nodes}
+        for node in nodes:
+            unknown = remaining[node.id] - set(ids)
+            if unknown:
+                raise ValueError(f"Plan node {node.id} depends on unknown node(s): {', '.join(sorted(unknown))}")
+
+        ordered = []
+        while remaining:
+            ready = [node for node in nodes if node.id in remaining and not remaining[node.id]]
+            if not ready:
+                raise ValueError(f"Plan has a dependency cycle among: {', '.join(sorted(remaining))}")
+            for node in ready:
+                ordered.append(node)
+                del remaining[node.id]
+            for deps in remaining.values():
+                deps.difference_update(node.id for node in ready)
+        return ordered
+
+    def stages(self) -> List[List[str]]:
+        """Node ids grouped by dependency depth; nodes within a stage can run concurrently"""
+        depth: Dict[str, int] = {}
+        for node in self.nodes:
+            depth[node.id] = 1 + max((depth[dep] for dep in node.depends_on), default=-1)
+
+        stages: List[List[str]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for node in self.nodes:
+            stages[depth[node.id]].append(node.id)
+        return stages
+
+    def describe(self) -> Dict[str, Any]:
+        """JSON-friendly view of the plan"""
+        return {
+            "task_type": self.task_type,
+            "priority": self.priority,
+            "nodes": [
+                {"id": node.id, "agent": node.agent, "depends_on": list(node.depends_on)}
+                for node in self.nodes
+            ],
+            "stages": self.stages(),
+            "outputs": self.outputs
+        }
+
+    async def run(
+        self,
+        parameters: Dict[str, Any],
+        runner: NodeRunner,
+        limit: int = settings.AGENT_MAX_CONCURRENCY,
+        timeout_seconds: float = settings.AGENT_TASK_TIMEOUT_SECONDS,
+        use_cache: bool = True,
+        on_node: Optional[NodeCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute the plan
+
+        Args:
+            parameters: Workflow parameters handed to every node's task builder
+            runner: Coroutine that runs one agent on one task
+            limit: Maximum number of nodes executing at once
+            timeout_seconds: Timeout for nodes that do not set their own
+            use_cache: Reuse cached outputs of identical earlier node runs
+            on_node: Optional coroutine called with each node's trace entry
+
+        Returns:
+            Overall status, outputs of every successful node, and the trace
+        """
+        gate = asyncio.Semaphore(max(1, limit))
+        started = time.perf_counter()
+        results: Dict[str, Dict[str, Any]] = {}
+        trace: Dict[str, Dict[str, Any]] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        def elapsed_ms(since: float) -> float:
+            return round((time.perf_counter() - since) * 1000, 1)
+
+        async def execute(node: PlanNode, entry: Dict[str, Any]):
+            inputs = {dep: results[dep] for dep in node.depends_on}
+            try:
+                task = node.build_task(parameters, inputs)
+            except Exception as e:
+                entry.update(status="failed", error=f"Could not build task: {e}")
+                return
+
+            key = node_cache_key(node.agent, task)
+            if use_cache and llm_cache.enabled:
+                cached = await llm_cache.get(key)
+                cached = json.loads(cached) if cached is not None else None
+                if cached is not None and cached.get("status") == "success":
+                    results[node.id] = cached
+                    entry.update(status="cached", started_ms=elapsed_ms(started), duration_ms=0.0)
+                    return
+
+            async with gate:
+                entry["started_ms"] = elapsed_ms(started)
+                node_started = time.perf_counter()
+                try:
+                    result = await asyncio.wait_for(
+                        runner(node.agent, task), timeout=node.timeout_seconds or timeout_seconds
+                    )
+                except asyncio.TimeoutError:
+                    entry.update(status="timeout", error=f"Timed out after {node.timeout_seconds or timeout_seconds}s")
+                except Exception as e:
+                    entry.update(status="failed", error=str(e) or type(e).__name__)
+                else:
+                    if result.get("status") == "success":
+                        results[node.id] = result
+                        entry["status"] = "completed"
+                    else:
+                        error = result.get("metadata", {}).get("error")
+                        entry.update(status="failed", error=error or f"Agent returned status {result.get('status')!r}")
+                finally:
+                    entry["duration_ms"] = elapsed_ms(node_started)
+                    latency_tracker(f"plan_node_{node.agent}").record(entry["duration_ms"])
+
+            if entry["status"] == "completed" and llm_cache.enabled:
+                await llm_cache.set(key, json.dumps(results[node.id], default=str))
+
+        async def run_node(node: PlanNode):
+            if node.depends_on:
+                await asyncio.wait([tasks[dep] for dep in node.depends_on])
+
+            entry: Dict[str, Any] = {"node": node.id, "agent": node.agent, "depends_on": list(node.depends_on)}
+            failed = [dep for dep in node.depends_on if dep not in results]
+            if failed:
+                entry.update(status="skipped", error=f"Upstream step(s) did not complete: {', '.join(failed)}")
+            else:
+                await execute(node, entry)
+
+            trace[node.id] = entry
+            if entry["status"] not in SUCCEEDED:
+                app_logger.warning(f"Plan {self.task_type}: step {node.id} {entry['status']}: {entry.get('error')}")
+            if on_node:
+                await on_node(entry)
+
+        # Nodes are in topological order, so every dependency's task exists before its dependents
+        for node in self.nodes:
+            tasks[node.id] = asyncio.create_task(run_node(node))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        succeeded = sum(1 for entry in trace.values() if entry["status"] in SUCCEEDED)
+        if succeeded == len(self.nodes):
+            status = "completed"
+        elif any(output in results for output in self.outputs):
+            status = "partial"
+        else:
+            status = "failed"
+
+        return {
+            "status": status,
+            "results": results,
+            "trace": [trace[node.id] for node in self.nodes],
+            "duration_ms": elapsed_ms(started)
+        }
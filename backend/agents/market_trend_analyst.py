@@ -4,8 +4,24 @@ Market Trend Analyst Agent - Identifies and analyzes market trends
 from typing import Dict, Any, List
 from agents.base_agent import BaseAgent
 from app.core.logger import app_logger
+from app.models.schemas import EmergingTrendList
 import json
 
+# Static instructions for analyze_trends, sent as the cacheable system prefix
+TREND_ANALYSIS_INSTRUCTIONS = """You are a market trend analyst. Each request names an industry and timeframe and includes sample data points; analyze them as a specialist in that industry.
+
+Analyze and provide:
+1. **Emerging Trends** - New trends gaining momentum
+2. **Growing Trends** - Established trends with acceleration
+3. **Declining Trends** - Trends losing relevance
+4. **Disruptive Forces** - Game-changing developments
+5. **Market Opportunities** - Areas for potential growth
+6. **Risk Factors** - Potential market challenges
+7. **Confidence Scores** - Rate each trend (0-100%)
+8. **Time-to-Impact** - When trends will materialize
+
+Format as comprehensive JSON report with clear sections."""
+
 
 class MarketTrendAnalystAgent(BaseAgent):
     """
@@ -23,7 +39,8 @@ class MarketTrendAnalystAgent(BaseAgent):
         Execute market trend analysis
 
         Args:
-            task: Contains industry, timeframe, data_sources
+            task: Contains industry, timeframe, data_sources, and optional
+                fresh flag to bypass the LLM response cache
 
         Returns:
             Market trend analysis and predictions
@@ -31,10 +48,11 @@ class MarketTrendAnalystAgent(BaseAgent):
         industry = task.get("industry", "technology")
         timeframe = task.get("timeframe", "6_months")
         data_points = task.get("data_points", [])
+        use_cache = not task.get("fresh", False)
 
         app_logger.info(f"Analyzing trends for industry: {industry}")
 
-        analysis = await self.analyze_trends(industry, timeframe, data_points)
+        analysis = await self.analyze_trends(industry, timeframe, data_points, use_cache=use_cache)
 
         return self.format_response(
             content=analysis,
@@ -45,30 +63,17 @@ class MarketTrendAnalystAgent(BaseAgent):
             }
         )
 
-    async def analyze_trends(self, industry: str, timeframe: str, data_points: List[Dict[str, Any]]) -> str:
+    async def analyze_trends(self, industry: str, timeframe: str, data_points: List[Dict[str, Any]], use_cache: bool = True) -> str:
         """Analyze market trends"""
 
-        prompt = f"""You are a market trend analyst specializing in {industry}.
-
+        prompt = f"""Industry: {industry}
 Timeframe: {timeframe}
 Data Points: {len(data_points)}
 
 Sample Data:
-{json.dumps(data_points[:5] if data_points else [], indent=2)}
+{json.dumps(data_points[:5] if data_points else [], indent=2)}"""
 
-Analyze and provide:
-1. **Emerging Trends** - New trends gaining momentum
-2. **Growing Trends** - Established trends with acceleration
-3. **Declining Trends** - Trends losing relevance
-4. **Disruptive Forces** - Game-changing developments
-5. **Market Opportunities** - Areas for potential growth
-6. **Risk Factors** - Potential market challenges
-7. **Confidence Scores** - Rate each trend (0-100%)
-8. **Time-to-Impact** - When trends will materialize
-
-Format as comprehensive JSON report with clear sections."""
-
-        analysis = await self.invoke_llm(prompt)
+        analysis = await self.invoke_llm(prompt, use_cache=use_cache, instructions=TREND_ANALYSIS_INSTRUCTIONS)
         return analysis
 
     async def identify_emerging_trends(self, market_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -77,23 +82,15 @@ Format as comprehensive JSON report with clear sections."""
         prompt = f"""Analyze this market data and identify emerging trends:
 {json.dumps(market_data, indent=2)}
 
-For each trend provide:
-- Trend name
-- Description
-- Evidence/signals
-- Confidence score
-- Potential impact
-- Keywords
-
-Return as JSON array."""
-
-        response = await self.invoke_llm(prompt)
+For each trend provide its name, description, evidence/signals, confidence score,
+potential impact and keywords."""
 
         try:
-            trends = json.loads(response)
-            return trends if isinstance(trends, list) else []
-        except:
-            return [{"raw_response": response}]
+            result = await self.invoke_structured(prompt, EmergingTrendList)
+        except Exception as e:
+            app_logger.error(f"Failed to identify emerging trends: {e}")
+            return []
+        return [trend.model_dump() for trend in result.trends]
 
     async def predict_trend_trajectory(self, trend_data: Dict[str, Any]) -> Dict[str, Any]:
         """Predict the future trajectory of a trend"""
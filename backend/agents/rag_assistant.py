@@ -1,10 +1,48 @@
 """
 RAG Query Assistant Agent - Conversational interface for research queries
 """
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 from agents.base_agent import BaseAgent
+from app.core.config import settings
 from app.core.logger import app_logger
+from app.core.metrics import latency_tracker
+from app.models.schemas import RAGAnswer
+from app.services.vector_store import build_where, vector_store
 import json
+import time
+
+# Rough characters-per-token ratio used to budget retrieved context
+CHARS_PER_TOKEN = 4
+
+# Source type reported for hits from each vector store collection
+SOURCE_TYPES = {
+    "competitors": "competitor",
+    "trends": "trend",
+    "findings": "finding",
+    "reports": "report"
+}
+
+NO_CONTEXT = "No matching documents were found in the knowledge base."
+NO_FURTHER_CONTEXT = "No further documents matched the query."
+
+# Static instructions, sent as the cacheable system prefix; per-query data follows in the user message
+ANSWER_INSTRUCTIONS = """You are a research assistant for competitive intelligence and market research.
+
+Each request contains a user query, the recent conversation history and numbered knowledge base context. Documents the user pinned, if any, come first in a separate block; their numbering continues in the query's context.
+
+Based on the query, provide:
+1. A comprehensive answer grounded in the knowledge base context, citing documents by their [number] (markdown allowed)
+2. Follow-up suggestions
+3. Related topics to explore
+
+If the context does not cover the query, say so instead of inventing facts or sources."""
+
+retrieval_tracker = latency_tracker("rag_retrieval")
+
+
+def _estimate_tokens(text: str) -> int:
+    """Cheap token estimate for prompt budgeting"""
+    return len(text) // CHARS_PER_TOKEN + 1
 
 
 class RAGQueryAssistantAgent(BaseAgent):
@@ -23,7 +61,8 @@ class RAGQueryAssistantAgent(BaseAgent):
         Execute RAG query
 
         Args:
-            task: Contains query, conversation_history, context_ids
+            task: Contains query, conversation_history, context_ids, and
+                optional fresh flag to bypass the LLM response cache
 
         Returns:
             Response with sources and suggested actions
@@ -31,111 +70,228 @@ class RAGQueryAssistantAgent(BaseAgent):
         query = task.get("query", "")
         conversation_history = task.get("conversation_history", [])
         context_ids = task.get("context_ids", [])
+        use_cache = not task.get("fresh", False)
 
         app_logger.info(f"Processing RAG query: {query[:100]}")
 
-        response = await self.process_query(query, conversation_history, context_ids)
+        response = await self.process_query(query, conversation_history, context_ids, use_cache=use_cache)
 
         return self.format_response(
             content=response["answer"],
             metadata={
                 "sources": response.get("sources", []),
                 "suggested_actions": response.get("suggested_actions", []),
-                "confidence": response.get("confidence", 0.8)
+                "confidence": response.get("confidence", 0.8),
+                "retrieval_ms": response.get("retrieval_ms")
             }
         )
 
-    async def process_query(self, query: str, history: List[Dict[str, Any]], context_ids: List[str]) -> Dict[str, Any]:
-        """Process a research query with RAG"""
+    async def process_query(self, query: str, history: List[Dict[str, Any]], context_ids: List[str], use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Process a research query with RAG
 
-        # In a real implementation, this would:
-        # 1. Embed the query
-        # 2. Search vector database
-        # 3. Retrieve relevant documents
-        # 4. Generate answer with sources
+        Retrieves knowledge base context for the query, answers from that
+        context only, and returns the retrieved documents as sources.
+        """
+        retrieval = await self.retrieve_context(query, context_ids)
+        prompt = self._query_prompt(query, history, retrieval)
 
-        prompt = f"""You are a research assistant for competitive intelligence and market research.
+        # LLM and validation errors propagate; callers decide how to degrade
+        answer = await self.invoke_structured(
+            prompt, RAGAnswer, use_cache=use_cache, instructions=ANSWER_INSTRUCTIONS,
+            context=self._pinned_block(retrieval)
+        )
+        response_data = answer.model_dump()
+        response_data["sources"] = retrieval["sources"]
+        response_data["retrieval_ms"] = retrieval["retrieval_ms"]
+        return response_data
 
-User Query: {query}
+    @staticmethod
+    def _query_prompt(query: str, history: List[Dict[str, Any]], retrieval: Dict[str, Any]) -> str:
+        """Per-query part of a research prompt"""
+        context = retrieval["context"] or (NO_FURTHER_CONTEXT if retrieval["pinned_context"] else NO_CONTEXT)
+        return f"""User Query: {query}
 
 Conversation History:
 {json.dumps(history[-3:] if history else [], indent=2)}
 
-Context IDs: {context_ids}
+Knowledge Base Context:
+{context}"""
 
-Based on the query, provide:
-1. A comprehensive answer
-2. Relevant sources (competitors, trends, reports)
-3. Follow-up suggestions
-4. Related topics to explore
-
-Since this is a demo, generate realistic responses based on typical competitive intelligence scenarios.
-
-Format response as JSON:
-{{
-    "answer": "Detailed answer to the query...",
-    "sources": [
-        {{
-            "type": "competitor/trend/report",
-            "id": "source_id",
-            "title": "Source title",
-            "relevance": 0.95,
-            "excerpt": "Relevant excerpt..."
-        }}
-    ],
-    "suggested_actions": [
-        "Action 1",
-        "Action 2"
-    ],
-    "related_topics": [
-        "Topic 1",
-        "Topic 2"
-    ],
-    "confidence": 0.9
-}}"""
-
-        response_text = await self.invoke_llm(prompt)
+    @staticmethod
+    def _pinned_block(retrieval: Dict[str, Any]) -> Optional[str]:
+        """
+        Pinned documents, sent as their own cacheable block ahead of the query
 
-        try:
-            # Clean up response text - remove markdown code blocks if present
-            cleaned_text = response_text.strip()
-            if cleaned_text.startswith('```json'):
-                cleaned_text = cleaned_text[7:]  # Remove ```json
-            elif cleaned_text.startswith('```'):
-                cleaned_text = cleaned_text[3:]  # Remove ```
-
-            if cleaned_text.endswith('```'):
-                cleaned_text = cleaned_text[:-3]  # Remove trailing ```
-
-            cleaned_text = cleaned_text.strip()
-
-            response_data = json.loads(cleaned_text)
-            return response_data
-        except Exception as e:
-            app_logger.error(f"Failed to parse JSON response: {e}")
-            app_logger.debug(f"Raw response: {response_text[:500]}")
-            return {
-                "answer": response_text,
-                "sources": [],
-                "suggested_actions": [],
-                "confidence": 0.7
-            }
+        Questions about the same pinned documents (e.g. the automated
+        competitor analysis) share this block, so it is cached once and read
+        by the rest.
+        """
+        if not retrieval["pinned_context"]:
+            return None
+        return f"Pinned Documents:\n{retrieval['pinned_context']}"
+
+    async def retrieve_context(
+        self,
+        query: str,
+        context_ids: Optional[List[str]] = None,
+        top_k: Optional[int] = None,
+        token_budget: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Retrieve and pack knowledge base context for a query
+
+        Documents pinned through context_ids come first, then the top-k
+        search hits (chunks, for findings and reports) in order of relevance. Documents are packed into the
+        prompt until the token budget is spent; ones that don't fit are
+        skipped, except that the first is truncated rather than dropped.
+        Pinned and searched documents share one numbering but are returned
+        as separate texts, since only the pinned ones are the same across
+        queries.
+
+        Returns:
+            {"pinned_context": numbered pinned documents, "context": numbered
+            search hits, "sources": [...], "retrieval_ms": float}
+        """
+        top_k = top_k or settings.RAG_TOP_K
+        token_budget = token_budget or settings.RAG_CONTEXT_TOKEN_BUDGET
+
+        started = time.perf_counter()
+        pinned = [self._to_document(result) for result in await vector_store.get_documents(context_ids or [])]
+        hits = await self.search_knowledge_base(query, {"n_results": top_k})
+        retrieval_ms = (time.perf_counter() - started) * 1000
+        retrieval_tracker.record(retrieval_ms)
+
+        blocks = []
+        pinned_blocks = 0
+        sources = []
+        used_tokens = 0
+        seen = set()
+        cited = set()
+
+        for index, doc in enumerate(pinned + hits):
+            if doc["id"] in seen:
+                continue
+            seen.add(doc["id"])
+
+            source_type = SOURCE_TYPES.get(doc["collection"], doc["collection"])
+            title = doc["metadata"].get("title") or doc["metadata"].get("name") or doc["id"]
+            block = f"[{len(blocks) + 1}] {source_type}: {title}\n{doc['content']}"
+
+            cost = _estimate_tokens(block)
+            if used_tokens + cost > token_budget:
+                if blocks:
+                    continue
+                block = block[:token_budget * CHARS_PER_TOKEN]
+                cost = token_budget
+
+            blocks.append(block)
+            used_tokens += cost
+            if index < len(pinned):
+                pinned_blocks += 1
+
+            # Several chunks of one report or finding share a single source entry
+            source_id = doc["metadata"].get("parent_id") or doc["metadata"].get("id", doc["id"])
+            if (source_type, source_id) in cited:
+                continue
+            cited.add((source_type, source_id))
+            sources.append({
+                "type": source_type,
+                "id": source_id,
+                "title": title,
+                "relevance": round(doc["score"], 3),
+                "excerpt": doc["content"][:200]
+            })
+
+        app_logger.info(
+            f"Retrieved {len(sources)} documents (~{used_tokens} tokens) in {retrieval_ms:.1f} ms"
+        )
+
+        return {
+            "pinned_context": "\n\n".join(blocks[:pinned_blocks]),
+            "context": "\n\n".join(blocks[pinned_blocks:]),
+            "sources": sources,
+            "retrieval_ms": round(retrieval_ms, 1)
+        }
+
+    async def stream_query(
+        self,
+        query: str,
+        history: List[Dict[str, Any]],
+        context_ids: List[str],
+        use_cache: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a research query answer
+
+        Yields {"type": "token", "text": ...} events as the answer arrives,
+        then one {"type": "metadata", ...} event with the full answer,
+        retrieved sources, suggested actions, confidence and retrieval time.
+        """
+        retrieval = await self.retrieve_context(query, context_ids)
+        prompt = self._query_prompt(query, history, retrieval)
+
+        answer = None
+        async for event in self.stream_structured(
+            prompt, RAGAnswer, use_cache=use_cache, instructions=ANSWER_INSTRUCTIONS,
+            context=self._pinned_block(retrieval)
+        ):
+            if event["type"] == "delta" and event["field"] == "answer":
+                yield {"type": "token", "text": event["text"]}
+            elif event["type"] == "result":
+                answer = event["value"]
+
+        yield {
+            "type": "metadata",
+            "answer": answer.answer.strip(),
+            "sources": retrieval["sources"],
+            "suggested_actions": answer.suggested_actions,
+            "related_topics": answer.related_topics,
+            "confidence": answer.confidence,
+            "retrieval_ms": retrieval["retrieval_ms"]
+        }
 
     async def search_knowledge_base(self, query: str, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Search the knowledge base for relevant information"""
+        """
+        Search the knowledge base for relevant information
+
+        Args:
+            query: Natural language query
+            filters: Optional "collection" (competitors/trends/findings/reports,
+                default all), "n_results" (default RAG_TOP_K), "mode"
+                (vector/keyword/hybrid, default RAG_SEARCH_MODE), and metadata
+                conditions "industry", "competitor_id", "created_after" and
+                "created_before" applied inside the vector store
 
-        # This would integrate with Chroma vector database
+        Returns:
+            Documents with id, collection, content, metadata and score
+        """
+        filters = dict(filters or {})
         app_logger.info(f"Searching knowledge base: {query}")
 
-        # Mock search results for demo
-        return [
-            {
-                "id": "doc_1",
-                "content": "Sample relevant content...",
-                "metadata": {"source": "competitor_analysis", "date": "2024-01-15"},
-                "score": 0.92
-            }
-        ]
+        collection_name = filters.pop("collection", "all")
+        n_results = filters.pop("n_results", settings.RAG_TOP_K)
+        mode = filters.pop("mode", settings.RAG_SEARCH_MODE)
+
+        results = await vector_store.search(
+            query,
+            collection_name=collection_name,
+            n_results=n_results,
+            where=build_where(**filters),
+            mode=mode
+        )
+        return [self._to_document(result) for result in results]
+
+    @staticmethod
+    def _to_document(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape a vector store result as a knowledge base document"""
+        return {
+            "id": result["id"],
+            "collection": result["collection"],
+            "content": result.get("document") or "",
+            "metadata": result.get("metadata") or {},
+            "score": result.get("score", 0.0)
+        }
 
     async def generate_contextual_response(self, query: str, retrieved_docs: List[Dict[str, Any]]) -> str:
         """Generate response based on retrieved documents"""
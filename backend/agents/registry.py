@@ -0,0 +1,19 @@
+"""
+Process-wide agent instances
+
+Agents hold no per-request state, so each class is constructed once and
+shared by every endpoint that needs it.
+"""
+from typing import Dict, Type, TypeVar
+from agents.base_agent import BaseAgent
+
+AgentType = TypeVar("AgentType", bound=BaseAgent)
+
+_agents: Dict[type, BaseAgent] = {}
+
+
+def get_agent(agent_class: Type[AgentType]) -> AgentType:
+    """Get (or create) the shared instance of an agent class"""
+    if agent_class not in _agents:
+        _agents[agent_class] = agent_class()
+    return _agents[agent_class]
@@ -4,6 +4,7 @@ Social Listening Agent - Monitors and analyzes social media mentions
 from typing import Dict, Any, List
 from agents.base_agent import BaseAgent
 from app.core.logger import app_logger
+from app.models.schemas import InfluencerList
 import json
 
 
@@ -121,24 +122,15 @@ Format as JSON."""
         prompt = f"""Analyze these social mentions and identify key influencers:
 {json.dumps(mentions[:10], indent=2)}
 
-For each influencer provide:
-- Name/handle
-- Platform
-- Follower count (estimated)
-- Engagement rate
-- Influence score (0-100)
-- Content focus
-- Recommendation for engagement
-
-Return as JSON array."""
-
-        response = await self.invoke_llm(prompt)
+For each influencer provide their name/handle, platform, estimated follower count,
+engagement rate, influence score (0-100), content focus and a recommendation for engagement."""
 
         try:
-            influencers = json.loads(response)
-            return influencers if isinstance(influencers, list) else []
-        except:
-            return [{"raw_response": response}]
+            result = await self.invoke_structured(prompt, InfluencerList)
+        except Exception as e:
+            app_logger.error(f"Failed to identify influencers: {e}")
+            return []
+        return [influencer.model_dump() for influencer in result.influencers]
 
     async def track_viral_content(self, competitor_id: str) -> Dict[str, Any]:
         """Track viral content related to competitors"""
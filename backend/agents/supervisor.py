@@ -1,11 +1,133 @@
 """
 Supervisor Agent - Coordinates all operations and delegates tasks
+
+Each task type maps to an ExecutionPlan (see agents/execution_plan.py): a
+DAG of agent steps whose tasks are built from the request parameters and
+the outputs of upstream steps. Steps without a dependency between them, such
+as competitor, trend and social analysis in a comprehensive report, run
+concurrently; the synthesis step starts once all of its inputs are in.
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from agents.base_agent import BaseAgent
+from agents.competitive_intelligence import CompetitiveIntelligenceAgent
+from agents.content_analyzer import ContentAnalyzerAgent
+from agents.execution_plan import ExecutionPlan, NodeCallback, PlanNode
+from agents.market_trend_analyst import MarketTrendAnalystAgent
+from agents.rag_assistant import RAGQueryAssistantAgent
+from agents.registry import get_agent
+from agents.social_listening import SocialListeningAgent
+from agents.synthesis_reporting import SynthesisReportingAgent
 from app.core.logger import app_logger
 import json
 
+AGENT_CLASSES = {
+    "competitive_intelligence": CompetitiveIntelligenceAgent,
+    "market_trend_analyst": MarketTrendAnalystAgent,
+    "social_listening": SocialListeningAgent,
+    "content_analyzer": ContentAnalyzerAgent,
+    "synthesis_reporting": SynthesisReportingAgent,
+    "rag_query_assistant": RAGQueryAssistantAgent
+}
+
+
+def _sources(inputs: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Upstream step outputs as data sources for a synthesis step"""
+    return [
+        {"step": step, "agent": output.get("agent"), "content": output.get("content"), "metadata": output.get("metadata", {})}
+        for step, output in inputs.items()
+    ]
+
+
+def _competitor_task(params: Dict[str, Any], inputs: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "competitor_data": params.get("competitor_data", {}),
+        "analysis_type": params.get("analysis_type", "comprehensive"),
+        "fresh": params.get("fresh", False)
+    }
+
+
+def _trend_task(params: Dict[str, Any], inputs: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "industry": params.get("industry", "technology"),
+        "timeframe": params.get("timeframe", "6_months"),
+        "data_points": params.get("data_points", []),
+        "fresh": params.get("fresh", False)
+    }
+
+
+def _social_task(params: Dict[str, Any], inputs: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "keywords": params.get("keywords", []),
+        "platforms": params.get("platforms", ["twitter", "linkedin", "reddit"]),
+        "timeframe": params.get("social_timeframe", params.get("timeframe", "7_days"))
+    }
+
+
+def _content_task(source: str, focus_areas: List[str]):
+    """Content analysis of an upstream step's output"""
+    def build(params: Dict[str, Any], inputs: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "content": inputs[source]["content"],
+            "analysis_type": params.get("analysis_type", "comprehensive"),
+            "focus_areas": params.get("focus_areas", focus_areas)
+        }
+    return build
+
+
+def _report_task(report_type: str):
+    """Synthesis report over every upstream step's output"""
+    def build(params: Dict[str, Any], inputs: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "report_type": params.get("report_type", report_type),
+            "data_sources": _sources(inputs),
+            "format": params.get("format", "markdown")
+        }
+    return build
+
+
+def _query_task(params: Dict[str, Any], inputs: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "query": params.get("query", ""),
+        "conversation_history": params.get("conversation_history", []),
+        "context_ids": params.get("context_ids", []),
+        "fresh": params.get("fresh", False)
+    }
+
+
+PLANS = {
+    "competitor_analysis": ExecutionPlan("competitor_analysis", [
+        PlanNode("gather_data", "competitive_intelligence", _competitor_task),
+        PlanNode("analyze_content", "content_analyzer", _content_task("gather_data", []), depends_on=["gather_data"]),
+        PlanNode("generate_report", "synthesis_reporting", _report_task("competitor_analysis"), depends_on=["gather_data", "analyze_content"])
+    ], priority="high"),
+    "trend_discovery": ExecutionPlan("trend_discovery", [
+        PlanNode("identify_trends", "market_trend_analyst", _trend_task),
+        PlanNode("validate_social", "social_listening", _social_task),
+        PlanNode("compile_findings", "synthesis_reporting", _report_task("trend_discovery"), depends_on=["identify_trends", "validate_social"])
+    ], priority="medium"),
+    "research_query": ExecutionPlan("research_query", [
+        # Retrieval and generation happen inside the RAG agent
+        PlanNode("answer_query", "rag_query_assistant", _query_task)
+    ], priority="high"),
+    "comprehensive_report": ExecutionPlan("comprehensive_report", [
+        PlanNode("gather_competitor_data", "competitive_intelligence", _competitor_task),
+        PlanNode("analyze_trends", "market_trend_analyst", _trend_task),
+        PlanNode("monitor_social", "social_listening", _social_task),
+        PlanNode(
+            "synthesize_report", "synthesis_reporting", _report_task("comprehensive"),
+            depends_on=["gather_competitor_data", "analyze_trends", "monitor_social"]
+        )
+    ], priority="high"),
+    "social_monitoring": ExecutionPlan("social_monitoring", [
+        PlanNode("monitor_social", "social_listening", _social_task),
+        PlanNode("analyze_sentiment", "content_analyzer", _content_task("monitor_social", ["sentiment"]), depends_on=["monitor_social"])
+    ], priority="medium")
+}
+
+DEFAULT_PLAN = ExecutionPlan("default", [
+    PlanNode("default_analysis", "competitive_intelligence", _competitor_task)
+], priority="low")
+
 
 class SupervisorAgent(BaseAgent):
     """
@@ -17,84 +139,58 @@ class SupervisorAgent(BaseAgent):
             name="Supervisor Agent",
             description="Coordinates multi-agent operations, delegates tasks to specialized agents, and synthesizes results"
         )
-        self.available_agents = [
-            "competitive_intelligence",
-            "market_trend_analyst",
-            "social_listening",
-            "content_analyzer",
-            "synthesis_reporting",
-            "rag_query_assistant"
-        ]
-
-    async def execute(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        self.available_agents = list(AGENT_CLASSES)
+
+    async def execute(self, task: Dict[str, Any], on_node: Optional[NodeCallback] = None) -> Dict[str, Any]:
         """
         Execute supervisor coordination
 
         Args:
             task: Contains task_type, parameters, and priority
+            on_node: Optional coroutine called with each step's trace entry
 
         Returns:
-            Coordination plan and delegated tasks
+            Output of the plan's final step(s), with every step's output and
+            the execution trace in the metadata
         """
         task_type = task.get("task_type", "unknown")
+        parameters = task.get("parameters", {})
         app_logger.info(f"Supervisor processing task: {task_type}")
 
-        # Analyze task and create execution plan
         plan = await self.create_execution_plan(task)
-
-        return self.format_response(
-            content=json.dumps(plan, indent=2),
-            metadata={"plan": plan, "task_type": task_type}
+        run = await plan.run(
+            parameters,
+            self.delegate_task,
+            use_cache=not parameters.get("fresh", False),
+            on_node=on_node
         )
+        app_logger.info(f"Supervisor finished {task_type} ({run['status']}) in {run['duration_ms']}ms")
 
-    async def create_execution_plan(self, task: Dict[str, Any]) -> Dict[str, Any]:
-        """Create an execution plan based on task type"""
-        task_type = task.get("task_type")
-
-        plans = {
-            "competitor_analysis": {
-                "agents": ["competitive_intelligence", "content_analyzer", "synthesis_reporting"],
-                "sequence": ["gather_data", "analyze_content", "generate_report"],
-                "priority": "high"
-            },
-            "trend_discovery": {
-                "agents": ["market_trend_analyst", "social_listening", "synthesis_reporting"],
-                "sequence": ["identify_trends", "validate_social", "compile_findings"],
-                "priority": "medium"
-            },
-            "research_query": {
-                "agents": ["rag_query_assistant"],
-                "sequence": ["search_knowledge_base", "generate_response"],
-                "priority": "high"
-            },
-            "comprehensive_report": {
-                "agents": ["competitive_intelligence", "market_trend_analyst", "social_listening", "synthesis_reporting"],
-                "sequence": ["gather_all_data", "analyze_trends", "synthesize_report"],
-                "priority": "high"
-            },
-            "social_monitoring": {
-                "agents": ["social_listening", "content_analyzer"],
-                "sequence": ["monitor_social", "analyze_sentiment"],
-                "priority": "medium"
+        outputs = [run["results"][node_id]["content"] for node_id in plan.outputs if node_id in run["results"]]
+        return self.format_response(
+            content="\n\n".join(outputs),
+            metadata={
+                "task_type": task_type,
+                "plan": plan.describe(),
+                "status": run["status"],
+                "results": run["results"],
+                "trace": run["trace"],
+                "duration_ms": run["duration_ms"]
             }
-        }
+        )
 
-        return plans.get(task_type, {
-            "agents": ["competitive_intelligence"],
-            "sequence": ["default_analysis"],
-            "priority": "low"
-        })
+    async def create_execution_plan(self, task: Dict[str, Any]) -> ExecutionPlan:
+        """Select the execution plan for the task type"""
+        return PLANS.get(task.get("task_type"), DEFAULT_PLAN)
 
     async def delegate_task(self, agent_name: str, task_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Delegate a specific task to an agent"""
-        app_logger.info(f"Delegating task to {agent_name}")
+        """Run a task on the named specialized agent"""
+        agent_class = AGENT_CLASSES.get(agent_name)
+        if agent_class is None:
+            raise ValueError(f"Unknown agent: {agent_name}")
 
-        return {
-            "agent": agent_name,
-            "task": task_data,
-            "status": "delegated",
-            "timestamp": "now"
-        }
+        app_logger.info(f"Delegating task to {agent_name}")
+        return await get_agent(agent_class).execute(task_data)
 
     async def synthesize_results(self, agent_results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Synthesize results from multiple agents"""
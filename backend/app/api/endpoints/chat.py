@@ -1,18 +1,29 @@
 """
 Chat API endpoints for RAG-powered conversations
 """
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Optional
 from app.models.schemas import ChatRequest, ChatResponse, ChatMessage
+from app.api.pagination import cursor_param, select_columns, set_next_cursor
 from database.supabase_client import supabase_client
 from agents.rag_assistant import RAGQueryAssistantAgent
+from agents.registry import get_agent
 from app.core.logger import app_logger
+from app.core.metrics import latency_tracker
+from app.services.llm_scheduler import PRIORITY_INTERACTIVE, set_llm_priority
 from datetime import datetime
+import time
 import uuid
 import json
 
 router = APIRouter()
-rag_agent = RAGQueryAssistantAgent()
+rag_agent = get_agent(RAGQueryAssistantAgent)
+ttft_tracker = latency_tracker("chat_time_to_first_token")
+
+CONVERSATION_COLUMNS = {
+    "id", "user_id", "title", "messages", "context_ids", "created_at", "updated_at"
+}
 
 
 @router.options("/")
@@ -22,20 +33,116 @@ async def chat_options():
     return {}
 
 
+async def load_history(conversation_id: Optional[str]) -> List[Dict[str, Any]]:
+    """Load the stored messages of an existing conversation"""
+    if not conversation_id:
+        return []
+
+    conversations = await supabase_client.get_conversations("default_user")
+    conversation = next((c for c in conversations if c["id"] == conversation_id), None)
+    history = conversation.get("messages", []) if conversation else []
+    return json.loads(history) if isinstance(history, str) else history
+
+
+async def save_exchange(
+    request: ChatRequest,
+    conversation_id: str,
+    history: List[Dict[str, Any]],
+    answer: str
+):
+    """Append the user message and assistant answer to the conversation"""
+    user_message = {
+        "role": "user",
+        "content": request.message,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+    assistant_message = {
+        "role": "assistant",
+        "content": answer,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+    updated_history = history + [user_message, assistant_message]
+
+    # Save/update conversation
+    if request.conversation_id:
+        await supabase_client.update_conversation(
+            conversation_id,
+            {
+                "messages": json.dumps(updated_history),
+                "updated_at": datetime.utcnow().isoformat()
+            }
+        )
+    else:
+        await supabase_client.create_conversation({
+            "id": conversation_id,
+            "user_id": "default_user",
+            "title": request.message[:100],
+            "messages": json.dumps(updated_history),
+            "context_ids": request.context_ids,
+            "created_at": datetime.utcnow().isoformat(),
+            "updated_at": datetime.utcnow().isoformat()
+        })
+
+
+async def stream_chat_events(request: ChatRequest) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run a chat turn as a stream of events
+
+    Yields "start", then "token" events as the answer arrives, then a
+    trailing "done" event with sources and suggested actions once the
+    conversation has been saved. Failures are reported as an "error" event.
+    """
+    set_llm_priority(PRIORITY_INTERACTIVE)
+    started = time.perf_counter()
+    conversation_id = request.conversation_id or str(uuid.uuid4())
+    first_token_ms = None
+
+    yield {"type": "start", "data": {"conversation_id": conversation_id}}
+
+    try:
+        history = await load_history(request.conversation_id)
+        metadata: Dict[str, Any] = {}
+
+        async for event in rag_agent.stream_query(request.message, history, request.context_ids):
+            if event["type"] == "token":
+                if first_token_ms is None:
+                    first_token_ms = (time.perf_counter() - started) * 1000
+                    ttft_tracker.record(first_token_ms)
+                yield {"type": "token", "data": {"text": event["text"]}}
+            else:
+                metadata = event
+
+        await save_exchange(request, conversation_id, history, metadata.get("answer", ""))
+
+        yield {
+            "type": "done",
+            "data": {
+                "conversation_id": conversation_id,
+                "message": metadata.get("answer", ""),
+                "sources": metadata.get("sources", []),
+                "suggested_actions": metadata.get("suggested_actions", []),
+                "retrieval_ms": metadata.get("retrieval_ms"),
+                "time_to_first_token_ms": round(first_token_ms, 1) if first_token_ms is not None else None,
+                "total_ms": round((time.perf_counter() - started) * 1000, 1)
+            }
+        }
+    except Exception as e:
+        app_logger.error(f"Error streaming chat message: {e}")
+        yield {"type": "error", "data": {"conversation_id": conversation_id, "message": str(e)}}
+
+
 @router.post("/", response_model=ChatResponse)
 @router.post("", response_model=ChatResponse)
 async def send_message(request: ChatRequest):
     """Send a chat message and get AI response"""
+    set_llm_priority(PRIORITY_INTERACTIVE)
     try:
         conversation_id = request.conversation_id or str(uuid.uuid4())
 
         # Get conversation history
-        if request.conversation_id:
-            conversations = await supabase_client.get_conversations("default_user")
-            conversation = next((c for c in conversations if c["id"] == conversation_id), None)
-            history = conversation.get("messages", []) if conversation else []
-        else:
-            history = []
+        history = await load_history(request.conversation_id)
 
         # Process query with RAG agent
         response = await rag_agent.execute({
@@ -44,40 +151,7 @@ async def send_message(request: ChatRequest):
             "context_ids": request.context_ids
         })
 
-        # Prepare messages
-        user_message = {
-            "role": "user",
-            "content": request.message,
-            "timestamp": datetime.utcnow().isoformat()
-        }
-
-        assistant_message = {
-            "role": "assistant",
-            "content": response["content"],
-            "timestamp": datetime.utcnow().isoformat()
-        }
-
-        updated_history = history + [user_message, assistant_message]
-
-        # Save/update conversation
-        if request.conversation_id:
-            await supabase_client.update_conversation(
-                conversation_id,
-                {
-                    "messages": json.dumps(updated_history),
-                    "updated_at": datetime.utcnow().isoformat()
-                }
-            )
-        else:
-            await supabase_client.create_conversation({
-                "id": conversation_id,
-                "user_id": "default_user",
-                "title": request.message[:100],
-                "messages": json.dumps(updated_history),
-                "context_ids": request.context_ids,
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat()
-            })
+        await save_exchange(request, conversation_id, history, response["content"])
 
         return ChatResponse(
             message=response["content"],
@@ -90,12 +164,37 @@ async def send_message(request: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/stream")
+async def stream_message(request: ChatRequest):
+    """Send a chat message and stream the AI response as Server-Sent Events"""
+
+    async def event_source():
+        async for event in stream_chat_events(request):
+            yield f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/conversations")
-async def get_conversations(user_id: str = "default_user", limit: int = 20):
-    """Get user's conversation history"""
+async def get_conversations(
+    response: Response,
+    user_id: str = "default_user",
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Depends(cursor_param),
+    fields: Optional[str] = None
+):
+    """Get user's conversation history (most recent first, cursor paginated via X-Next-Cursor)"""
+    columns = select_columns(fields, CONVERSATION_COLUMNS)
     try:
-        conversations = await supabase_client.get_conversations(user_id)
-        return conversations[:limit]
+        conversations = await supabase_client.get_conversations(
+            user_id, limit=limit, cursor=cursor, columns=columns
+        )
+        set_next_cursor(response, conversations, limit, order_column="updated_at")
+        return conversations
     except Exception as e:
         app_logger.error(f"Error fetching conversations: {e}")
         raise HTTPException(status_code=500, detail=str(e))
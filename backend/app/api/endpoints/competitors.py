@@ -1,32 +1,53 @@
 """
 Competitors API endpoints
 """
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import Any, Dict, List, Optional
 from app.models.schemas import (
     CompetitorCreate,
     CompetitorUpdate,
     CompetitorResponse,
-    CompetitorStatus
+    CompetitorStatus,
+    CompetitorBatchRequest,
+    JobAccepted
 )
-from database.supabase_client import supabase_client
+from app.api.endpoints.jobs import enqueue_job
+from app.api.pagination import cursor_param, select_columns, set_next_cursor
+from database.supabase_client import next_cursor, supabase_client
 from agents.competitive_intelligence import CompetitiveIntelligenceAgent
+from agents.base_agent import require_success
+from agents.rag_assistant import RAGQueryAssistantAgent
+from agents.registry import get_agent
+from app.core.config import settings
+from app.core.concurrency import gather_bounded
 from app.core.logger import app_logger
+from app.services.competitor_batch import JOB_TYPE as BATCH_JOB_TYPE
+from app.services.jobs import JobContext, job_workers
 from integrations.email_integration import email_integration
 from datetime import datetime
+import asyncio
 import uuid
 
 router = APIRouter()
-ci_agent = CompetitiveIntelligenceAgent()
+ci_agent = get_agent(CompetitiveIntelligenceAgent)
+rag_agent = get_agent(RAGQueryAssistantAgent)
+
+COMPETITOR_COLUMNS = ",".join(CompetitorResponse.model_fields)
+FINDING_COLUMNS = {
+    "id", "competitor_id", "finding_type", "title", "content", "source_url",
+    "sentiment", "importance_score", "metadata", "created_at"
+}
 
 
 @router.get("/", response_model=List[CompetitorResponse])
 async def get_competitors(
+    response: Response,
     status: Optional[CompetitorStatus] = None,
     industry: Optional[str] = None,
-    limit: int = Query(50, le=100)
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Depends(cursor_param)
 ):
-    """Get all competitors with optional filters"""
+    """Get competitors (newest first) with optional filters; the next page's cursor is returned in X-Next-Cursor"""
     try:
         filters = {}
         if status:
@@ -34,13 +55,61 @@ async def get_competitors(
         if industry:
             filters["industry"] = industry
 
-        competitors = await supabase_client.get_competitors(filters)
-        return competitors[:limit]
+        competitors = await supabase_client.get_competitors(
+            filters, limit=limit, cursor=cursor, columns=COMPETITOR_COLUMNS
+        )
+        set_next_cursor(response, competitors, limit)
+        return competitors
     except Exception as e:
         app_logger.error(f"Error fetching competitors: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def resolve_batch_competitors(request: CompetitorBatchRequest) -> List[str]:
+    """Competitor ids for a batch: the explicit list, or every competitor matching the filters"""
+    if request.competitor_ids:
+        return request.competitor_ids
+
+    filters = {}
+    if request.status:
+        filters["status"] = request.status.value
+    if request.industry:
+        filters["industry"] = request.industry
+
+    competitor_ids: List[str] = []
+    cursor = None
+    while True:
+        page = await supabase_client.get_competitors(filters, limit=100, cursor=cursor, columns="id,created_at")
+        competitor_ids.extend(row["id"] for row in page)
+        cursor = next_cursor(page, 100)
+        if not cursor or len(competitor_ids) > settings.COMPETITOR_BATCH_MAX_SIZE:
+            return competitor_ids
+
+
+@router.post("/analyze-batch", response_model=JobAccepted, status_code=202)
+async def analyze_competitors_batch(request: CompetitorBatchRequest):
+    """
+    Queue analysis of many competitors; returns immediately with the batch's job id
+
+    Progress is broadcast over /ws/updates (competitor_batch_progress and
+    competitor_batch_complete) and can be polled at GET /jobs/{job_id}.
+    """
+    competitor_ids = await resolve_batch_competitors(request)
+    if not competitor_ids:
+        raise HTTPException(status_code=400, detail="No competitors selected")
+    if len(competitor_ids) > settings.COMPETITOR_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch may contain at most {settings.COMPETITOR_BATCH_MAX_SIZE} competitors"
+        )
+
+    return await enqueue_job(BATCH_JOB_TYPE, {
+        "competitor_ids": competitor_ids,
+        "analysis_type": request.analysis_type,
+        "fresh": request.fresh
+    })
+
+
 @router.get("/{competitor_id}", response_model=CompetitorResponse)
 async def get_competitor(competitor_id: str):
     """Get a specific competitor by ID"""
@@ -104,8 +173,8 @@ async def update_competitor(competitor_id: str, competitor: CompetitorUpdate):
 
 
 @router.post("/{competitor_id}/analyze")
-async def analyze_competitor(competitor_id: str, analysis_type: str = "comprehensive"):
-    """Trigger AI analysis of a competitor"""
+async def analyze_competitor(competitor_id: str, analysis_type: str = "comprehensive", fresh: bool = False):
+    """Trigger AI analysis of a competitor (fresh=true bypasses the LLM response cache)"""
     try:
         competitor = await supabase_client.get_competitor_by_id(competitor_id)
         if not competitor:
@@ -114,7 +183,8 @@ async def analyze_competitor(competitor_id: str, analysis_type: str = "comprehen
         # Run competitive intelligence agent
         analysis = await ci_agent.execute({
             "competitor_data": competitor,
-            "analysis_type": analysis_type
+            "analysis_type": analysis_type,
+            "fresh": fresh
         })
 
         # Update last_analyzed timestamp
@@ -183,64 +253,95 @@ async def analyze_competitor(competitor_id: str, analysis_type: str = "comprehen
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/{competitor_id}/analyze-automated")
+@router.post("/{competitor_id}/analyze-automated", response_model=JobAccepted, status_code=202)
 async def analyze_competitor_automated(competitor_id: str):
-    """Automated competitor analysis with auto-generated questions and answers"""
-    try:
-        from agents.rag_assistant import RAGQueryAssistantAgent
+    """Queue automated competitor analysis; the job's result holds the answered questions"""
+    competitor = await supabase_client.get_competitor_by_id(competitor_id)
+    if not competitor:
+        raise HTTPException(status_code=404, detail="Competitor not found")
 
-        competitor = await supabase_client.get_competitor_by_id(competitor_id)
-        if not competitor:
-            raise HTTPException(status_code=404, detail="Competitor not found")
+    return await enqueue_job("analyze_competitor_automated", {"competitor_id": competitor_id})
 
-        rag_agent = RAGQueryAssistantAgent()
-
-        # Auto-generate relevant questions based on competitor
-        questions = [
-            f"What AI features has {competitor['name']} launched recently?",
-            f"How is {competitor['name']} pricing their services compared to the market?",
-            f"What content strategies is {competitor['name']} using that are working best?",
-            f"What are the key differentiators of {competitor['name']} in the {competitor['industry']} industry?",
-            f"What is the recent market sentiment around {competitor['name']}?"
-        ]
-
-        # Auto-answer each question using RAG agent
-        qa_results = []
-        for question in questions:
-            response = await rag_agent.execute({
-                "query": question,
-                "conversation_history": [],
-                "context_ids": [competitor_id]
-            })
 
-            qa_results.append({
-                "question": question,
-                "answer": response["content"],
-                "sources": response.get("metadata", {}).get("sources", []),
-                "confidence": response.get("metadata", {}).get("confidence", 0.8)
-            })
+@job_workers.handler("analyze_competitor_automated")
+async def run_automated_analysis(payload: Dict[str, Any], job: JobContext) -> Dict[str, Any]:
+    """Automated competitor analysis with auto-generated questions and answers"""
+    competitor_id = payload["competitor_id"]
+    competitor = await supabase_client.get_competitor_by_id(competitor_id)
+    if not competitor:
+        raise ValueError(f"Competitor {competitor_id} not found")
+
+    # Auto-generate relevant questions based on competitor
+    questions = [
+        f"What AI features has {competitor['name']} launched recently?",
+        f"How is {competitor['name']} pricing their services compared to the market?",
+        f"What content strategies is {competitor['name']} using that are working best?",
+        f"What are the key differentiators of {competitor['name']} in the {competitor['industry']} industry?",
+        f"What is the recent market sentiment around {competitor['name']}?"
+    ]
+
+    async def answer_question(question: str) -> Dict[str, Any]:
+        # A failed answer raises, so it is counted as failed below instead of answered
+        response = require_success(await rag_agent.execute({
+            "query": question,
+            "conversation_history": [],
+            "context_ids": [competitor_id]
+        }))
 
-        # Create a finding entry to increment dashboard metrics
-        finding_data = {
-            "id": str(uuid.uuid4()),
-            "competitor_id": competitor_id,
-            "finding_type": "automated_analysis",
-            "title": f"Automated Analysis: {competitor['name']}",
-            "content": f"Completed automated analysis with {len(questions)} key questions answered.",
-            "source_url": None,
-            "sentiment": "neutral",
-            "importance_score": 0.85,
-            "metadata": {
-                "questions_analyzed": len(questions),
-                "analysis_type": "automated"
-            },
-            "created_at": datetime.utcnow().isoformat()
+        return {
+            "question": question,
+            "answer": response["content"],
+            "sources": response.get("metadata", {}).get("sources", []),
+            "confidence": response.get("metadata", {}).get("confidence", 0.8),
+            "status": "answered"
         }
 
-        await supabase_client.create_finding(finding_data)
-
-        # Create a report entry for this analysis
-        report_content = f"""
+    # Auto-answer the questions concurrently; results keep question order
+    outcomes = await gather_bounded(
+        [lambda q=question: answer_question(q) for question in questions],
+        limit=settings.AGENT_MAX_CONCURRENCY,
+        timeout=settings.AGENT_TASK_TIMEOUT_SECONDS
+    )
+
+    qa_results = []
+    for question, outcome in zip(questions, outcomes):
+        if isinstance(outcome, BaseException):
+            status = "timeout" if isinstance(outcome, asyncio.TimeoutError) else "failed"
+            app_logger.warning(f"Automated analysis question {status} for {competitor['name']}: {question} ({outcome!r})")
+            qa_results.append({
+                "question": question,
+                "answer": "This question could not be answered during this analysis run.",
+                "sources": [],
+                "confidence": 0.0,
+                "status": status
+            })
+        else:
+            qa_results.append(outcome)
+
+    questions_answered = sum(1 for qa in qa_results if qa["status"] == "answered")
+
+    # Create a finding entry to increment dashboard metrics (ids are stable across job retries)
+    finding_data = {
+        "id": job.stable_id("finding"),
+        "competitor_id": competitor_id,
+        "finding_type": "automated_analysis",
+        "title": f"Automated Analysis: {competitor['name']}",
+        "content": f"Completed automated analysis with {questions_answered} of {len(questions)} key questions answered.",
+        "source_url": None,
+        "sentiment": "neutral",
+        "importance_score": 0.85,
+        "metadata": {
+            "questions_analyzed": len(questions),
+            "questions_answered": questions_answered,
+            "analysis_type": "automated"
+        },
+        "created_at": datetime.utcnow().isoformat()
+    }
+
+    await supabase_client.upsert_finding(finding_data)
+
+    # Create a report entry for this analysis
+    report_content = f"""
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
          BLUEPEAK COMPASS
     Competitor Analysis Report
@@ -264,8 +365,8 @@ DETAILED ANALYSIS
 
 """
 
-        for i, qa in enumerate(qa_results, 1):
-            report_content += f"""
+    for i, qa in enumerate(qa_results, 1):
+        report_content += f"""
 {i}. {qa['question']}
 {'─' * 70}
 
@@ -275,7 +376,7 @@ Confidence Level: {int(qa['confidence'] * 100)}%
 
 """
 
-        report_content += f"""
+    report_content += f"""
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 STRATEGIC INSIGHTS
@@ -287,45 +388,48 @@ differentiation, and public perception.
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 """
 
-        report_data = {
-            "id": str(uuid.uuid4()),
-            "title": f"{competitor['name']} - Automated Analysis Report",
-            "report_type": "competitor_analysis",
-            "content": report_content,
-            "summary": f"Comprehensive automated analysis of {competitor['name']} covering {len(questions)} key strategic questions about their market position, capabilities, and competitive stance.",
-            "competitor_ids": [competitor_id],
-            "trend_ids": [],
-            "generated_by": "automated_analysis",
-            "created_at": datetime.utcnow().isoformat()
-        }
-
-        await supabase_client.create_report(report_data)
-
-        # Update last_analyzed timestamp and increment monitoring score
+    report_data = {
+        "id": job.stable_id("report"),
+        "title": f"{competitor['name']} - Automated Analysis Report",
+        "report_type": "competitor_analysis",
+        "content": report_content,
+        "summary": f"Comprehensive automated analysis of {competitor['name']} covering {len(questions)} key strategic questions about their market position, capabilities, and competitive stance.",
+        "competitor_ids": [competitor_id],
+        "trend_ids": [],
+        "generated_by": "automated_analysis",
+        "created_at": datetime.utcnow().isoformat()
+    }
+
+    await supabase_client.upsert_report(report_data)
+
+    # Update last_analyzed timestamp and increment monitoring score. The new
+    # score is fixed by the first attempt, so a retry does not increment it again
+    new_score = job.progress.get("monitoring_score")
+    if new_score is None:
         current_score = competitor.get("monitoring_score", 0.5)
         new_score = min(1.0, current_score + 0.1)
-
+        await job.save_progress(monitoring_score=new_score)
         app_logger.info(f"Updating competitor {competitor['name']}: monitoring_score from {current_score} to {new_score}")
 
-        await supabase_client.update_competitor(
-            competitor_id,
-            {
-                "last_analyzed": datetime.utcnow().isoformat(),
-                "monitoring_score": new_score
-            }
-        )
-
-        # Send email notification if integration is enabled
-        try:
-            integration_settings = await supabase_client.get_integration_settings("default_user")
-            if integration_settings and integration_settings.get("email_enabled"):
-                recipients = integration_settings.get("email_recipients", [])
-                notification_types = integration_settings.get("notification_types", [])
+    await supabase_client.update_competitor(
+        competitor_id,
+        {
+            "last_analyzed": datetime.utcnow().isoformat(),
+            "monitoring_score": new_score
+        }
+    )
 
-                # Check if analysis notifications are enabled
-                if recipients and ("new_competitor" in notification_types or "analysis_complete" in notification_types or "reports" in notification_types):
-                    # Send both an analysis notification and a report notification
-                    html_content = f"""
+    # Send email notification if integration is enabled (once, even if the job is retried)
+    try:
+        integration_settings = await supabase_client.get_integration_settings("default_user")
+        if not job.progress.get("email_sent") and integration_settings and integration_settings.get("email_enabled"):
+            recipients = integration_settings.get("email_recipients", [])
+            notification_types = integration_settings.get("notification_types", [])
+
+            # Check if analysis notifications are enabled
+            if recipients and ("new_competitor" in notification_types or "analysis_complete" in notification_types or "reports" in notification_types):
+                # Send both an analysis notification and a report notification
+                html_content = f"""
                     <!DOCTYPE html>
                     <html>
                     <head>
@@ -363,37 +467,43 @@ differentiation, and public perception.
                     </html>
                     """
 
-                    await email_integration.send_email(
-                        to_emails=recipients,
-                        subject=f"BluePeak Compass - {competitor['name']} Automated Analysis Complete",
-                        html_content=html_content
-                    )
-                    app_logger.info(f"Automated analysis notification email sent to {len(recipients)} recipient(s)")
-        except Exception as email_error:
-            # Don't fail the analysis if email fails
-            app_logger.error(f"Failed to send automated analysis notification email: {email_error}")
-
-        return {
-            "competitor_id": competitor_id,
-            "competitor_name": competitor["name"],
-            "questions_answered": len(questions),
-            "analysis_results": qa_results,
-            "timestamp": datetime.utcnow().isoformat(),
-            "summary": f"Completed automated analysis of {competitor['name']} with {len(questions)} strategic questions."
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        app_logger.error(f"Error in automated competitor analysis: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+                await email_integration.send_email(
+                    to_emails=recipients,
+                    subject=f"BluePeak Compass - {competitor['name']} Automated Analysis Complete",
+                    html_content=html_content
+                )
+                await job.save_progress(email_sent=True)
+                app_logger.info(f"Automated analysis notification email sent to {len(recipients)} recipient(s)")
+    except Exception as email_error:
+        # Don't fail the analysis if email fails
+        app_logger.error(f"Failed to send automated analysis notification email: {email_error}")
+
+    return {
+        "competitor_id": competitor_id,
+        "competitor_name": competitor["name"],
+        "questions_answered": questions_answered,
+        "analysis_results": qa_results,
+        "timestamp": datetime.utcnow().isoformat(),
+        "summary": f"Completed automated analysis of {competitor['name']} with {len(questions)} strategic questions."
+    }
 
 
 @router.get("/{competitor_id}/findings")
-async def get_competitor_findings(competitor_id: str, limit: int = 20):
-    """Get research findings for a specific competitor"""
+async def get_competitor_findings(
+    competitor_id: str,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Depends(cursor_param),
+    fields: Optional[str] = None
+):
+    """Get research findings for a specific competitor (newest first, cursor paginated via X-Next-Cursor)"""
+    columns = select_columns(fields, FINDING_COLUMNS)
     try:
-        findings = await supabase_client.get_findings(competitor_id)
-        return findings[:limit]
+        findings = await supabase_client.get_findings(
+            competitor_id, limit=limit, cursor=cursor, columns=columns
+        )
+        set_next_cursor(response, findings, limit)
+        return findings
     except Exception as e:
         app_logger.error(f"Error fetching findings: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,97 @@
+"""
+Background job API endpoints
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import Any, Dict, List, Optional
+from app.models.schemas import JobAccepted, JobResponse, JobStatus
+from app.api.pagination import cursor_param, set_next_cursor
+from app.core.config import settings
+from app.core.logger import app_logger
+from app.services.jobs import job_workers
+from database.supabase_client import supabase_client
+import uuid
+
+router = APIRouter()
+
+# Listing omits payloads and results, which can be large
+JOB_LIST_COLUMNS = (
+    "id,job_type,status,progress,error,attempts,max_attempts,cancel_requested,"
+    "created_at,started_at,finished_at,updated_at"
+)
+
+
+async def enqueue_job(job_type: str, payload: Dict[str, Any], **options: Any) -> JobAccepted:
+    """Queue a job for an endpoint that answers 202 Accepted; 503 if the queue is unavailable"""
+    job = await job_workers.enqueue(job_type, payload, **options)
+    if not job:
+        raise HTTPException(status_code=503, detail="Background job queue unavailable")
+    return JobAccepted(
+        job_id=job["id"],
+        job_type=job_type,
+        status=job["status"],
+        status_url=f"{settings.API_PREFIX}/jobs/{job['id']}"
+    )
+
+
+def valid_job_id(job_id: str) -> str:
+    try:
+        return str(uuid.UUID(job_id))
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+
+@router.get("/", response_model=List[JobResponse])
+async def get_jobs(
+    response: Response,
+    status: Optional[JobStatus] = None,
+    job_type: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Depends(cursor_param)
+):
+    """List jobs (newest first) with optional filters; the next page's cursor is returned in X-Next-Cursor"""
+    filters = {}
+    if status:
+        filters["status"] = status.value
+    if job_type:
+        filters["job_type"] = job_type
+
+    jobs = await supabase_client.get_jobs(filters, limit=limit, cursor=cursor, columns=JOB_LIST_COLUMNS)
+    set_next_cursor(response, jobs, limit)
+    return jobs
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Status, progress and (once finished) result of a job"""
+    job = await supabase_client.get_job(valid_job_id(job_id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Result of a completed job; 409 while it is still queued or running, or if it did not complete"""
+    job = await supabase_client.get_job(valid_job_id(job_id), "id,status,result,error")
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != JobStatus.COMPLETED.value:
+        raise HTTPException(
+            status_code=409,
+            detail={"status": job["status"], "error": job.get("error"), "message": "Job has no result"}
+        )
+    return job["result"]
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job; finished jobs are returned unchanged"""
+    job_id = valid_job_id(job_id)
+    try:
+        job = await job_workers.cancel(job_id)
+    except Exception as e:
+        app_logger.error(f"Error cancelling job {job_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -3,17 +3,32 @@ Reports API endpoints
 """
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import PlainTextResponse
-from typing import List, Optional
-from app.models.schemas import ReportCreate, ReportResponse
+from typing import Any, Dict, List, Optional
+from app.models.schemas import JobAccepted, ReportCreate, ReportResponse
+from app.api.endpoints.jobs import enqueue_job
 from database.supabase_client import supabase_client
 from agents.synthesis_reporting import SynthesisReportingAgent
+from agents.base_agent import require_success
+from agents.rag_assistant import RAGQueryAssistantAgent
+from agents.registry import get_agent
+from app.core.config import settings
+from app.core.concurrency import gather_bounded
 from app.core.logger import app_logger
+from app.services.jobs import JobContext, job_workers
 from integrations.email_integration import email_integration
 from datetime import datetime
+import asyncio
 import uuid
 
 router = APIRouter()
-reporting_agent = SynthesisReportingAgent()
+reporting_agent = get_agent(SynthesisReportingAgent)
+rag_agent = get_agent(RAGQueryAssistantAgent)
+
+# Columns needed to render a text export
+EXPORT_COLUMNS = "id,title,created_at,report_type,content"
+
+# Concurrency budget shared by the LLM sections of all in-flight reports
+report_llm_budget = asyncio.Semaphore(settings.REPORT_MAX_CONCURRENCY)
 
 
 @router.get("/", response_model=List[ReportResponse])
@@ -31,8 +46,7 @@ async def get_reports(limit: int = Query(50, le=100)):
 async def get_report(report_id: str):
     """Get a specific report by ID"""
     try:
-        reports = await supabase_client.get_reports(1000)
-        report = next((r for r in reports if r["id"] == report_id), None)
+        report = await supabase_client.get_report_by_id(report_id)
 
         if not report:
             raise HTTPException(status_code=404, detail="Report not found")
@@ -63,7 +77,7 @@ async def create_report(report: ReportCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/generate")
+@router.post("/generate", response_model=JobAccepted, status_code=202)
 async def generate_report(
     report_type: str = "full_market",
     focus_areas: Optional[List[str]] = None,
@@ -72,56 +86,106 @@ async def generate_report(
     trend_ids: Optional[List[str]] = None,
     industry: Optional[str] = None
 ):
+    """Queue generation of an AI-powered market intelligence report; the job's result holds the report"""
+    return await enqueue_job("generate_report", {
+        "report_type": report_type,
+        "focus_areas": focus_areas,
+        "date_range": date_range,
+        "competitor_ids": competitor_ids,
+        "trend_ids": trend_ids,
+        "industry": industry
+    })
+
+
+@job_workers.handler("generate_report")
+async def run_generate_report(payload: Dict[str, Any], job: JobContext) -> Dict[str, Any]:
     """Generate a comprehensive AI-powered market intelligence report"""
-    try:
-        from agents.rag_assistant import RAGQueryAssistantAgent
-
-        # Gather all competitors and trends
-        competitors = await supabase_client.get_competitors()
-        trends = await supabase_client.get_trends()
-        findings = await supabase_client.get_findings()
-
-        # Map report types to titles
-        report_titles = {
-            "weekly_digest": "Weekly Competitive Digest",
-            "full_market": "Full Market Analysis",
-            "competitor_deep_dive": "Competitor Deep Dive",
-            "custom_query": "Custom Research Report"
-        }
-
-        # Map focus areas to readable names
-        focus_area_names = {
-            "ai_features": "AI Features",
-            "pricing_strategies": "Pricing Strategies",
-            "content_marketing": "Content Marketing",
-            "product_launches": "Product Launches"
-        }
-
-        # Create focus areas text
-        focus_text = ""
-        if focus_areas and len(focus_areas) > 0:
-            focus_names = [focus_area_names.get(fa, fa) for fa in focus_areas]
-            focus_text = f" - Focus: {', '.join(focus_names)}"
-
-        # Generate report title
-        title = f"{report_titles.get(report_type, 'Intelligence Report')} - {datetime.utcnow().strftime('%b %d, %Y')}{focus_text}"
-
-        # Build comprehensive report content
-        rag_agent = RAGQueryAssistantAgent()
-
-        # Generate executive summary
-        summary_query = f"Provide an executive summary of the competitive landscape, focusing on {', '.join(focus_areas) if focus_areas else 'all areas'} over the {date_range.replace('_', ' ')}."
-        summary_response = await rag_agent.execute({
-            "query": summary_query,
+    report_type = payload.get("report_type", "full_market")
+    focus_areas = payload.get("focus_areas")
+    date_range = payload.get("date_range", "last_30_days")
+    competitor_ids = payload.get("competitor_ids")
+    trend_ids = payload.get("trend_ids")
+
+    # Gather all competitors, trends and findings concurrently
+    competitors, trends, findings = await asyncio.gather(
+        supabase_client.get_competitors(),
+        supabase_client.get_trends(),
+        supabase_client.get_findings()
+    )
+
+    # Map report types to titles
+    report_titles = {
+        "weekly_digest": "Weekly Competitive Digest",
+        "full_market": "Full Market Analysis",
+        "competitor_deep_dive": "Competitor Deep Dive",
+        "custom_query": "Custom Research Report"
+    }
+
+    # Map focus areas to readable names
+    focus_area_names = {
+        "ai_features": "AI Features",
+        "pricing_strategies": "Pricing Strategies",
+        "content_marketing": "Content Marketing",
+        "product_launches": "Product Launches"
+    }
+
+    # Create focus areas text
+    focus_text = ""
+    if focus_areas and len(focus_areas) > 0:
+        focus_names = [focus_area_names.get(fa, fa) for fa in focus_areas]
+        focus_text = f" - Focus: {', '.join(focus_names)}"
+
+    # Generate report title
+    title = f"{report_titles.get(report_type, 'Intelligence Report')} - {datetime.utcnow().strftime('%b %d, %Y')}{focus_text}"
+
+    # Build comprehensive report content
+    top_competitors = competitors[:5]  # Top 5 competitors
+
+    summary_query = f"Provide an executive summary of the competitive landscape, focusing on {', '.join(focus_areas) if focus_areas else 'all areas'} over the {date_range.replace('_', ' ')}."
+    rec_query = f"Based on the current competitive landscape, provide 3 strategic recommendations for the {date_range.replace('_', ' ')}."
+
+    # (query, context_ids) for each LLM section, in report order
+    section_queries = [(summary_query, [])]
+    for competitor in top_competitors:
+        comp_query = f"Provide a brief competitive analysis of {competitor.get('name', 'Unknown')}, focusing on their recent activities and market position."
+        section_queries.append((comp_query, [competitor.get("id")]))
+    section_queries.append((rec_query, []))
+
+    async def generate_section(query: str, context_ids: List[str]) -> str:
+        # Agent failures raise, so they get the placeholder below rather than being published
+        response = require_success(await rag_agent.execute({
+            "query": query,
             "conversation_history": [],
-            "context_ids": []
-        })
-
-        # Generate detailed content sections
-        content_sections = []
-
-        # Executive Summary Section
-        content_sections.append(f"""
+            "context_ids": context_ids
+        }))
+        return response["content"]
+
+    # The sections are independent, so run them together under the shared
+    # report budget and assemble them in order once all have completed
+    section_outcomes = await gather_bounded(
+        [lambda q=query, ids=ids: generate_section(q, ids) for query, ids in section_queries],
+        limit=settings.REPORT_MAX_CONCURRENCY,
+        timeout=settings.AGENT_TASK_TIMEOUT_SECONDS,
+        semaphore=report_llm_budget
+    )
+
+    section_texts = []
+    for (query, _), outcome in zip(section_queries, section_outcomes):
+        if isinstance(outcome, BaseException):
+            app_logger.warning(f"Report section failed ({outcome!r}): {query[:100]}")
+            section_texts.append("This section could not be generated for this report.")
+        else:
+            section_texts.append(outcome)
+
+    summary_text = section_texts[0]
+    competitor_texts = section_texts[1:-1]
+    recommendations_text = section_texts[-1]
+
+    # Generate detailed content sections
+    content_sections = []
+
+    # Executive Summary Section
+    content_sections.append(f"""
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
          BLUEPEAK COMPASS
     Market Intelligence Report
@@ -135,7 +199,7 @@ Date Range: {date_range.replace('_', ' ').title()}
 
 EXECUTIVE SUMMARY
 
-{summary_response['content']}
+{summary_text}
 
 KEY FINDINGS:
 - {len(competitors)} competitors monitored
@@ -146,17 +210,10 @@ KEY FINDINGS:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 """)
 
-        # Competitive Landscape Section
-        content_sections.append("\nCOMPETITIVE LANDSCAPE\n")
-        for i, competitor in enumerate(competitors[:5]):  # Top 5 competitors
-            comp_query = f"Provide a brief competitive analysis of {competitor.get('name', 'Unknown')}, focusing on their recent activities and market position."
-            comp_response = await rag_agent.execute({
-                "query": comp_query,
-                "conversation_history": [],
-                "context_ids": [competitor.get("id")]
-            })
-
-            content_sections.append(f"""
+    # Competitive Landscape Section
+    content_sections.append("\nCOMPETITIVE LANDSCAPE\n")
+    for competitor, comp_analysis in zip(top_competitors, competitor_texts):
+        content_sections.append(f"""
 {competitor.get('name', 'Unknown')}
 {'─' * 60}
 Industry: {competitor.get('industry', 'N/A')}
@@ -164,20 +221,20 @@ Status: {competitor.get('status', 'N/A').upper()}
 Monitoring Score: {(competitor.get('monitoring_score', 0) * 100):.0f}%
 
 Analysis:
-{comp_response['content']}
+{comp_analysis}
 
 """)
 
-        # Trends and Market Dynamics
-        if len(trends) > 0:
-            content_sections.append(f"""
+    # Trends and Market Dynamics
+    if len(trends) > 0:
+        content_sections.append(f"""
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 MARKET TRENDS & DYNAMICS
 
 """)
-            for trend in trends[:5]:
-                content_sections.append(f"""
+        for trend in trends[:5]:
+            content_sections.append(f"""
 {trend.get('title', 'Unnamed Trend')}
 Status: {trend.get('status', 'N/A').upper()} | Confidence: {(trend.get('confidence_score', 0) * 100):.0f}%
 
@@ -185,20 +242,13 @@ Status: {trend.get('status', 'N/A').upper()} | Confidence: {(trend.get('confiden
 
 """)
 
-        # Strategic Recommendations
-        rec_query = f"Based on the current competitive landscape, provide 3 strategic recommendations for the {date_range.replace('_', ' ')}."
-        rec_response = await rag_agent.execute({
-            "query": rec_query,
-            "conversation_history": [],
-            "context_ids": []
-        })
-
-        content_sections.append(f"""
+    # Strategic Recommendations
+    content_sections.append(f"""
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 STRATEGIC RECOMMENDATIONS
 
-{rec_response['content']}
+{recommendations_text}
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
@@ -212,61 +262,60 @@ Report generated in ~60 seconds using AI
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 """)
 
-        full_content = "\n".join(content_sections)
-
-        # Save report
-        report_data = {
-            "id": str(uuid.uuid4()),
-            "title": title,
-            "report_type": report_type,
-            "content": full_content,
-            "summary": summary_response['content'],
-            "competitor_ids": competitor_ids or [],
-            "trend_ids": trend_ids or [],
-            "generated_by": "ai_agent",
-            "created_at": datetime.utcnow().isoformat()
-        }
-
-        created = await supabase_client.create_report(report_data)
-
-        # Send email notification if integration is enabled
-        try:
-            integration_settings = await supabase_client.get_integration_settings("default_user")
-            if integration_settings and integration_settings.get("email_enabled"):
-                recipients = integration_settings.get("email_recipients", [])
-                notification_types = integration_settings.get("notification_types", [])
-
-                # Check if report notifications are enabled
-                if recipients and ("reports" in notification_types or "report_ready" in notification_types):
-                    await email_integration.send_report_email(
-                        to_emails=recipients,
-                        report_data={
-                            "title": title,
-                            "summary": summary_response['content'],
-                            "content": full_content
-                        }
-                    )
-                    app_logger.info(f"Report notification email sent to {len(recipients)} recipient(s)")
-        except Exception as email_error:
-            # Don't fail the report generation if email fails
-            app_logger.error(f"Failed to send report notification email: {email_error}")
-
-        return {
-            "report_id": created.get("id") if created else report_data["id"],
-            "report": created or report_data,
-            "message": "Report generated successfully"
-        }
-    except Exception as e:
-        app_logger.error(f"Error generating report: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    full_content = "\n".join(content_sections)
+
+    # Save report (the id is stable across job retries, so a retry replaces it)
+    report_data = {
+        "id": job.stable_id("report"),
+        "title": title,
+        "report_type": report_type,
+        "content": full_content,
+        "summary": summary_text,
+        "competitor_ids": competitor_ids or [],
+        "trend_ids": trend_ids or [],
+        "generated_by": "ai_agent",
+        "created_at": datetime.utcnow().isoformat()
+    }
+
+    created = await supabase_client.upsert_report(report_data)
+    if not created:
+        raise RuntimeError("Failed to save generated report")
+
+    # Send email notification if integration is enabled (once, even if the job is retried)
+    try:
+        integration_settings = await supabase_client.get_integration_settings("default_user")
+        if not job.progress.get("email_sent") and integration_settings and integration_settings.get("email_enabled"):
+            recipients = integration_settings.get("email_recipients", [])
+            notification_types = integration_settings.get("notification_types", [])
+
+            # Check if report notifications are enabled
+            if recipients and ("reports" in notification_types or "report_ready" in notification_types):
+                await email_integration.send_report_email(
+                    to_emails=recipients,
+                    report_data={
+                        "title": title,
+                        "summary": summary_text,
+                        "content": full_content
+                    }
+                )
+                await job.save_progress(email_sent=True)
+                app_logger.info(f"Report notification email sent to {len(recipients)} recipient(s)")
+    except Exception as email_error:
+        # Don't fail the report generation if email fails
+        app_logger.error(f"Failed to send report notification email: {email_error}")
+
+    return {
+        "report_id": created["id"],
+        "report": created,
+        "message": "Report generated successfully"
+    }
 
 
 @router.post("/{report_id}/export", response_class=PlainTextResponse)
 async def export_report(report_id: str, format: str = "pdf"):
     """Export report as downloadable text file"""
     try:
-        reports = await supabase_client.get_reports(1000)
-        report = next((r for r in reports if r["id"] == report_id), None)
+        report = await supabase_client.get_report_by_id(report_id, EXPORT_COLUMNS)
 
         if not report:
             raise HTTPException(status_code=404, detail="Report not found")
@@ -9,12 +9,16 @@ from database.supabase_client import supabase_client
 from services.report_generator import report_generator
 from app.core.logger import app_logger
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+import asyncio
 import tempfile
 import os
 
 router = APIRouter()
 sentiment_analyzer = SentimentIntensityAnalyzer()
 
+# Report columns used to build shareable analysis data
+ANALYSIS_COLUMNS = "id,title,summary,report_type,created_at,content"
+
 
 async def analyze_report_data(report_id: str) -> dict:
     """
@@ -22,19 +26,16 @@ async def analyze_report_data(report_id: str) -> dict:
     Uses existing data from database
     """
     try:
-        # Get report
-        reports = await supabase_client.get_reports(1000)
-        report = next((r for r in reports if r["id"] == report_id), None)
+        # Get report, competitors and trends concurrently
+        report, competitors, trends = await asyncio.gather(
+            supabase_client.get_report_by_id(report_id, ANALYSIS_COLUMNS),
+            supabase_client.get_competitors(),
+            supabase_client.get_trends()
+        )
 
         if not report:
             return {}
 
-        # Get all competitors
-        competitors = await supabase_client.get_competitors()
-
-        # Get all trends
-        trends = await supabase_client.get_trends()
-
         # Analyze sentiment from report content
         content = report.get('content', '')
         sentiment_scores = sentiment_analyzer.polarity_scores(content)
@@ -0,0 +1,81 @@
+"""
+System API endpoints for runtime metrics and maintenance
+"""
+from fastapi import APIRouter
+from app.core.metrics import latency_summaries, token_usage_summaries
+from app.services.jobs import job_workers
+from app.services.llm_cache import llm_cache
+from app.services.llm_clients import llm_clients
+from app.services.llm_scheduler import llm_scheduler
+from app.services.vector_store import vector_store
+from app.services.vector_sync import vector_sync
+
+router = APIRouter()
+
+
+@router.get("/llm-cache")
+async def get_llm_cache_stats():
+    """Get LLM response cache hit/miss counters"""
+    return llm_cache.stats()
+
+
+@router.get("/llm-clients")
+async def get_llm_client_stats():
+    """Get the shared LLM clients and their connection pool limits"""
+    return llm_clients.stats()
+
+
+@router.get("/llm-scheduler")
+async def get_llm_scheduler_stats():
+    """Get LLM queue depth by priority, in-flight calls, remaining budgets and retry counts"""
+    return llm_scheduler.stats()
+
+
+@router.get("/embedding-cache")
+async def get_embedding_cache_stats():
+    """Get embedding cache hit rate and size on disk"""
+    return vector_store.embedding_cache_stats()
+
+
+@router.get("/keyword-index")
+async def get_keyword_index_stats():
+    """Get keyword (BM25) index sizes per collection"""
+    return vector_store.keyword_index_stats()
+
+
+@router.get("/latency")
+async def get_latency_metrics():
+    """Get rolling latency summaries (e.g. chat time-to-first-token)"""
+    return {"trackers": latency_summaries()}
+
+
+@router.get("/vector-sync")
+async def get_vector_sync_stats():
+    """Get vector store sync high-water marks, lag and throughput per table"""
+    return vector_sync.stats()
+
+
+@router.post("/vector-sync")
+async def run_vector_sync(reconcile: bool = False):
+    """Run one sync cycle now, optionally reconciling deleted rows"""
+    written = await vector_sync.run_once(reconcile=reconcile)
+    return {"rows_synced": written, **vector_sync.stats()}
+
+
+@router.get("/job-workers")
+async def get_job_worker_stats():
+    """Get this process's job workers, the jobs they are running and outcome counts"""
+    return job_workers.stats()
+
+
+@router.get("/llm-usage")
+async def get_llm_usage():
+    """Get per-agent LLM token usage, split into uncached, cache-read and cache-write input"""
+    return {"agents": token_usage_summaries()}
+
+
+@router.delete("/llm-cache")
+async def clear_llm_cache():
+    """Clear the in-process LLM response cache"""
+    llm_cache.clear()
+    return {"message": "LLM cache cleared"}
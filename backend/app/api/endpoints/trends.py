@@ -1,26 +1,34 @@
 """
 Trends API endpoints
 """
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
-from app.models.schemas import TrendCreate, TrendResponse, TrendStatus
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import Any, Dict, List, Optional
+from app.models.schemas import JobAccepted, TrendCreate, TrendResponse, TrendStatus
+from app.api.endpoints.jobs import enqueue_job
+from app.api.pagination import cursor_param, set_next_cursor
 from database.supabase_client import supabase_client
 from agents.market_trend_analyst import MarketTrendAnalystAgent
+from agents.registry import get_agent
 from app.core.logger import app_logger
+from app.services.jobs import JobContext, job_workers
 from datetime import datetime
 import uuid
 
 router = APIRouter()
-trend_agent = MarketTrendAnalystAgent()
+trend_agent = get_agent(MarketTrendAnalystAgent)
+
+TREND_COLUMNS = ",".join(TrendResponse.model_fields)
 
 
 @router.get("/", response_model=List[TrendResponse])
 async def get_trends(
+    response: Response,
     status: Optional[TrendStatus] = None,
     industry: Optional[str] = None,
-    limit: int = Query(50, le=100)
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Depends(cursor_param)
 ):
-    """Get all trends with optional filters"""
+    """Get trends (newest first) with optional filters; the next page's cursor is returned in X-Next-Cursor"""
     try:
         filters = {}
         if status:
@@ -28,8 +36,11 @@ async def get_trends(
         if industry:
             filters["industry"] = industry
 
-        trends = await supabase_client.get_trends(filters)
-        return trends[:limit]
+        trends = await supabase_client.get_trends(
+            filters, limit=limit, cursor=cursor, columns=TREND_COLUMNS
+        )
+        set_next_cursor(response, trends, limit)
+        return trends
     except Exception as e:
         app_logger.error(f"Error fetching trends: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -54,25 +65,32 @@ async def create_trend(trend: TrendCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/discover")
-async def discover_trends(industry: str, timeframe: str = "30_days"):
-    """Discover new trends using AI agent"""
-    try:
-        analysis = await trend_agent.execute({
-            "industry": industry,
-            "timeframe": timeframe,
-            "data_points": []  # Would be populated with real data
-        })
+@router.post("/discover", response_model=JobAccepted, status_code=202)
+async def discover_trends(industry: str, timeframe: str = "30_days", fresh: bool = False):
+    """Queue trend discovery by the AI agent (fresh=true bypasses the LLM response cache)"""
+    return await enqueue_job("discover_trends", {
+        "industry": industry,
+        "timeframe": timeframe,
+        "fresh": fresh
+    })
 
-        return {
-            "industry": industry,
-            "timeframe": timeframe,
-            "analysis": analysis,
-            "timestamp": datetime.utcnow().isoformat()
-        }
-    except Exception as e:
-        app_logger.error(f"Error discovering trends: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+
+@job_workers.handler("discover_trends")
+async def run_trend_discovery(payload: Dict[str, Any], job: JobContext) -> Dict[str, Any]:
+    """Discover new trends using the market trend agent"""
+    analysis = await trend_agent.execute({
+        "industry": payload["industry"],
+        "timeframe": payload.get("timeframe", "30_days"),
+        "data_points": [],  # Would be populated with real data
+        "fresh": payload.get("fresh", False)
+    })
+
+    return {
+        "industry": payload["industry"],
+        "timeframe": payload.get("timeframe", "30_days"),
+        "analysis": analysis,
+        "timestamp": datetime.utcnow().isoformat()
+    }
 
 
 @router.get("/{trend_id}/trajectory")
@@ -0,0 +1,50 @@
+"""
+Multi-agent workflow API endpoints
+
+A workflow runs one of the supervisor's execution plans as a background job;
+each step's trace entry is saved to the job's progress as the step settles.
+"""
+from fastapi import APIRouter, Body, HTTPException
+from typing import Any, Dict, List
+from agents.registry import get_agent
+from agents.supervisor import PLANS, SupervisorAgent
+from app.api.endpoints.jobs import enqueue_job
+from app.models.schemas import JobAccepted
+from app.services.jobs import JobContext, job_workers
+
+router = APIRouter()
+
+supervisor = get_agent(SupervisorAgent)
+
+
+@router.get("/")
+async def get_workflows() -> List[Dict[str, Any]]:
+    """Available workflows with their steps, dependencies and concurrent stages"""
+    return [plan.describe() for plan in PLANS.values()]
+
+
+@router.post("/{task_type}", response_model=JobAccepted, status_code=202)
+async def run_workflow(task_type: str, parameters: Dict[str, Any] = Body(default={})):
+    """Queue a workflow run; parameters are passed to its steps (fresh=true bypasses cached outputs)"""
+    if task_type not in PLANS:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    return await enqueue_job("run_workflow", {"task_type": task_type, "parameters": parameters})
+
+
+@job_workers.handler("run_workflow")
+async def run_workflow_job(payload: Dict[str, Any], job: JobContext) -> Dict[str, Any]:
+    """Execute a supervisor plan, recording each step's outcome as it settles"""
+    steps = job.progress.setdefault("steps", {})
+
+    async def record_step(entry: Dict[str, Any]):
+        steps[entry["node"]] = entry
+        await job.save_progress()
+
+    response = await supervisor.execute(
+        {"task_type": payload["task_type"], "parameters": payload.get("parameters", {})},
+        on_node=record_step
+    )
+    if response["metadata"]["status"] == "failed":
+        failed = [entry for entry in response["metadata"]["trace"] if entry.get("error")]
+        raise RuntimeError(f"Workflow failed: {failed[0]['node']}: {failed[0]['error']}" if failed else "Workflow failed")
+    return response
@@ -0,0 +1,43 @@
+"""
+Shared helpers for cursor-paginated list endpoints
+"""
+from fastapi import HTTPException, Response
+from typing import Any, Dict, Iterable, List, Optional
+from database.supabase_client import decode_cursor, next_cursor
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def cursor_param(cursor: Optional[str] = None) -> Optional[str]:
+    """Validate the opaque `cursor` query parameter"""
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    return cursor
+
+
+def select_columns(fields: Optional[str], allowed: Iterable[str]) -> str:
+    """Turn a comma-separated `fields` parameter into a validated column list"""
+    if not fields:
+        return "*"
+
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    return ",".join(requested)
+
+
+def set_next_cursor(
+    response: Response,
+    rows: List[Dict[str, Any]],
+    limit: int,
+    order_column: str = "created_at"
+):
+    """Expose the next page's cursor on the response, if there is one"""
+    cursor = next_cursor(rows, limit, order_column)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
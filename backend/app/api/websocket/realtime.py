@@ -4,8 +4,11 @@ WebSocket endpoints for real-time updates
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from typing import Dict, Set
 from app.core.logger import app_logger
-from app.models.schemas import WSMessage
+from app.models.schemas import WSMessage, ChatRequest
+from app.api.endpoints.chat import stream_chat_events
+from pydantic import ValidationError
 from datetime import datetime
+import asyncio
 import json
 
 router = APIRouter()
@@ -58,10 +61,22 @@ class ConnectionManager:
 manager = ConnectionManager()
 
 
+async def stream_chat_to_socket(websocket: WebSocket, request: ChatRequest):
+    """Forward a streamed chat turn to a socket as chat_start/chat_token/chat_done messages"""
+    async for event in stream_chat_events(request):
+        message = WSMessage(type=f"chat_{event['type']}", data=event["data"])
+        try:
+            await manager.send_personal_message(message.model_dump_json(), websocket)
+        except Exception:
+            # Client went away; stop generating
+            break
+
+
 @router.websocket("/updates")
 async def websocket_endpoint(websocket: WebSocket, user_id: str = "default"):
     """WebSocket endpoint for real-time updates"""
     await manager.connect(websocket, user_id)
+    chat_tasks: Set[asyncio.Task] = set()
 
     try:
         # Send welcome message
@@ -105,6 +120,22 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str = "default"):
                     )
                     await manager.send_personal_message(response.model_dump_json(), websocket)
 
+                elif message_type == "chat":
+                    # Stream the answer in the background so pings keep working
+                    try:
+                        chat_request = ChatRequest(**message.get("data", {}))
+                    except ValidationError as e:
+                        error_msg = WSMessage(
+                            type="error",
+                            data={"message": f"Invalid chat request: {e}"}
+                        )
+                        await manager.send_personal_message(error_msg.model_dump_json(), websocket)
+                        continue
+
+                    task = asyncio.create_task(stream_chat_to_socket(websocket, chat_request))
+                    chat_tasks.add(task)
+                    task.add_done_callback(chat_tasks.discard)
+
                 else:
                     # Echo back unknown messages
                     await manager.send_personal_message(data, websocket)
@@ -124,6 +155,10 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str = "default"):
         app_logger.error(f"WebSocket error for {user_id}: {e}")
         manager.disconnect(websocket, user_id)
 
+    finally:
+        for task in chat_tasks:
+            task.cancel()
+
 
 async def broadcast_update(update_type: str, data: Dict):
     """Broadcast an update to all connected clients"""
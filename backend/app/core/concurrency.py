@@ -0,0 +1,39 @@
+"""
+Helpers for running independent async work concurrently
+"""
+from typing import Any, Awaitable, Callable, List, Optional
+import asyncio
+
+
+async def gather_bounded(
+    factories: List[Callable[[], Awaitable[Any]]],
+    limit: int,
+    timeout: Optional[float] = None,
+    semaphore: Optional[asyncio.Semaphore] = None
+) -> List[Any]:
+    """
+    Run coroutine factories concurrently with at most `limit` in flight
+
+    Args:
+        factories: Zero-argument callables returning the awaitables to run
+        limit: Maximum number of awaitables running at once
+        timeout: Optional per-item timeout in seconds
+        semaphore: Optional shared semaphore, overriding `limit`, so several
+            batches can draw from one concurrency budget
+
+    Returns:
+        Results in the same order as `factories`. Items that failed or timed
+        out are returned as the raised exception instead of a result.
+    """
+    gate = semaphore or asyncio.Semaphore(max(1, limit))
+
+    async def run(factory: Callable[[], Awaitable[Any]]) -> Any:
+        async with gate:
+            if timeout:
+                return await asyncio.wait_for(factory(), timeout=timeout)
+            return await factory()
+
+    return await asyncio.gather(
+        *(run(factory) for factory in factories),
+        return_exceptions=True
+    )
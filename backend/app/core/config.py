@@ -56,11 +56,40 @@ class Settings:
     ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY")
     CLAUDE_MODEL: str = os.getenv("CLAUDE_MODEL", "claude-3-5-sonnet-20241022")
     MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", 4096))
+    LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", 50))
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", 20))
+    LLM_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", 60))
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", 120))
+    # Retries are handled by the LLM scheduler, so SDK-level retries default to off
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", 0))
+    LLM_MODEL_CONFIG: str = os.getenv("LLM_MODEL_CONFIG", "")
+    LLM_PROMPT_CACHING: bool = os.getenv("LLM_PROMPT_CACHING", "True").lower() in ("true", "1")
+
+    # Agent fan-out
+    AGENT_MAX_CONCURRENCY: int = int(os.getenv("AGENT_MAX_CONCURRENCY", 5))
+    AGENT_TASK_TIMEOUT_SECONDS: float = float(os.getenv("AGENT_TASK_TIMEOUT_SECONDS", 90))
+    REPORT_MAX_CONCURRENCY: int = int(os.getenv("REPORT_MAX_CONCURRENCY", 8))
+    COMPETITOR_BATCH_CONCURRENCY: int = int(os.getenv("COMPETITOR_BATCH_CONCURRENCY", 4))
+    COMPETITOR_BATCH_MAX_SIZE: int = int(os.getenv("COMPETITOR_BATCH_MAX_SIZE", 500))
+
+    # Background jobs
+    JOB_WORKER_ENABLED: bool = os.getenv("JOB_WORKER_ENABLED", "True").lower() in ("true", "1")
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", 4))
+    JOB_POLL_INTERVAL_SECONDS: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", 2))
+    JOB_LEASE_SECONDS: int = int(os.getenv("JOB_LEASE_SECONDS", 60))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+    JOB_RETRY_BASE_SECONDS: float = float(os.getenv("JOB_RETRY_BASE_SECONDS", 30))
+    JOB_TIMEOUT_SECONDS: float = float(os.getenv("JOB_TIMEOUT_SECONDS", 1800))
 
     # Supabase
     SUPABASE_URL: str = os.getenv("SUPABASE_URL")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY")
     SUPABASE_SERVICE_KEY: str = os.getenv("SUPABASE_SERVICE_KEY")
+    SUPABASE_MAX_CONNECTIONS: int = int(os.getenv("SUPABASE_MAX_CONNECTIONS", 100))
+    SUPABASE_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("SUPABASE_MAX_KEEPALIVE_CONNECTIONS", 20))
+    SUPABASE_TIMEOUT_SECONDS: float = float(os.getenv("SUPABASE_TIMEOUT_SECONDS", 30))
+    REPORT_CACHE_MAX_ENTRIES: int = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", 256))
+    DASHBOARD_SNAPSHOT_MAX_AGE_SECONDS: int = int(os.getenv("DASHBOARD_SNAPSHOT_MAX_AGE_SECONDS", 60))
 
     # Redis
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
@@ -68,10 +97,43 @@ class Settings:
     REDIS_DB: int = int(os.getenv("REDIS_DB", 0))
     REDIS_PASSWORD: str = os.getenv("REDIS_PASSWORD", "")
 
+    # LLM Response Cache
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "True").lower() in ("true", "1")
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", 3600))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1024))
+    LLM_CACHE_REDIS_ENABLED: bool = os.getenv("LLM_CACHE_REDIS_ENABLED", "False").lower() in ("true", "1")
+
     # Chroma Vector Database
     CHROMA_HOST: str = os.getenv("CHROMA_HOST", "localhost")
     CHROMA_PORT: int = int(os.getenv("CHROMA_PORT", 8001))
     CHROMA_PERSIST_DIR: str = os.getenv("CHROMA_PERSIST_DIR", "./data/chroma")
+    VECTOR_HNSW_M: int = int(os.getenv("VECTOR_HNSW_M", 16))
+    VECTOR_HNSW_EF_CONSTRUCTION: int = int(os.getenv("VECTOR_HNSW_EF_CONSTRUCTION", 100))
+    VECTOR_HNSW_EF_SEARCH: int = int(os.getenv("VECTOR_HNSW_EF_SEARCH", 50))
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    EMBEDDING_CACHE_ENABLED: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "True").lower() in ("true", "1")
+    EMBEDDING_CACHE_DIR: str = os.getenv("EMBEDDING_CACHE_DIR", "./data/embedding_cache")
+    KEYWORD_INDEX_ENABLED: bool = os.getenv("KEYWORD_INDEX_ENABLED", "True").lower() in ("true", "1")
+    KEYWORD_INDEX_DIR: str = os.getenv("KEYWORD_INDEX_DIR", "./data/keyword_index")
+    KEYWORD_INDEX_COMPACT_EVERY: int = int(os.getenv("KEYWORD_INDEX_COMPACT_EVERY", 5000))
+    HYBRID_RRF_K: int = int(os.getenv("HYBRID_RRF_K", 60))
+    VECTOR_STORE_WARMUP: bool = os.getenv("VECTOR_STORE_WARMUP", "True").lower() in ("true", "1")
+    CHUNK_MAX_TOKENS: int = int(os.getenv("CHUNK_MAX_TOKENS", 200))
+    CHUNK_OVERLAP_TOKENS: int = int(os.getenv("CHUNK_OVERLAP_TOKENS", 40))
+    CHUNK_GROUP_OVERFETCH: int = int(os.getenv("CHUNK_GROUP_OVERFETCH", 3))
+    VECTOR_EMBED_BATCH_SIZE: int = int(os.getenv("VECTOR_EMBED_BATCH_SIZE", 64))
+    VECTOR_BACKFILL_PAGE_SIZE: int = int(os.getenv("VECTOR_BACKFILL_PAGE_SIZE", 500))
+    VECTOR_SYNC_ENABLED: bool = os.getenv("VECTOR_SYNC_ENABLED", "True").lower() in ("true", "1")
+    VECTOR_SYNC_INTERVAL_SECONDS: int = int(os.getenv("VECTOR_SYNC_INTERVAL_SECONDS", 30))
+    VECTOR_SYNC_PAGE_SIZE: int = int(os.getenv("VECTOR_SYNC_PAGE_SIZE", 200))
+    VECTOR_SYNC_RECONCILE_EVERY: int = int(os.getenv("VECTOR_SYNC_RECONCILE_EVERY", 20))
+    VECTOR_SYNC_LOOKBACK_SECONDS: int = int(os.getenv("VECTOR_SYNC_LOOKBACK_SECONDS", 120))
+    VECTOR_SYNC_STATE_PATH: str = os.getenv("VECTOR_SYNC_STATE_PATH", "./data/vector_sync_state.json")
+
+    # RAG retrieval
+    RAG_SEARCH_MODE: str = os.getenv("RAG_SEARCH_MODE", "hybrid")
+    RAG_TOP_K: int = int(os.getenv("RAG_TOP_K", 8))
+    RAG_CONTEXT_TOKEN_BUDGET: int = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", 2000))
 
     # Authentication
     SECRET_KEY: str = os.getenv("SECRET_KEY")
@@ -84,9 +146,14 @@ class Settings:
     SENDGRID_API_KEY: str = os.getenv("SENDGRID_API_KEY", "")
     FROM_EMAIL: str = os.getenv("FROM_EMAIL", "noreply@bluepeak.ai")
 
-    # Rate Limiting
+    # Rate Limiting (LLM requests per period, enforced by the LLM scheduler)
     RATE_LIMIT_REQUESTS: int = int(os.getenv("RATE_LIMIT_REQUESTS", 100))
     RATE_LIMIT_PERIOD: int = int(os.getenv("RATE_LIMIT_PERIOD", 60))
+    LLM_MAX_IN_FLIGHT: int = int(os.getenv("LLM_MAX_IN_FLIGHT", 8))
+    LLM_TOKENS_PER_MINUTE: int = int(os.getenv("LLM_TOKENS_PER_MINUTE", 80000))
+    LLM_RETRY_ATTEMPTS: int = int(os.getenv("LLM_RETRY_ATTEMPTS", 5))
+    LLM_RETRY_BASE_SECONDS: float = float(os.getenv("LLM_RETRY_BASE_SECONDS", 1))
+    LLM_RETRY_MAX_SECONDS: float = float(os.getenv("LLM_RETRY_MAX_SECONDS", 60))
 
     # CORS
     CORS_ORIGINS: List[str] = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:8000").split(",")
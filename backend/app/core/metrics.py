@@ -0,0 +1,99 @@
+"""
+Lightweight in-process latency and token usage metrics
+"""
+from collections import deque
+from typing import Any, Dict, List
+
+
+class LatencyTracker:
+    """Rolling window of latency samples (milliseconds) with percentile summaries"""
+
+    def __init__(self, name: str, window: int = 500):
+        self.name = name
+        self.samples: deque = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, value_ms: float):
+        """Add a latency sample"""
+        self.samples.append(value_ms)
+        self.count += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Return count, mean and p50/p95/max over the current window"""
+        if not self.samples:
+            return {"name": self.name, "count": self.count, "window": 0}
+
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return {
+            "name": self.name,
+            "count": self.count,
+            "window": len(ordered),
+            "mean_ms": round(sum(ordered) / len(ordered), 1),
+            "p50_ms": round(ordered[int(last * 0.5)], 1),
+            "p95_ms": round(ordered[int(last * 0.95)], 1),
+            "max_ms": round(ordered[-1], 1)
+        }
+
+
+_trackers: Dict[str, LatencyTracker] = {}
+
+
+def latency_tracker(name: str) -> LatencyTracker:
+    """Get (or create) the process-wide tracker with this name"""
+    if name not in _trackers:
+        _trackers[name] = LatencyTracker(name)
+    return _trackers[name]
+
+
+def latency_summaries() -> List[Dict[str, Any]]:
+    """Summaries of every registered tracker"""
+    return [tracker.summary() for tracker in _trackers.values()]
+
+
+class TokenUsage:
+    """Cumulative LLM token counts for one agent, split by prompt cache outcome"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.input_tokens = 0  # uncached input
+        self.cache_read_input_tokens = 0
+        self.cache_creation_input_tokens = 0
+        self.output_tokens = 0
+
+    def record(self, input_tokens: int, output_tokens: int, cache_read: int = 0, cache_creation: int = 0):
+        """Add one call's usage"""
+        self.calls += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cache_read_input_tokens += cache_read
+        self.cache_creation_input_tokens += cache_creation
+
+    def summary(self) -> Dict[str, Any]:
+        """Return totals and the share of input tokens served from the prompt cache"""
+        total_input = self.input_tokens + self.cache_read_input_tokens + self.cache_creation_input_tokens
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "input_tokens": self.input_tokens,
+            "cache_read_input_tokens": self.cache_read_input_tokens,
+            "cache_creation_input_tokens": self.cache_creation_input_tokens,
+            "output_tokens": self.output_tokens,
+            "cached_input_ratio": round(self.cache_read_input_tokens / total_input, 4) if total_input else 0.0
+        }
+
+
+_usage: Dict[str, TokenUsage] = {}
+
+
+def token_usage(name: str) -> TokenUsage:
+    """Get (or create) the process-wide token counter with this name"""
+    if name not in _usage:
+        _usage[name] = TokenUsage(name)
+    return _usage[name]
+
+
+def token_usage_summaries() -> List[Dict[str, Any]]:
+    """Summaries of every registered token counter"""
+    return [usage.summary() for usage in _usage.values()]
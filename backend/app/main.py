@@ -6,8 +6,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.core.config import settings
 from app.core.logger import app_logger
-from app.api.endpoints import competitors, trends, chat, reports, integrations, analytics, social_sharing
+from app.api.endpoints import competitors, trends, chat, reports, integrations, analytics, social_sharing, system, jobs, workflows
 from app.api.websocket import websocket_router
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.services.jobs import job_workers
+from app.services.llm_clients import llm_clients
+from app.services.vector_store import vector_store
+from app.services.vector_sync import vector_sync
+from database.supabase_client import supabase_client
+import asyncio
 
 
 # Create FastAPI app
@@ -26,6 +33,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 # Include routers
@@ -64,6 +72,21 @@ app.include_router(
     prefix=f"{settings.API_PREFIX}/social-sharing",
     tags=["social-sharing"]
 )
+app.include_router(
+    system.router,
+    prefix=f"{settings.API_PREFIX}/system",
+    tags=["system"]
+)
+app.include_router(
+    jobs.router,
+    prefix=f"{settings.API_PREFIX}/jobs",
+    tags=["jobs"]
+)
+app.include_router(
+    workflows.router,
+    prefix=f"{settings.API_PREFIX}/workflows",
+    tags=["workflows"]
+)
 app.include_router(
     websocket_router,
     prefix="/ws",
@@ -107,11 +130,30 @@ async def startup_event():
     app_logger.info(f"Environment: {settings.ENVIRONMENT}")
     app_logger.info(f"API Prefix: {settings.API_PREFIX}")
 
+    # Load Chroma and the embedding model off the request path once serving starts
+    if settings.VECTOR_STORE_WARMUP:
+        app.state.vector_store_warmup = asyncio.create_task(vector_store.warm_up())
+
+    # Index rows created or changed since the last run, then follow new writes.
+    # Encoding needs the model, so the first cycle waits for warm-up (or first use) to load it
+    if settings.VECTOR_SYNC_ENABLED:
+        vector_sync.start(wait_for_model=True)
+
+    # Run queued background jobs (reports, automated analyses, batches) in this process
+    if settings.JOB_WORKER_ENABLED:
+        job_workers.start()
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Shutdown tasks"""
     app_logger.info(f"Shutting down {settings.APP_NAME}")
+    await job_workers.stop()
+    await vector_sync.stop()
+    await supabase_client.close()
+    await llm_clients.close()
+    if vector_store.is_loaded:
+        await asyncio.to_thread(vector_store.close)
 
 
 @app.exception_handler(Exception)
@@ -20,6 +20,14 @@ class TrendStatus(str, Enum):
     STABLE = "stable"
 
 
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
 class SentimentType(str, Enum):
     POSITIVE = "positive"
     NEGATIVE = "negative"
@@ -61,6 +69,15 @@ class CompetitorResponse(CompetitorBase):
         from_attributes = True
 
 
+class CompetitorBatchRequest(BaseModel):
+    """Competitors to analyze in one batch: explicit ids, or every competitor matching the filters"""
+    competitor_ids: Optional[List[str]] = None
+    status: Optional[CompetitorStatus] = None
+    industry: Optional[str] = None
+    analysis_type: str = "comprehensive"
+    fresh: bool = False
+
+
 # Trend Models
 class TrendBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=255)
@@ -183,8 +200,72 @@ class AnalyticsMetrics(BaseModel):
     top_industries: List[Dict[str, Any]] = []
 
 
+# Background Job Models
+class JobResponse(BaseModel):
+    id: str
+    job_type: str
+    status: JobStatus
+    payload: Dict[str, Any] = {}
+    progress: Dict[str, Any] = {}
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    max_attempts: int = 1
+    cancel_requested: bool = False
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class JobAccepted(BaseModel):
+    """Returned with 202 Accepted by endpoints that hand work to the job queue"""
+    job_id: str
+    job_type: str
+    status: JobStatus
+    status_url: str
+
+
 # WebSocket Models
 class WSMessage(BaseModel):
     type: str
     data: Dict[str, Any]
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+
+# Structured Agent Output Models
+class RAGAnswer(BaseModel):
+    """Answer to a research query, grounded in the knowledge base context"""
+    answer: str = Field("", description="Comprehensive answer, citing context documents by their [number]")
+    suggested_actions: List[str] = Field([], description="Follow-up suggestions")
+    related_topics: List[str] = Field([], description="Related topics to explore")
+    confidence: float = Field(0.7, description="Confidence in the answer from 0 to 1")
+
+
+class EmergingTrend(BaseModel):
+    name: str
+    description: str = ""
+    evidence: List[str] = Field([], description="Signals in the data supporting the trend")
+    confidence_score: float = Field(0.5, description="Confidence from 0 to 1")
+    potential_impact: str = ""
+    keywords: List[str] = []
+
+
+class EmergingTrendList(BaseModel):
+    """Emerging trends identified in market data"""
+    trends: List[EmergingTrend] = []
+
+
+class Influencer(BaseModel):
+    handle: str = Field(..., description="Name or handle")
+    platform: str = ""
+    estimated_followers: Optional[int] = None
+    engagement_rate: Optional[float] = Field(None, description="Engagement rate as a fraction, e.g. 0.035")
+    influence_score: Optional[float] = Field(None, description="Influence score from 0 to 100")
+    content_focus: str = ""
+    engagement_recommendation: str = ""
+
+
+class InfluencerList(BaseModel):
+    """Key influencers identified in social mentions"""
+    influencers: List[Influencer] = []
@@ -0,0 +1,59 @@
+"""
+Token-aware sliding-window chunking for long documents
+
+Windows are measured in the embedding model's own tokens, so a chunk never
+exceeds what the encoder would otherwise silently truncate. Each window
+overlaps the previous one so sentences that straddle a boundary are still
+retrievable from one chunk.
+"""
+from typing import Any, List, Optional, Tuple
+import re
+
+WORD_PATTERN = re.compile(r"\S+")
+
+Span = Tuple[int, int]
+
+
+def token_spans(text: str, tokenizer: Optional[Any] = None) -> List[Span]:
+    """
+    Character spans of each token in text
+
+    Uses a fast Hugging Face tokenizer's offset mapping when given one,
+    otherwise whitespace-separated words.
+    """
+    if tokenizer is not None:
+        try:
+            encoded = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+            return [tuple(span) for span in encoded["offset_mapping"]]
+        except Exception:
+            pass  # slow tokenizers have no offset mapping
+
+    return [match.span() for match in WORD_PATTERN.finditer(text)]
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int,
+    overlap_tokens: int,
+    tokenizer: Optional[Any] = None
+) -> List[str]:
+    """
+    Split text into windows of at most max_tokens tokens
+
+    Consecutive windows share overlap_tokens tokens. Text that fits in one
+    window comes back as a single chunk; empty text gives no chunks.
+    """
+    spans = token_spans(text, tokenizer)
+    if not spans:
+        return []
+    if len(spans) <= max_tokens:
+        return [text.strip()]
+
+    step = max(1, max_tokens - overlap_tokens)
+    chunks = []
+    for start in range(0, len(spans), step):
+        window = spans[start:start + max_tokens]
+        chunks.append(text[window[0][0]:window[-1][1]].strip())
+        if start + max_tokens >= len(spans):
+            break
+    return chunks
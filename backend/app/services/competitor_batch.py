@@ -0,0 +1,150 @@
+"""
+Batch competitor analysis
+
+An analyze_competitor_batch job runs CompetitiveIntelligenceAgent.execute
+over a list of competitors with at most COMPETITOR_BATCH_CONCURRENCY
+analyses in flight. Each result is stored as a research finding whose id is
+derived from (job id, competitor id), so a competitor analyzed twice (after
+a crash between the write and the progress save) overwrites its finding
+instead of duplicating it.
+
+Every competitor's outcome is saved to the job's progress as soon as it is
+known. When a job is resumed by another worker (or after a restart), only
+competitors without a recorded outcome are analyzed again. An attempt may
+run for as long as the batch needs at COMPETITOR_BATCH_CONCURRENCY (never
+less than JOB_TIMEOUT_SECONDS), and one that still times out is resumed
+without using up a retry as long as it recorded new outcomes. Progress is
+broadcast over /ws/updates as competitor_batch_progress messages, followed
+by one competitor_batch_complete message.
+"""
+from datetime import datetime
+from typing import Any, Dict
+from agents.base_agent import require_success
+from agents.competitive_intelligence import CompetitiveIntelligenceAgent
+from agents.registry import get_agent
+from app.api.websocket.realtime import broadcast_update
+from app.core.concurrency import gather_bounded
+from app.core.config import settings
+from app.core.logger import app_logger
+from app.services.jobs import JobContext, job_workers
+from database.supabase_client import supabase_client
+import asyncio
+import math
+import uuid
+
+JOB_TYPE = "analyze_competitor_batch"
+
+ci_agent = get_agent(CompetitiveIntelligenceAgent)
+
+
+def finding_id(batch_id: str, competitor_id: str) -> str:
+    """Stable finding id for one competitor's result within a batch"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"competitor-batch/{batch_id}/{competitor_id}"))
+
+
+def batch_summary(job_id: str, progress: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "batch_id": job_id,
+        "completed": progress.get("completed", 0),
+        "failed": progress.get("failed", 0),
+        "total": progress.get("total", 0)
+    }
+
+
+async def record_outcome(job: JobContext, competitor_id: str, outcome: Dict[str, Any]):
+    """Persist one competitor's outcome and broadcast progress"""
+    results = job.progress.setdefault("results", {})
+    if competitor_id in results:
+        return
+    results[competitor_id] = outcome
+    job.progress[outcome["status"]] = job.progress.get(outcome["status"], 0) + 1
+    await job.save_progress()
+
+    await broadcast_update("competitor_batch_progress", {
+        **batch_summary(job.id, job.progress),
+        "competitor_id": competitor_id,
+        "status": outcome["status"],
+        "error": outcome.get("error")
+    })
+
+
+async def analyze_one(job: JobContext, payload: Dict[str, Any], competitor_id: str):
+    try:
+        competitor = await supabase_client.get_competitor_by_id(competitor_id)
+        if not competitor:
+            await record_outcome(job, competitor_id, {"status": "failed", "error": "Competitor not found"})
+            return
+
+        analysis_type = payload.get("analysis_type", "comprehensive")
+        # A failed analysis raises before anything is stored, so the competitor is recorded as failed
+        analysis = require_success(await ci_agent.execute({
+            "competitor_data": competitor,
+            "analysis_type": analysis_type,
+            "fresh": payload.get("fresh", False)
+        }))
+
+        finding = await supabase_client.upsert_finding({
+            "id": finding_id(job.id, competitor_id),
+            "competitor_id": competitor_id,
+            "finding_type": "competitor_analysis",
+            "title": f"{analysis_type.title()} Analysis: {competitor['name']}"[:255],
+            "content": analysis["content"],
+            "source_url": None,
+            "sentiment": "neutral",
+            "importance_score": 0.8,
+            "metadata": {
+                "batch_id": job.id,
+                "analysis_type": analysis_type,
+                "agent": analysis.get("agent")
+            },
+            "created_at": datetime.utcnow().isoformat()
+        })
+        if not finding:
+            raise RuntimeError("Failed to store analysis finding")
+
+        await supabase_client.update_competitor(
+            competitor_id,
+            {"last_analyzed": datetime.utcnow().isoformat()}
+        )
+        await record_outcome(job, competitor_id, {"status": "completed", "finding_id": finding["id"]})
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        app_logger.warning(f"Competitor batch {job.id}: analysis of {competitor_id} failed: {e}")
+        await record_outcome(job, competitor_id, {"status": "failed", "error": str(e)})
+
+
+def batch_timeout(payload: Dict[str, Any]) -> float:
+    """Time for one attempt: every competitor's analysis at the batch concurrency, with some slack"""
+    rounds = math.ceil(len(payload.get("competitor_ids", [])) / max(1, settings.COMPETITOR_BATCH_CONCURRENCY))
+    return max(settings.JOB_TIMEOUT_SECONDS, rounds * settings.AGENT_TASK_TIMEOUT_SECONDS * 1.25)
+
+
+@job_workers.handler(JOB_TYPE, timeout=batch_timeout)
+async def run_competitor_batch(payload: Dict[str, Any], job: JobContext) -> Dict[str, Any]:
+    """Analyze every competitor in the payload that has no recorded outcome yet"""
+    competitor_ids = list(dict.fromkeys(payload.get("competitor_ids", [])))
+    results = job.progress.get("results", {})
+    pending = [cid for cid in competitor_ids if cid not in results]
+
+    job.progress["total"] = len(competitor_ids)
+    await job.save_progress()
+    app_logger.info(f"Competitor batch {job.id}: {len(pending)} of {len(competitor_ids)} competitors to analyze")
+
+    outcomes = await gather_bounded(
+        [lambda cid=cid: analyze_one(job, payload, cid) for cid in pending],
+        limit=settings.COMPETITOR_BATCH_CONCURRENCY,
+        timeout=settings.AGENT_TASK_TIMEOUT_SECONDS
+    )
+    for competitor_id, outcome in zip(pending, outcomes):
+        if isinstance(outcome, asyncio.CancelledError):
+            raise outcome
+        if isinstance(outcome, BaseException):
+            # Timed out (or failed outside analyze_one); record it so a resume does not retry forever
+            error = "timeout" if isinstance(outcome, asyncio.TimeoutError) else str(outcome)
+            await record_outcome(job, competitor_id, {"status": "failed", "error": error})
+
+    summary = batch_summary(job.id, job.progress)
+    await broadcast_update("competitor_batch_complete", summary)
+    app_logger.info(f"Competitor batch {job.id} done: {summary['completed']} analyzed, {summary['failed']} failed")
+    return {**summary, "results": job.progress.get("results", {})}
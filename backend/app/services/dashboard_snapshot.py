@@ -0,0 +1,147 @@
+"""
+Precomputed dashboard snapshot
+
+The dashboard document is built once and served from memory. Writes that go
+through SupabaseClient mark only the affected sections dirty, and the next
+read rebuilds just those sections. A staleness bound covers writes made by
+other workers or directly in the database.
+
+Section loaders raise on database errors. A section that fails to load
+keeps its previous contents and stays dirty, so the next read retries it;
+an error is never cached as an empty section.
+"""
+from typing import Any, Dict, List, Optional, Set
+from fastapi.encoders import jsonable_encoder
+from app.core.config import settings
+from app.core.logger import app_logger
+from app.models.schemas import AnalyticsMetrics
+from database.supabase_client import supabase_client
+from datetime import datetime
+import asyncio
+import hashlib
+import json
+import time
+
+# Snapshot sections affected by writes to each table
+SECTIONS_BY_TABLE = {
+    "competitors": {"metrics", "recent_competitors"},
+    "trends": {"metrics", "trending_topics"},
+    "research_findings": {"metrics", "recent_findings"},
+    "reports": {"metrics"},
+}
+ALL_SECTIONS = {"metrics", "recent_competitors", "trending_topics", "recent_findings"}
+
+
+def _analytics_metrics(aggregates: Optional[Dict[str, Any]]) -> AnalyticsMetrics:
+    if not aggregates:
+        return AnalyticsMetrics(
+            sentiment_breakdown={"positive": 0, "neutral": 0, "negative": 0}
+        )
+    return AnalyticsMetrics(**aggregates)
+
+
+async def load_analytics_metrics() -> AnalyticsMetrics:
+    """Load dashboard aggregates, falling back to zeros if the database is unavailable"""
+    return _analytics_metrics(await supabase_client.get_analytics_metrics())
+
+
+async def load_snapshot_metrics() -> AnalyticsMetrics:
+    """Load dashboard aggregates for the snapshot; raises if the database is unavailable"""
+    return _analytics_metrics(await supabase_client.fetch_analytics_metrics())
+
+
+class DashboardSnapshot:
+    """In-process dashboard document with per-section incremental refresh"""
+
+    def __init__(self, max_age_seconds: int = 60):
+        self.max_age_seconds = max_age_seconds
+        self._sections: Dict[str, Any] = {}
+        self._dirty: Set[str] = set(ALL_SECTIONS)
+        self._built_at = 0.0
+        self._timestamp: Optional[str] = None
+        self._etag: Optional[str] = None
+        self._lock = asyncio.Lock()
+        self.refreshes = 0
+
+    def mark_dirty(self, table: str, rows: Optional[List[Dict[str, Any]]] = None):
+        """Write listener: flag the sections that depend on `table`"""
+        self._dirty |= SECTIONS_BY_TABLE.get(table, set())
+
+    async def get(self) -> Dict[str, Any]:
+        """Return the current snapshot as {"document", "etag"}, refreshing if needed"""
+        if self._needs_refresh():
+            async with self._lock:
+                # Another request may have refreshed while we waited
+                if self._needs_refresh():
+                    await self._refresh()
+
+        return {
+            "document": {**self._sections, "timestamp": self._timestamp},
+            "etag": self._etag
+        }
+
+    def _needs_refresh(self) -> bool:
+        expired = time.monotonic() - self._built_at > self.max_age_seconds
+        return expired or bool(self._dirty)
+
+    async def _refresh(self):
+        """
+        Rebuild dirty sections (all of them once the snapshot has expired)
+
+        Sections that fail to load keep their previous contents and stay
+        dirty. Raises only if a failed section has never been loaded.
+        """
+        expired = time.monotonic() - self._built_at > self.max_age_seconds
+        sections = set(ALL_SECTIONS) if expired else set(self._dirty)
+        # Cleared up front so writes made while loading mark their sections dirty again
+        self._dirty -= sections
+
+        loaders = {
+            "metrics": load_snapshot_metrics,
+            "recent_competitors": lambda: supabase_client.get_latest_rows("competitors", 5),
+            "trending_topics": lambda: supabase_client.get_latest_rows("trends", 5),
+            "recent_findings": lambda: supabase_client.get_latest_rows("research_findings", 10),
+        }
+        names = sorted(sections)
+        try:
+            results = await asyncio.gather(*(loaders[name]() for name in names), return_exceptions=True)
+        except BaseException:
+            self._dirty |= sections
+            raise
+
+        failed = {name: result for name, result in zip(names, results) if isinstance(result, BaseException)}
+        loaded = {name: result for name, result in zip(names, results) if name not in failed}
+        self._sections.update(jsonable_encoder(loaded))
+        if expired:
+            self._built_at = time.monotonic()
+
+        if loaded:
+            self._timestamp = datetime.utcnow().isoformat()
+
+            payload = json.dumps(self._sections, sort_keys=True, default=str)
+            self._etag = '"' + hashlib.sha1(payload.encode("utf-8")).hexdigest() + '"'
+            self.refreshes += 1
+
+            app_logger.debug(f"Dashboard snapshot refreshed sections: {', '.join(sorted(loaded))}")
+
+        if failed:
+            self._dirty |= set(failed)
+            app_logger.warning(
+                "Dashboard snapshot kept previous sections after load errors: "
+                + ", ".join(f"{name} ({error!r})" for name, error in sorted(failed.items()))
+            )
+            missing = [name for name in sorted(failed) if name not in self._sections]
+            if missing:
+                raise failed[missing[0]]
+
+    def etag_matches(self, if_none_match: Optional[str], etag: Optional[str]) -> bool:
+        """Check an If-None-Match header value against an ETag"""
+        if not if_none_match or not etag:
+            return False
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
+
+
+# Global instance
+dashboard_snapshot = DashboardSnapshot(max_age_seconds=settings.DASHBOARD_SNAPSHOT_MAX_AGE_SECONDS)
+supabase_client.add_write_listener(dashboard_snapshot.mark_dirty)
@@ -0,0 +1,177 @@
+"""
+Persistent embedding cache keyed by content hash
+
+Embeddings for one model live in a memory-mapped float32 matrix
+(`<model>.f32`) with an append-only key index (`<model>.keys`): line N of
+the index holds the hash of the text embedded in row N. Keys are a sha1 of
+the model name and the whitespace-normalized text, so unchanged text is
+never sent to the encoder twice, across restarts and processes that share
+the directory.
+
+Appends are serialized across processes with an exclusive flock on the key
+index. Under the lock a writer first indexes keys other processes appended
+since its last read, and numbers its new rows from the on-disk key count, so
+two writers never claim the same row. Readers pick up other processes'
+entries on their next write (until then those texts are simply misses).
+"""
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+from app.core.logger import app_logger
+import hashlib
+import numpy as np
+import re
+import threading
+import unicodedata
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; the cache is then only safe for a single process
+    fcntl = None
+
+KEY_LENGTH = 40  # hex sha1
+
+
+class EmbeddingCache:
+    """Disk-backed text -> embedding cache for a single model"""
+
+    def __init__(self, directory: str, model_name: str, dimension: int, initial_capacity: int = 1024):
+        self.model_name = model_name
+        self.dimension = dimension
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        slug = re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+        root = Path(directory)
+        root.mkdir(parents=True, exist_ok=True)
+        self.matrix_path = root / f"{slug}.f32"
+        self.keys_path = root / f"{slug}.keys"
+
+        # Line N of the key file is row N; _rows counts lines read so far
+        self._index: Dict[str, int] = {}
+        self._rows = 0
+        self._keys_read = 0
+        self._capacity = 0
+        self._matrix: Optional[np.memmap] = None
+
+        with self._locked_keys() as keys_file:
+            self._read_new_keys(keys_file)
+
+            # Rows past the last key (an interrupted write) are simply reused
+            row_bytes = self.dimension * 4
+            existing_rows = self.matrix_path.stat().st_size // row_bytes if self.matrix_path.exists() else 0
+            if existing_rows < self._rows:
+                app_logger.warning(f"Embedding cache for {model_name} is truncated; starting empty")
+                keys_file.truncate(0)
+                self._index, self._rows, self._keys_read = {}, 0, 0
+
+            self._grow(max(existing_rows, self._rows, initial_capacity))
+
+        app_logger.info(f"Embedding cache for {model_name} loaded with {len(self._index)} entries")
+
+    def key(self, text: str) -> str:
+        """Cache key for a text under this cache's model"""
+        normalized = " ".join(unicodedata.normalize("NFC", text).split())
+        return hashlib.sha1(f"{self.model_name}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up texts; cached rows are returned as float32 vectors, misses as None"""
+        keys = [self.key(text) for text in texts]
+        with self._lock:
+            rows = [self._index.get(key) for key in keys]
+            found = [None if row is None else np.array(self._matrix[row]) for row in rows]
+
+        hits = sum(1 for vector in found if vector is not None)
+        self.hits += hits
+        self.misses += len(found) - hits
+        return found
+
+    def put_many(self, texts: List[str], embeddings: np.ndarray):
+        """Store embeddings (one row per text) for texts not already cached"""
+        with self._lock, self._locked_keys() as keys_file:
+            self._read_new_keys(keys_file, terminate=True)
+            new_keys = []
+
+            for text, vector in zip(texts, embeddings):
+                key = self.key(text)
+                if key in self._index:
+                    continue
+
+                row = self._rows + len(new_keys)
+                if row >= self._capacity:
+                    self._grow(self._capacity * 2)
+                self._matrix[row] = vector
+                self._index[key] = row
+                new_keys.append(key)
+
+            if new_keys:
+                # Rows are flushed before their keys so every indexed row is complete
+                self._matrix.flush()
+                keys_file.write("".join(f"{key}\n" for key in new_keys).encode("ascii"))
+                keys_file.flush()
+                self._rows += len(new_keys)
+                self._keys_read = keys_file.tell()
+
+    @contextmanager
+    def _locked_keys(self) -> Iterator[BinaryIO]:
+        """Open the key index holding the cross-process append lock"""
+        with open(self.keys_path, "a+b") as keys_file:
+            if fcntl:
+                fcntl.flock(keys_file.fileno(), fcntl.LOCK_EX)
+            yield keys_file  # closing the file releases the lock
+
+    def _read_new_keys(self, keys_file: BinaryIO, terminate: bool = False):
+        """
+        Index key lines appended since the last read; the caller holds the lock
+
+        With `terminate`, a trailing partial line (left by a writer that died
+        mid-append) is ended so it occupies its row and later keys stay aligned.
+        """
+        size = keys_file.seek(0, 2)
+        if size < self._keys_read:
+            # Reset by another process that found the matrix truncated
+            self._index, self._rows, self._keys_read = {}, 0, 0
+
+        keys_file.seek(self._keys_read)
+        data = keys_file.read()
+        complete = data.rfind(b"\n") + 1
+        for line in data[:complete].splitlines():
+            if len(line) == KEY_LENGTH:
+                self._index.setdefault(line.decode("ascii"), self._rows)
+            self._rows += 1
+        self._keys_read += complete
+
+        if terminate and complete < len(data):
+            keys_file.write(b"\n")
+            self._rows += 1
+            self._keys_read = size + 1
+
+        if self._rows > self._capacity and self._matrix is not None:
+            self._grow(max(self._rows, self._capacity * 2))
+
+    def _grow(self, capacity: int):
+        """Extend the matrix file to `capacity` rows and remap it"""
+        if self._matrix is not None:
+            self._matrix.flush()
+            del self._matrix
+
+        with open(self.matrix_path, "ab") as matrix_file:
+            matrix_file.truncate(max(capacity * self.dimension * 4, self.matrix_path.stat().st_size))
+
+        self._capacity = capacity
+        self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, hit rate and on-disk size"""
+        lookups = self.hits + self.misses
+        bytes_on_disk = sum(path.stat().st_size for path in (self.matrix_path, self.keys_path) if path.exists())
+        return {
+            "model": self.model_name,
+            "entries": len(self._index),
+            "capacity": self._capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "bytes_on_disk": bytes_on_disk
+        }
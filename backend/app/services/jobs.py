@@ -0,0 +1,410 @@
+"""
+Durable background jobs
+
+Long-running agent work (report generation, automated analyses, trend
+discovery, competitor batches) is queued in the Postgres jobs table instead
+of running inside the request handler: the endpoint inserts a job, returns
+202 with its id, and a worker pool runs it. Clients follow the job at
+GET /jobs/{job_id} or through job_update messages on /ws/updates.
+
+Workers claim jobs through the claim_jobs database function (FOR UPDATE
+SKIP LOCKED), which leases a job to one worker for JOB_LEASE_SECONDS. The
+lease is renewed while the handler runs; if the worker dies the lease
+lapses and another worker picks the job up again. Every write a worker
+makes to a job it claimed is conditional on still holding that claim, and a
+worker that cannot renew for a whole lease abandons the job, so a worker
+cut off from the database never overwrites the outcome of whoever re-claimed
+it. Handlers should therefore be
+idempotent or record progress (JobContext.save_progress) to resume from:
+rows a job creates get ids from JobContext.stable_id and are written with
+upserts, and one-off side effects (notifications, counter bumps) are
+recorded in progress and skipped on later attempts.
+Failed jobs are retried with exponential backoff up to their max_attempts.
+A handler runs for at most JOB_TIMEOUT_SECONDS unless it registers its own
+timeout (e.g. scaled to the payload's batch size). An attempt that times
+out after advancing its progress is requeued at once without counting
+against max_attempts, so long resumable jobs are not failed while they are
+still making headway.
+Cancellation sets cancel_requested, which the owning worker notices on its
+next lease renewal and turns into a task cancellation.
+
+The pool runs inside the API process (JOB_WORKER_ENABLED) or standalone via
+scripts/run_job_worker.py; any number of either may share one queue.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from app.api.websocket.realtime import broadcast_update
+from app.core.config import settings
+from app.core.logger import app_logger
+from app.services.llm_scheduler import PRIORITY_BATCH, PRIORITY_NORMAL, set_llm_priority
+from database.supabase_client import supabase_client
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+
+def _jsonable(value: Any) -> Any:
+    """Round-trip through JSON so results with datetimes etc. fit a JSONB column"""
+    return json.loads(json.dumps(value, default=str))
+
+
+class JobContext:
+    """What a running handler knows about its job, plus progress persistence"""
+
+    def __init__(self, job: Dict[str, Any], worker_id: Optional[str] = None):
+        self.job = job
+        self.id: str = job["id"]
+        self.attempt: int = job.get("attempts") or 1
+        self.progress: Dict[str, Any] = dict(job.get("progress") or {})
+        self.worker_id = worker_id
+        self._lock = asyncio.Lock()
+
+    def stable_id(self, name: str) -> str:
+        """Id for a record this job writes, the same on every attempt (write it with an upsert)"""
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"jobs/{self.id}/{name}"))
+
+    async def save_progress(self, **updates: Any):
+        """Merge updates into the job's progress and persist it (serialized, so saves never regress)"""
+        self.progress.update(updates)
+        async with self._lock:
+            try:
+                if self.worker_id:
+                    # Only while the claim is still ours, so a stale worker never overwrites the new owner's progress
+                    saved = await supabase_client.update_job(
+                        self.id, {"progress": _jsonable(self.progress)},
+                        status="running", locked_by=self.worker_id, attempts=self.job.get("attempts")
+                    )
+                    if saved is None:
+                        app_logger.warning(f"Not saving progress for job {self.id}: its lease was lost")
+                else:
+                    await supabase_client.update_job(self.id, {"progress": _jsonable(self.progress)})
+            except Exception as e:
+                app_logger.warning(f"Could not save progress for job {self.id}: {e}")
+
+
+JobHandler = Callable[[Dict[str, Any], JobContext], Awaitable[Any]]
+# payload -> seconds one attempt may run
+JobTimeout = Callable[[Dict[str, Any]], float]
+
+
+class JobWorkerPool:
+    """Queue front-end and worker pool for background jobs"""
+
+    def __init__(
+        self,
+        workers: int = settings.JOB_WORKERS,
+        poll_interval_seconds: float = settings.JOB_POLL_INTERVAL_SECONDS,
+        lease_seconds: int = settings.JOB_LEASE_SECONDS,
+        max_attempts: int = settings.JOB_MAX_ATTEMPTS,
+        retry_base_seconds: float = settings.JOB_RETRY_BASE_SECONDS,
+        timeout_seconds: float = settings.JOB_TIMEOUT_SECONDS
+    ):
+        self.workers = max(1, workers)
+        self.poll_interval_seconds = poll_interval_seconds
+        self.lease_seconds = max(10, lease_seconds)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base_seconds = retry_base_seconds
+        self.timeout_seconds = timeout_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self.handlers: Dict[str, JobHandler] = {}
+        self.timeouts: Dict[str, JobTimeout] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._workers: List[asyncio.Task] = []
+        self._wake = asyncio.Event()
+        self._stopping = False
+
+        self.counts = {"completed": 0, "failed": 0, "cancelled": 0, "retried": 0}
+
+    def handler(self, job_type: str, timeout: Optional[JobTimeout] = None) -> Callable[[JobHandler], JobHandler]:
+        """
+        Decorator registering the coroutine that runs jobs of `job_type`;
+        `timeout` computes an attempt's time limit from the payload
+        (default JOB_TIMEOUT_SECONDS)
+        """
+        def register(func: JobHandler) -> JobHandler:
+            self.handlers[job_type] = func
+            if timeout:
+                self.timeouts[job_type] = timeout
+            return func
+        return register
+
+    # Queue
+
+    async def enqueue(
+        self,
+        job_type: str,
+        payload: Dict[str, Any],
+        priority: int = PRIORITY_NORMAL,
+        max_attempts: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Insert a queued job; returns the stored row, or None if the queue is unavailable"""
+        if job_type not in self.handlers:
+            raise ValueError(f"No handler registered for job type {job_type}")
+
+        job = await supabase_client.create_job({
+            "id": str(uuid.uuid4()),
+            "job_type": job_type,
+            "status": "queued",
+            "payload": _jsonable(payload),
+            "progress": {},
+            "priority": priority,
+            "max_attempts": max_attempts or self.max_attempts,
+            "run_after": _now().isoformat(),
+            "created_at": _now().isoformat()
+        })
+        if job:
+            self._wake.set()
+            await self._broadcast(job)
+        return job
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job: queued jobs stop immediately, running ones at the owning
+        worker's next lease renewal (at once if it runs in this process)
+        """
+        job = await supabase_client.get_job(job_id)
+        if not job or job["status"] in TERMINAL_STATUSES:
+            return job
+
+        if job["status"] == "queued":
+            cancelled = await supabase_client.update_job(
+                job_id, {"status": "cancelled", "finished_at": _now().isoformat(), "cancel_requested": True}, status="queued"
+            )
+            if cancelled:
+                self.counts["cancelled"] += 1
+                await self._broadcast(cancelled)
+                return cancelled
+            # Claimed in the meantime; fall through and cancel it as a running job
+
+        job = await supabase_client.update_job(job_id, {"cancel_requested": True}) or job
+        task = self._running.get(job_id)
+        if task:
+            task.cancel()
+        return job
+
+    # Workers
+
+    async def _worker(self, index: int):
+        while True:
+            self._wake.clear()
+            try:
+                jobs = await supabase_client.claim_jobs(
+                    self.worker_id, list(self.handlers), limit=1, lease_seconds=self.lease_seconds
+                )
+            except Exception as e:
+                app_logger.error(f"Job worker {index} could not claim jobs: {e}")
+                jobs = []
+
+            if jobs:
+                await self._execute(jobs[0])
+                continue
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _execute(self, job: Dict[str, Any]):
+        job_id = job["id"]
+        if job.get("cancel_requested"):
+            await self._finish(job, "cancelled")
+            return
+        if job.get("attempts", 1) > job.get("max_attempts", self.max_attempts):
+            # Reclaimed after its worker died on the final attempt
+            await self._finish(job, "failed", error=job.get("error") or "Worker lost during final attempt")
+            return
+
+        handler = self.handlers[job["job_type"]]
+        payload = job.get("payload") or {}
+        timeout = self.timeouts[job["job_type"]](payload) if job["job_type"] in self.timeouts else self.timeout_seconds
+        context = JobContext(job, self.worker_id)
+        initial_progress = _jsonable(context.progress)
+        app_logger.info(f"Running job {job_id} ({job['job_type']}, attempt {context.attempt})")
+        await self._broadcast(job)
+
+        # Background work never competes with interactive chat for LLM capacity
+        set_llm_priority(PRIORITY_BATCH)
+        task = asyncio.create_task(asyncio.wait_for(handler(payload, context), timeout=timeout))
+        self._running[job_id] = task
+        lease = {"lost": False}
+        heartbeat = asyncio.create_task(self._renew_lease(job, task, lease))
+
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if self._stopping:
+                # Shutting down: hand the job back so the next worker resumes it promptly
+                task.cancel()
+                await self._release(job)
+                raise
+            if not lease["lost"]:
+                await self._finish(job, "cancelled", progress=_jsonable(context.progress))
+        except Exception as e:
+            error = "Timed out" if isinstance(e, asyncio.TimeoutError) else str(e) or type(e).__name__
+            app_logger.error(f"Job {job_id} ({job['job_type']}) failed on attempt {context.attempt}: {error}")
+            if not lease["lost"]:
+                advanced = isinstance(e, asyncio.TimeoutError) and _jsonable(context.progress) != initial_progress
+                await self._retry_or_fail(job, error, context, resumable=advanced)
+        else:
+            if not lease["lost"]:
+                await self._finish(job, "completed", result=_jsonable(result), progress=_jsonable(context.progress))
+        finally:
+            heartbeat.cancel()
+            self._running.pop(job_id, None)
+
+    async def _update_claimed(self, job: Dict[str, Any], update: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update a job only while this worker still holds the claim it was given; None if it does not"""
+        return await supabase_client.update_job(
+            job["id"], update, status="running", locked_by=self.worker_id, attempts=job.get("attempts")
+        )
+
+    async def _renew_lease(self, job: Dict[str, Any], task: asyncio.Task, lease: Dict[str, bool]):
+        """Extend the lease while the handler runs; cancel it if cancellation was requested or the lease lost"""
+        job_id = job["id"]
+        renewed_at = time.monotonic()
+        while not task.done():
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                current = await self._update_claimed(
+                    job, {"locked_until": (_now() + timedelta(seconds=self.lease_seconds)).isoformat()}
+                )
+            except Exception as e:
+                if time.monotonic() - renewed_at < self.lease_seconds:
+                    app_logger.warning(f"Could not renew lease on job {job_id}: {e}")
+                    continue
+                # The lease has expired by now, so another worker may already own the job
+                app_logger.error(f"Could not renew lease on job {job_id} for {self.lease_seconds}s; abandoning it: {e}")
+                current = None
+
+            if current is None:
+                app_logger.warning(f"Lost the lease on job {job_id}; abandoning it")
+                lease["lost"] = True
+                task.cancel()
+                return
+            renewed_at = time.monotonic()
+            if current.get("cancel_requested"):
+                task.cancel()
+
+    async def _finish(self, job: Dict[str, Any], status: str, **fields: Any):
+        update = {
+            "status": status,
+            "finished_at": _now().isoformat(),
+            "locked_by": None,
+            "locked_until": None,
+            **{key: value for key, value in fields.items() if value is not None}
+        }
+        if status == "completed":
+            update["error"] = None  # left over from an earlier, retried attempt
+        try:
+            finished = await self._update_claimed(job, update)
+        except Exception as e:
+            app_logger.error(f"Could not record {status} for job {job['id']}: {e}")
+            return
+        if finished is None:
+            app_logger.warning(f"Lost the lease on job {job['id']}; not recording {status}")
+            return
+        job = finished
+        self.counts[status] += 1
+        await self._broadcast(job)
+
+    async def _retry_or_fail(self, job: Dict[str, Any], error: str, context: JobContext, resumable: bool = False):
+        """
+        Requeue a failed attempt with backoff, or fail the job once it is out
+        of attempts; a `resumable` attempt (timed out while making progress)
+        is requeued at once and does not use up an attempt
+        """
+        attempts = job.get("attempts", 1)
+        if not resumable and attempts >= job.get("max_attempts", self.max_attempts):
+            await self._finish(job, "failed", error=error, progress=_jsonable(context.progress))
+            return
+
+        delay = 0 if resumable else self.retry_base_seconds * 2 ** (attempts - 1)
+        update = {
+            "status": "queued",
+            "error": error,
+            "progress": _jsonable(context.progress),
+            "run_after": (_now() + timedelta(seconds=delay)).isoformat(),
+            "locked_by": None,
+            "locked_until": None
+        }
+        if resumable:
+            update["attempts"] = max(0, attempts - 1)
+        try:
+            requeued = await self._update_claimed(job, update)
+        except Exception as e:
+            app_logger.error(f"Could not requeue job {job['id']}: {e}")
+            return
+        if requeued is None:
+            app_logger.warning(f"Lost the lease on job {job['id']}; not requeueing it")
+            return
+        job = requeued
+        self.counts["retried"] += 1
+        await self._broadcast(job)
+
+    async def _release(self, job: Dict[str, Any]):
+        """Return an interrupted job to the queue without counting the attempt"""
+        try:
+            await self._update_claimed(job, {
+                "status": "queued",
+                "attempts": max(0, job.get("attempts", 1) - 1),
+                "run_after": _now().isoformat(),
+                "locked_by": None,
+                "locked_until": None
+            })
+        except Exception as e:
+            app_logger.error(f"Could not release job {job['id']}; it will be retried when its lease expires: {e}")
+
+    async def _broadcast(self, job: Dict[str, Any]):
+        await broadcast_update("job_update", {
+            "job_id": job["id"],
+            "job_type": job.get("job_type"),
+            "status": job.get("status"),
+            "progress": {key: value for key, value in (job.get("progress") or {}).items() if key != "results"},
+            "error": job.get("error")
+        })
+
+    # Lifecycle
+
+    def start(self, workers: Optional[int] = None):
+        """Start the worker tasks on the running loop"""
+        if not supabase_client.client:
+            app_logger.warning("Supabase client not initialized - job workers not started")
+            return
+        if self._workers:
+            return
+        self._stopping = False
+        count = workers or self.workers
+        self._workers = [asyncio.create_task(self._worker(index)) for index in range(count)]
+        app_logger.info(f"Started {count} job workers ({self.worker_id}) for: {', '.join(sorted(self.handlers))}")
+
+    async def stop(self):
+        """Stop the workers, returning jobs they were running to the queue"""
+        self._stopping = True
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> Dict[str, Any]:
+        """Worker identity, running jobs and outcome counters for this process"""
+        return {
+            "worker_id": self.worker_id,
+            "workers": len(self._workers),
+            "handlers": sorted(self.handlers),
+            "running_jobs": sorted(self._running),
+            **self.counts
+        }
+
+
+# Global instance
+job_workers = JobWorkerPool()
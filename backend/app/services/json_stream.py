@@ -0,0 +1,244 @@
+"""
+Incremental JSON parsing and cheap repair for LLM structured output
+
+IncrementalJSONParser consumes a JSON object as it is generated and reports
+each top-level field the moment its value is complete, plus the growing
+text of top-level string fields, so a caller can render an "answer" long
+before the rest of the object has arrived.
+
+repair_json fixes the usual ways model output falls short of valid JSON
+(markdown fences, prose around the object, trailing commas, output cut off
+mid-object) without another model call.
+"""
+from typing import Any, Dict, List, Tuple
+import json
+import re
+
+WHITESPACE = " \t\r\n"
+FENCE_PATTERN = re.compile(r"^```[a-zA-Z]*\s*|\s*```$")
+CLOSERS = {"{": "}", "[": "]"}
+DANGLING_KEY_PATTERN = re.compile(r'([{,])\s*"(?:[^"\\]|\\.)*"\s*$')
+
+# ("delta", field, text) for more of a string field, ("field", field, value) once a field is complete
+Event = Tuple[str, str, Any]
+
+
+def _decode_partial_string(raw: str) -> str:
+    """Decode the body of a JSON string that may end mid-escape"""
+    trailing = len(raw) - len(raw.rstrip("\\"))
+    if trailing % 2:
+        raw = raw[:-1]
+    unicode_escape = raw.rfind("\\u")
+    if unicode_escape >= 0 and len(raw) - unicode_escape < 6:
+        raw = raw[:unicode_escape]
+    try:
+        decoded = json.loads(f'"{raw}"')
+    except ValueError:
+        return ""
+    if decoded and "\ud800" <= decoded[-1] <= "\udbff":
+        decoded = decoded[:-1]  # first half of a surrogate pair
+    return decoded
+
+
+class IncrementalJSONParser:
+    """Streaming parser for one top-level JSON object"""
+
+    def __init__(self):
+        self.text = ""
+        self.fields: Dict[str, Any] = {}
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "root"  # root, key, colon, value, scalar, next, done
+        self._key = ""
+        self._token_start = 0
+        self._string_value = False
+        self._emitted = 0
+
+    @property
+    def done(self) -> bool:
+        return self._expect == "done"
+
+    def feed(self, chunk: str) -> List[Event]:
+        """Consume more text; return the events it completes"""
+        self.text += chunk
+        text = self.text
+        events: List[Event] = []
+
+        while self._pos < len(text) and not self.done:
+            char = text[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._close_string(events)
+                self._pos += 1
+                continue
+
+            if self._expect == "root":
+                if char == "{":
+                    self._depth = 1
+                    self._expect = "key"
+                self._pos += 1
+                continue
+
+            if self._depth > 1:
+                if char == '"':
+                    self._in_string = True
+                elif char in "{[":
+                    self._depth += 1
+                elif char in "}]":
+                    self._depth -= 1
+                    if self._depth == 1:
+                        self._finish_value(events, self._pos + 1)
+                self._pos += 1
+                continue
+
+            if self._expect == "scalar":
+                if char in ",}" or char in WHITESPACE:
+                    self._finish_value(events, self._pos)
+                    continue  # the delimiter is handled in the "next" state
+                self._pos += 1
+                continue
+
+            if char not in WHITESPACE:
+                self._advance(char)
+            self._pos += 1
+
+        if self._in_string and self._string_value:
+            self._emit_delta(events, _decode_partial_string(text[self._token_start + 1:self._pos]))
+        return events
+
+    def _advance(self, char: str):
+        """Structural character at the top level of the object"""
+        if self._expect == "key":
+            if char == '"':
+                self._in_string = True
+                self._token_start = self._pos
+            elif char == "}":
+                self._expect = "done"
+        elif self._expect == "colon":
+            if char == ":":
+                self._expect = "value"
+        elif self._expect == "value":
+            self._token_start = self._pos
+            if char == '"':
+                self._in_string = True
+                self._string_value = True
+                self._emitted = 0
+            elif char in "{[":
+                self._depth += 1
+            else:
+                self._expect = "scalar"
+        elif self._expect == "next":
+            if char == ",":
+                self._expect = "key"
+            elif char == "}":
+                self._expect = "done"
+
+    def _close_string(self, events: List[Event]):
+        raw = self.text[self._token_start:self._pos + 1]
+        if self._expect == "key":
+            self._key = json.loads(raw)
+            self._expect = "colon"
+        else:
+            self._emit_delta(events, json.loads(raw))
+            self._finish_value(events, self._pos + 1)
+
+    def _emit_delta(self, events: List[Event], decoded: str):
+        if len(decoded) > self._emitted:
+            events.append(("delta", self._key, decoded[self._emitted:]))
+            self._emitted = len(decoded)
+
+    def _finish_value(self, events: List[Event], end: int):
+        try:
+            value = json.loads(self.text[self._token_start:end])
+        except ValueError:
+            value = None
+        self.fields[self._key] = value
+        events.append(("field", self._key, value))
+        self._expect = "next"
+        self._string_value = False
+
+
+def repair_json(text: str) -> str:
+    """
+    Best-effort fix-up of almost-JSON model output
+
+    Strips code fences and any prose around the outermost object or array,
+    drops trailing commas, and closes strings and brackets left open by a
+    truncated response. Text inside strings is never altered.
+    """
+    cleaned = FENCE_PATTERN.sub("", text.strip())
+    starts = [index for index in (cleaned.find("{"), cleaned.find("[")) if index >= 0]
+    if not starts:
+        return cleaned
+    cleaned = cleaned[min(starts):]
+
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = escape = False
+
+    for char in cleaned:
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in CLOSERS:
+            stack.append(CLOSERS[char])
+        elif char in "}]":
+            _drop_trailing_comma(out)
+            if not stack:
+                break
+            stack.pop()
+            out.append(char)
+            if not stack:
+                break  # root closed; ignore anything after it
+            continue
+        out.append(char)
+
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+    if stack:
+        tail = "".join(out).rstrip()
+        if tail.endswith(":"):
+            tail += " null"
+        elif stack[-1] == "}":
+            # A key cut off before its value
+            dangling = DANGLING_KEY_PATTERN.search(tail)
+            if dangling:
+                tail = tail[:dangling.start()] + ("{" if dangling.group(1) == "{" else "")
+        tail = tail.rstrip().rstrip(",")
+        return tail + "".join(reversed(stack))
+    return "".join(out)
+
+
+def _drop_trailing_comma(out: List[str]):
+    while out and out[-1] in WHITESPACE:
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def parse_json(text: str) -> Any:
+    """json.loads, falling back to repair_json; raises ValueError if both fail"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return json.loads(repair_json(text))
@@ -0,0 +1,434 @@
+"""
+BM25 keyword index kept alongside the Chroma collections
+
+Exact terms such as competitor names, product SKUs and acronyms are poorly
+served by sentence embeddings, so each collection also gets an inverted
+index that can be queried without running the embedder.
+
+An index is stored as two files:
+    <name>.bm25      compacted snapshot: a JSON header (document ids, terms,
+                     postings offsets), document lengths as uint32, then each
+                     term's postings as varints (count, doc number deltas,
+                     term frequencies)
+    <name>.bm25.log  JSON lines for documents added or removed since the
+                     snapshot
+
+Updates go to memory and the log. The log is folded into a new snapshot
+once it passes `compact_every` entries, and on close(). Postings read from
+a snapshot are decoded lazily, the first time a query or update touches
+the term.
+
+Several processes may share an index (the API's vector sync alongside the
+backfill and sync scripts). Appends and compactions hold an exclusive flock
+on `<name>.bm25.lock`, and each first catches up with the files: a process
+replays log entries other processes appended since its last read, and
+reloads everything if another process wrote a new snapshot. So a compaction
+always includes every logged update, and the log stays in the order updates
+were applied. Searches catch up the same way when the files have changed.
+"""
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from app.core.logger import app_logger
+import heapq
+import json
+import math
+import os
+import re
+import struct
+import threading
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; the index is then only safe for a single process
+    fcntl = None
+
+MAGIC = b"BM25v1\n"
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[._\-/][a-z0-9]+)*")
+PART_PATTERN = re.compile(r"[a-z0-9]+")
+
+Postings = Tuple[array, array]  # (doc numbers ascending, term frequencies)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased terms of a text
+
+    Joined tokens such as "sku-1234" or "v2.1" are kept whole and also
+    indexed by their parts, so both exact and partial lookups match.
+    """
+    terms = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        terms.append(token)
+        parts = PART_PATTERN.findall(token)
+        if len(parts) > 1:
+            terms.extend(parts)
+    return terms
+
+
+def _encode_varints(values: Iterable[int], out: bytearray):
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+
+
+def _decode_varints(data: bytes, position: int, count: int) -> Tuple[List[int], int]:
+    values = []
+    for _ in range(count):
+        value = shift = 0
+        while True:
+            byte = data[position]
+            position += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        values.append(value)
+    return values, position
+
+
+def encode_postings(docnums: Iterable[int], tfs: Iterable[int]) -> bytes:
+    """Varint-encode one term's postings (doc numbers as deltas)"""
+    docnums = list(docnums)
+    out = bytearray()
+    _encode_varints([len(docnums)], out)
+    _encode_varints((docnum - previous for previous, docnum in zip([0] + docnums, docnums)), out)
+    _encode_varints(tfs, out)
+    return bytes(out)
+
+
+def decode_postings(data: bytes) -> Postings:
+    """Inverse of encode_postings"""
+    (count,), position = _decode_varints(data, 0, 1)
+    deltas, position = _decode_varints(data, position, count)
+    tfs, _ = _decode_varints(data, position, count)
+
+    docnums = array("I")
+    total = 0
+    for delta in deltas:
+        total += delta
+        docnums.append(total)
+    return docnums, array("I", tfs)
+
+
+class BM25Index:
+    """Incrementally updated, disk-backed BM25 index for one collection"""
+
+    def __init__(
+        self,
+        directory: str,
+        name: str,
+        compact_every: int = 5000,
+        k1: float = 1.5,
+        b: float = 0.75
+    ):
+        self.name = name
+        self.compact_every = compact_every
+        self.k1 = k1
+        self.b = b
+
+        root = Path(directory)
+        root.mkdir(parents=True, exist_ok=True)
+        self.snapshot_path = root / f"{name}.bm25"
+        self.log_path = root / f"{name}.bm25.log"
+        # Separate from the data files, which compaction and clear() replace or delete
+        self.lock_path = root / f"{name}.bm25.lock"
+
+        self._lock = threading.Lock()
+        self._ids: List[Optional[str]] = []  # doc number -> id, None once removed
+        self._docnums: Dict[str, int] = {}
+        self._lengths = array("I")
+        self._total_length = 0
+        self._postings: Dict[str, Postings] = {}
+        self._disk_offsets: Dict[str, Tuple[int, int]] = {}
+        self._blob = b""
+        self._log_entries = 0
+        self._log_read = 0  # bytes of the log applied to memory
+        self._snapshot_stamp: Optional[Tuple[int, int, int]] = None  # snapshot file the state was loaded from
+
+        with self._lock, self._file_lock():
+            self._sync()
+
+    # Updates
+
+    def add_many(self, documents: List[Tuple[str, str]]):
+        """Index (id, text) pairs, replacing any earlier version of each id"""
+        entries = []
+        for doc_id, text in documents:
+            terms = tokenize(text)
+            entries.append({"id": doc_id, "tf": Counter(terms), "length": len(terms)})
+
+        with self._lock, self._file_lock():
+            self._sync()
+            for entry in entries:
+                self._add(entry["id"], entry["tf"], entry["length"])
+            self._append_log(entries)
+
+    def remove_many(self, ids: List[str]):
+        """Drop documents from the index"""
+        with self._lock, self._file_lock():
+            self._sync()
+            removed = [doc_id for doc_id in ids if self._remove(doc_id)]
+            self._append_log([{"id": doc_id, "removed": True} for doc_id in removed])
+
+    def _add(self, doc_id: str, tf: Dict[str, int], length: int):
+        self._remove(doc_id)
+
+        docnum = len(self._ids)
+        self._ids.append(doc_id)
+        self._docnums[doc_id] = docnum
+        self._lengths.append(length)
+        self._total_length += length
+
+        for term, count in tf.items():
+            postings = self._term_postings(term)
+            if postings is None:
+                postings = self._postings[term] = (array("I"), array("I"))
+            postings[0].append(docnum)
+            postings[1].append(count)
+
+    def clear(self):
+        """Drop every document and the files on disk"""
+        with self._lock, self._file_lock():
+            self._install([], array("I"), [], [0], b"")
+            self._log_entries = 0
+            for path in (self.snapshot_path, self.log_path):
+                if path.exists():
+                    path.unlink()
+            self._log_read = 0
+            self._snapshot_stamp = None
+
+    def _remove(self, doc_id: str) -> bool:
+        docnum = self._docnums.pop(doc_id, None)
+        if docnum is None:
+            return False
+
+        # Tombstone; postings are dropped at the next compaction
+        self._ids[docnum] = None
+        self._total_length -= self._lengths[docnum]
+        return True
+
+    def _term_postings(self, term: str) -> Optional[Postings]:
+        """In-memory postings for a term, decoding them from the snapshot on first use"""
+        postings = self._postings.get(term)
+        if postings is None and term in self._disk_offsets:
+            start, end = self._disk_offsets.pop(term)
+            postings = self._postings[term] = decode_postings(self._blob[start:end])
+        return postings
+
+    # Queries
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """Top (id, BM25 score) pairs for a query, best first"""
+        with self._lock:
+            if self._files_changed():
+                with self._file_lock():
+                    self._sync()
+
+            live = len(self._docnums)
+            if not live:
+                return []
+
+            average_length = self._total_length / live or 1.0
+            scores: Dict[int, float] = {}
+
+            for term in set(tokenize(query)):
+                postings = self._term_postings(term)
+                if postings is None:
+                    continue
+
+                matches = [(docnum, tf) for docnum, tf in zip(*postings) if self._ids[docnum] is not None]
+                if not matches:
+                    continue
+
+                idf = math.log(1 + (live - len(matches) + 0.5) / (len(matches) + 0.5))
+                for docnum, tf in matches:
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[docnum] / average_length)
+                    scores[docnum] = scores.get(docnum, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [(self._ids[docnum], score) for docnum, score in best]
+
+    # Persistence
+
+    def _append_log(self, entries: List[Dict[str, Any]]):
+        if not entries:
+            return
+
+        with open(self.log_path, "ab") as log_file:
+            log_file.write("".join(json.dumps(entry) + "\n" for entry in entries).encode("utf-8"))
+            self._log_read = log_file.tell()
+        self._log_entries += len(entries)
+
+        if self._log_entries >= self.compact_every:
+            self._compact()
+
+    def compact(self):
+        """Write a fresh snapshot and truncate the log"""
+        with self._lock, self._file_lock():
+            self._sync()
+            self._compact()
+
+    def close(self):
+        """Fold pending log entries into the snapshot"""
+        with self._lock, self._file_lock():
+            self._sync()
+            if self._log_entries:
+                self._compact()
+
+    def _compact(self):
+        live = [docnum for docnum, doc_id in enumerate(self._ids) if doc_id is not None]
+        renumber = {old: new for new, old in enumerate(live)}
+        unchanged = len(live) == len(self._ids)
+
+        terms: List[str] = []
+        offsets: List[int] = [0]
+        blob = bytearray()
+
+        for term in sorted(set(self._postings) | set(self._disk_offsets)):
+            if unchanged and term in self._disk_offsets:
+                # Numbering is unchanged, so untouched postings are copied as-is
+                start, end = self._disk_offsets[term]
+                encoded = self._blob[start:end]
+            else:
+                docnums, tfs = self._term_postings(term)
+                kept = [(renumber[docnum], tf) for docnum, tf in zip(docnums, tfs) if docnum in renumber]
+                if not kept:
+                    continue
+                encoded = encode_postings([docnum for docnum, _ in kept], [tf for _, tf in kept])
+            terms.append(term)
+            blob += encoded
+            offsets.append(len(blob))
+
+        ids = [self._ids[docnum] for docnum in live]
+        lengths = array("I", (self._lengths[docnum] for docnum in live))
+        header = json.dumps({"ids": ids, "terms": terms, "offsets": offsets}).encode("utf-8")
+
+        temporary = self.snapshot_path.with_suffix(".bm25.tmp")
+        with open(temporary, "wb") as snapshot:
+            snapshot.write(MAGIC)
+            snapshot.write(struct.pack("<I", len(header)))
+            snapshot.write(header)
+            snapshot.write(lengths.tobytes())
+            snapshot.write(blob)
+        os.replace(temporary, self.snapshot_path)
+        open(self.log_path, "w").close()
+
+        self._install(ids, lengths, terms, offsets, bytes(blob))
+        self._log_entries = 0
+        self._log_read = 0
+        self._snapshot_stamp = self._stamp(self.snapshot_path)
+        app_logger.info(f"Compacted {self.name} keyword index: {len(ids)} documents, {len(terms)} terms")
+
+    def _install(self, ids: List[str], lengths: array, terms: List[str], offsets: List[int], blob: bytes):
+        """Replace in-memory state with a snapshot's contents"""
+        self._ids = list(ids)
+        self._docnums = {doc_id: docnum for docnum, doc_id in enumerate(ids)}
+        self._lengths = lengths
+        self._total_length = sum(lengths)
+        self._postings = {}
+        self._blob = blob
+        self._disk_offsets = {term: (offsets[i], offsets[i + 1]) for i, term in enumerate(terms)}
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Hold the cross-process lock on this index's files"""
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            yield  # closing the file releases the lock
+
+    @staticmethod
+    def _stamp(path: Path) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _log_size(self) -> int:
+        try:
+            return self.log_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _files_changed(self) -> bool:
+        """Whether another process has written since this one last caught up"""
+        return self._stamp(self.snapshot_path) != self._snapshot_stamp or self._log_size() != self._log_read
+
+    def _sync(self):
+        """Catch up with the files on disk; the caller holds both locks"""
+        if self._stamp(self.snapshot_path) != self._snapshot_stamp or self._log_size() < self._log_read:
+            # Compacted or cleared by another process: start over from its snapshot
+            self._install([], array("I"), [], [0], b"")
+            self._log_entries = 0
+            self._log_read = 0
+            self._load_snapshot()
+        self._replay_log()
+
+    def _load_snapshot(self):
+        self._snapshot_stamp = self._stamp(self.snapshot_path)
+        if self._snapshot_stamp is None:
+            return
+
+        try:
+            data = self.snapshot_path.read_bytes()
+            if not data.startswith(MAGIC):
+                raise ValueError("not a keyword index snapshot")
+
+            position = len(MAGIC)
+            (header_length,) = struct.unpack_from("<I", data, position)
+            position += 4
+            header = json.loads(data[position:position + header_length])
+            position += header_length
+
+            lengths = array("I")
+            lengths.frombytes(data[position:position + 4 * len(header["ids"])])
+            position += 4 * len(header["ids"])
+
+            self._install(header["ids"], lengths, header["terms"], header["offsets"], data[position:])
+        except Exception as e:
+            app_logger.error(f"Could not read {self.name} keyword index snapshot, rebuilding from log: {e}")
+
+    def _replay_log(self):
+        """Apply log entries past the last read position"""
+        if not self.log_path.exists():
+            return
+
+        with open(self.log_path, "r+b") as log_file:
+            log_file.seek(self._log_read)
+            data = log_file.read()
+            complete = data.rfind(b"\n") + 1
+            for line in data[:complete].splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn line from an interrupted write
+                if entry.get("removed"):
+                    self._remove(entry["id"])
+                else:
+                    self._add(entry["id"], entry["tf"], entry["length"])
+                self._log_entries += 1
+            self._log_read += complete
+
+            if complete < len(data):
+                # End a torn final line so the next append starts on a line of its own
+                log_file.seek(0, 2)
+                log_file.write(b"\n")
+                self._log_read += len(data) - complete + 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Document/term counts and on-disk size"""
+        bytes_on_disk = sum(path.stat().st_size for path in (self.snapshot_path, self.log_path) if path.exists())
+        return {
+            "collection": self.name,
+            "documents": len(self._docnums),
+            "terms": len(self._postings) + len(self._disk_offsets),
+            "pending_log_entries": self._log_entries,
+            "bytes_on_disk": bytes_on_disk
+        }
@@ -0,0 +1,145 @@
+"""
+Content-addressed response cache for LLM calls
+
+Responses are keyed by a hash of (model, temperature, max_tokens, prompt) and
+kept in an in-process LRU tier with a TTL. When enabled, a Redis tier is
+consulted on local misses so cached responses are shared across workers.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.logger import app_logger
+import hashlib
+import json
+import time
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is optional
+    aioredis = None
+
+
+class LLMResponseCache:
+    """Two-tier (in-process LRU + optional Redis) cache for LLM responses"""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: int = 3600,
+        use_redis: bool = False,
+        enabled: bool = True
+    ):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+        self.evictions = 0
+
+        self._redis = None
+        if use_redis:
+            if aioredis is None:
+                app_logger.warning("LLM cache Redis tier requested but redis package is not installed")
+            else:
+                self._redis = aioredis.Redis(
+                    host=settings.REDIS_HOST,
+                    port=settings.REDIS_PORT,
+                    db=settings.REDIS_DB,
+                    password=settings.REDIS_PASSWORD or None,
+                    socket_timeout=1.0,
+                    decode_responses=True
+                )
+                app_logger.info("LLM cache Redis tier enabled")
+
+    @staticmethod
+    def make_key(model: str, temperature: float, max_tokens: int, prompt: Any) -> str:
+        """Build a content-addressed cache key for an LLM call"""
+        payload = json.dumps(
+            [model, temperature, max_tokens, prompt],
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return "llm:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return a cached response, or None on a miss"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        if self._redis is not None:
+            try:
+                value = await self._redis.get(key)
+            except Exception as e:
+                app_logger.warning(f"LLM cache Redis read failed: {e}")
+                value = None
+
+            if value is not None:
+                self._store_local(key, value)
+                self.hits += 1
+                self.redis_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str):
+        """Store a response in every enabled tier"""
+        self._store_local(key, value)
+
+        if self._redis is not None:
+            try:
+                await self._redis.set(key, value, ex=self.ttl_seconds)
+            except Exception as e:
+                app_logger.warning(f"LLM cache Redis write failed: {e}")
+
+    def _store_local(self, key: str, value: str):
+        """Insert into the in-process tier, evicting least recently used entries"""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop all in-process entries and reset counters"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "redis_enabled": self._redis is not None,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "redis_hits": self.redis_hits,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Global instance
+llm_cache = LLMResponseCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    use_redis=settings.LLM_CACHE_REDIS_ENABLED,
+    enabled=settings.LLM_CACHE_ENABLED
+)
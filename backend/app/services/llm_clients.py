@@ -0,0 +1,122 @@
+"""
+Process-wide LLM client registry
+
+Agents share one ChatAnthropic per (model, temperature, max_tokens) instead
+of each building its own, and every client sends requests through a single
+pooled keep-alive HTTP transport, so connections and TLS sessions are
+reused across agents and requests. Per-model overrides of max_tokens,
+timeout and max_retries come from LLM_MODEL_CONFIG, a JSON object keyed by
+model name, e.g. {"claude-3-5-haiku-20241022": {"max_tokens": 2048}}.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from langchain_anthropic import ChatAnthropic
+from app.core.config import settings
+from app.core.logger import app_logger
+import anthropic
+import httpx
+import json
+
+MODEL_SETTING_KEYS = ("max_tokens", "timeout", "max_retries")
+
+
+def _parse_model_config(raw: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    """Per-model overrides from LLM_MODEL_CONFIG; invalid JSON is ignored"""
+    if not raw:
+        return {}
+    try:
+        config = json.loads(raw)
+    except ValueError as e:
+        app_logger.error(f"Ignoring invalid LLM_MODEL_CONFIG: {e}")
+        return {}
+    return {
+        model: {key: value for key, value in overrides.items() if key in MODEL_SETTING_KEYS}
+        for model, overrides in config.items()
+        if isinstance(overrides, dict)
+    }
+
+
+class LLMClientRegistry:
+    """Shared ChatAnthropic clients over one pooled HTTP transport"""
+
+    def __init__(self):
+        self.model_config = _parse_model_config(settings.LLM_MODEL_CONFIG)
+        self._clients: Dict[Tuple[str, float, int], ChatAnthropic] = {}
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+    def model_settings(self, model: str) -> Dict[str, Any]:
+        """Effective max_tokens/timeout/max_retries for a model"""
+        return {
+            "max_tokens": settings.MAX_TOKENS,
+            "timeout": settings.LLM_TIMEOUT_SECONDS,
+            "max_retries": settings.LLM_MAX_RETRIES,
+            **self.model_config.get(model, {})
+        }
+
+    def get(self, model: Optional[str] = None, temperature: float = 0.7, max_tokens: Optional[int] = None) -> ChatAnthropic:
+        """Return the shared client for a model configuration, creating it once"""
+        model = model or settings.CLAUDE_MODEL
+        config = self.model_settings(model)
+        max_tokens = max_tokens or config["max_tokens"]
+
+        key = (model, temperature, max_tokens)
+        llm = self._clients.get(key)
+        if llm is None:
+            llm = ChatAnthropic(
+                model=model,
+                anthropic_api_key=settings.ANTHROPIC_API_KEY,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                default_request_timeout=config["timeout"],
+                max_retries=config["max_retries"]
+            )
+            self._use_shared_transport(llm, config)
+            self._clients[key] = llm
+            app_logger.info(f"Created LLM client for {model} (temperature={temperature}, max_tokens={max_tokens})")
+        return llm
+
+    def _transport(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = anthropic.DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY_SECONDS
+                )
+            )
+        return self._http_client
+
+    def _use_shared_transport(self, llm: ChatAnthropic, config: Dict[str, Any]):
+        """Point a client's async Anthropic SDK client at the shared transport"""
+        try:
+            llm._async_client = anthropic.AsyncAnthropic(
+                api_key=settings.ANTHROPIC_API_KEY,
+                timeout=config["timeout"],
+                max_retries=config["max_retries"],
+                http_client=self._transport()
+            )
+        except Exception as e:
+            # The client keeps its own connection pool, which is still shared by every agent using it
+            app_logger.warning(f"Could not attach shared LLM transport: {e}")
+
+    async def close(self):
+        """Close pooled connections"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Configured clients and transport limits"""
+        clients: List[Dict[str, Any]] = [
+            {"model": model, "temperature": temperature, "max_tokens": max_tokens}
+            for model, temperature, max_tokens in self._clients
+        ]
+        return {
+            "clients": clients,
+            "model_config": self.model_config,
+            "max_connections": settings.LLM_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.LLM_MAX_KEEPALIVE_CONNECTIONS
+        }
+
+
+# Global instance
+llm_clients = LLMClientRegistry()
@@ -0,0 +1,306 @@
+"""
+Central scheduler for LLM requests
+
+Every agent LLM call passes through one scheduler per process, which caps
+requests in flight (LLM_MAX_IN_FLIGHT), requests per RATE_LIMIT_PERIOD
+(RATE_LIMIT_REQUESTS) and tokens per minute (LLM_TOKENS_PER_MINUTE). Calls
+that do not fit wait in a priority queue, so interactive chat is served
+ahead of batch work such as report generation. Rate-limit (429), overload
+and 5xx responses are retried with jittered exponential backoff; a
+retry-after header from the provider pauses the whole queue, not just the
+call that hit it.
+
+Priority is carried in a context variable: an endpoint calls
+set_llm_priority() once and every LLM call made by that request, including
+from tasks it starts, is queued at that priority.
+"""
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.logger import app_logger
+import asyncio
+import heapq
+import itertools
+import random
+import time
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BATCH = 2
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_NORMAL: "normal", PRIORITY_BATCH: "batch"}
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+CHARS_PER_TOKEN = 4
+
+_priority: ContextVar[int] = ContextVar("llm_priority", default=PRIORITY_NORMAL)
+
+
+def set_llm_priority(priority: int):
+    """Queue LLM calls made by the current task (and tasks it starts) at this priority"""
+    _priority.set(priority)
+
+
+def current_llm_priority() -> int:
+    return _priority.get()
+
+
+def estimate_tokens(prompt: Any) -> int:
+    """Rough prompt size in tokens, used to reserve budget before the call"""
+    return max(1, len(str(prompt)) // CHARS_PER_TOKEN)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds from a retry-after(-ms) response header, if the provider sent one"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        return None  # HTTP-date form; fall back to backoff
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, overloads, 5xx and connection failures are worth retrying"""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout")
+
+
+class TokenBucket:
+    """Continuously refilled budget; may go negative when actual usage exceeds a reservation"""
+
+    def __init__(self, capacity: float, period_seconds: float):
+        self.capacity = capacity
+        self.rate = capacity / period_seconds
+        self.level = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (0 if available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def available(self) -> float:
+        self._refill()
+        return self.level
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def give(self, amount: float):
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+class LLMScheduler:
+    """Priority queue in front of the LLM provider with concurrency and rate budgets"""
+
+    def __init__(
+        self,
+        max_in_flight: int = settings.LLM_MAX_IN_FLIGHT,
+        tokens_per_minute: int = settings.LLM_TOKENS_PER_MINUTE,
+        requests_per_period: int = settings.RATE_LIMIT_REQUESTS,
+        period_seconds: int = settings.RATE_LIMIT_PERIOD,
+        max_attempts: int = settings.LLM_RETRY_ATTEMPTS,
+        backoff_base_seconds: float = settings.LLM_RETRY_BASE_SECONDS,
+        backoff_max_seconds: float = settings.LLM_RETRY_MAX_SECONDS
+    ):
+        self.max_in_flight = max(1, max_in_flight)
+        self.tokens = TokenBucket(tokens_per_minute, 60) if tokens_per_minute > 0 else None
+        self.requests = TokenBucket(requests_per_period, period_seconds) if requests_per_period > 0 else None
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+
+        self.in_flight = 0
+        self._queue: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.rate_limited = 0
+
+    # Admission
+
+    def _budget_wait(self, tokens: int) -> float:
+        """Seconds until the next call (reserving `tokens`) fits every budget"""
+        wait = max(0.0, self._paused_until - time.monotonic())
+        if self.requests:
+            wait = max(wait, self.requests.wait_time(1))
+        if self.tokens:
+            wait = max(wait, self.tokens.wait_time(tokens))
+        return wait
+
+    def _dispatch(self):
+        """Admit queued calls in priority order while slots and budget allow"""
+        self._timer = None
+        while self._queue and self.in_flight < self.max_in_flight:
+            _, _, tokens, waiter = self._queue[0]
+            if waiter.done():  # cancelled while queued
+                heapq.heappop(self._queue)
+                continue
+
+            wait = self._budget_wait(tokens)
+            if wait > 0:
+                # Strict priority: lower-priority calls never overtake the head of the queue
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+
+            heapq.heappop(self._queue)
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(tokens)
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    async def _acquire(self, tokens: int, priority: int):
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), tokens, waiter))
+        if self._timer is None:
+            self._dispatch()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release(tokens, None)  # admitted just as we were cancelled
+            raise
+
+    def _release(self, reserved: int, used: Optional[int]):
+        self.in_flight -= 1
+        if self.tokens and used is not None:
+            # Settle the reservation against what the call actually consumed
+            delta = used - reserved
+            if delta > 0:
+                self.tokens.take(delta)
+            else:
+                self.tokens.give(-delta)
+        if self._timer is None:
+            self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, tokens: int, priority: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Hold one in-flight slot for the duration of a call
+
+        The yielded dict may be given a "used_tokens" entry so the token
+        budget is charged for actual rather than estimated usage.
+        """
+        priority = current_llm_priority() if priority is None else priority
+        await self._acquire(tokens, priority)
+        usage: Dict[str, Any] = {}
+        try:
+            yield usage
+            self.completed += 1
+        finally:
+            self._release(tokens, usage.get("used_tokens"))
+
+    # Retries
+
+    def backoff(self, attempt: int, error: Exception) -> float:
+        """Delay before retry `attempt` (1-based): retry-after if given, else full-jitter backoff"""
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max_seconds)
+        ceiling = min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** (attempt - 1))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def note_failure(self, attempt: int, error: Exception) -> Optional[float]:
+        """Record a failed attempt; return the retry delay, or None if it should not be retried"""
+        if _status_code(error) == 429:
+            self.rate_limited += 1
+        if attempt >= self.max_attempts or not is_retryable(error):
+            self.failed += 1
+            return None
+
+        delay = self.backoff(attempt, error)
+        if _status_code(error) == 429 and _retry_after(error) is not None:
+            # The provider asked everyone to back off, not just this call
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        self.retries += 1
+        app_logger.warning(f"LLM call failed ({error}); retry {attempt} of {self.max_attempts - 1} in {delay:.1f}s")
+        return delay
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        tokens: int,
+        priority: Optional[int] = None,
+        usage: Optional[Callable[[Any], Optional[int]]] = None
+    ) -> Any:
+        """
+        Run an LLM call under the scheduler, retrying transient failures
+
+        Args:
+            call: Zero-argument callable returning the awaitable to run
+            tokens: Estimated tokens to reserve from the per-minute budget
+            priority: Queue priority; defaults to the current task's
+            usage: Optional function returning the tokens a result actually used
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with self.slot(tokens, priority) as slot:
+                    result = await call()
+                    if usage:
+                        slot["used_tokens"] = usage(result)
+                return result
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                delay = self.note_failure(attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth by priority, in-flight calls, budgets and retry counters"""
+        depth = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, _, waiter in self._queue:
+            if not waiter.done():
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                depth[name] = depth.get(name, 0) + 1
+
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": sum(depth.values()),
+            "queued_by_priority": depth,
+            "tokens_available": round(self.tokens.available()) if self.tokens else None,
+            "requests_available": round(self.requests.available(), 1) if self.requests else None,
+            "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 1),
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited
+        }
+
+
+# Global instance
+llm_scheduler = LLMScheduler()
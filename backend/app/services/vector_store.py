@@ -1,171 +1,856 @@
 """
 Vector store service for RAG using ChromaDB
 """
-import chromadb
-from chromadb.config import Settings
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Set, Tuple, Union
 from app.core.config import settings
 from app.core.logger import app_logger
-from sentence_transformers import SentenceTransformer
+from app.services.chunking import chunk_text
+from app.services.embedding_cache import EmbeddingCache
+from app.services.keyword_index import BM25Index
+import asyncio
+import functools
+import heapq
+import json
+import numpy as np
+import threading
+import time
 import uuid
 
 
+def competitor_text(competitor: Dict[str, Any]) -> str:
+    """Text indexed for a competitor"""
+    return f"{competitor.get('name') or ''} {competitor.get('description') or ''} {competitor.get('industry') or ''}"
+
+
+def trend_text(trend: Dict[str, Any]) -> str:
+    """Text indexed for a trend"""
+    return f"{trend.get('title') or ''} {trend.get('description') or ''} {' '.join(trend.get('keywords') or [])}"
+
+
+def finding_sections(finding: Dict[str, Any]) -> Tuple[str, str]:
+    """Heading and chunked body of a research finding"""
+    return finding.get('title') or '', finding.get('content') or ''
+
+
+def report_sections(report: Dict[str, Any]) -> Tuple[str, str]:
+    """Heading and chunked body of a report"""
+    return report.get('title') or '', f"{report.get('summary') or ''}\n{report.get('content') or ''}"
+
+
+COLLECTION_NAMES = ("competitors", "trends", "findings", "reports")
+
+# Builds the indexed text for a short record, by collection
+DOCUMENT_TEXT = {
+    "competitors": competitor_text,
+    "trends": trend_text
+}
+
+# Collections whose records are split into overlapping chunks. Each chunk
+# is stored as "<parent id>#<n>" with the heading repeated in front of it,
+# the parent's metadata (minus the chunked body) and parent_id,
+# chunk_index and chunk_count.
+CHUNKED_SECTIONS = {
+    "findings": finding_sections,
+    "reports": report_sections
+}
+CHUNK_METADATA_EXCLUDE = ("content", "summary")
+
+# Chroma's HNSW defaults, for collections created without explicit settings
+CHROMA_HNSW_DEFAULTS = {
+    "hnsw:space": "l2",
+    "hnsw:M": 16,
+    "hnsw:construction_ef": 100,
+    "hnsw:search_ef": 10
+}
+
+
+def hnsw_metadata() -> Dict[str, Any]:
+    """
+    Collection metadata carrying the configured HNSW parameters
+
+    M (graph degree) drives index memory and recall, construction_ef build
+    quality, and search_ef the candidate list per query (Chroma searches
+    with at least n_results). The space stays l2, which _score() assumes.
+    """
+    return {
+        "hnsw:space": "l2",
+        "hnsw:M": settings.VECTOR_HNSW_M,
+        "hnsw:construction_ef": settings.VECTOR_HNSW_EF_CONSTRUCTION,
+        "hnsw:search_ef": settings.VECTOR_HNSW_EF_SEARCH
+    }
+
+
+# Date fields also stored as epoch seconds (<field>_ts) for range filters
+TIMESTAMP_FIELDS = ("created_at", "updated_at")
+
+
+def _to_timestamp(value: Any) -> Optional[float]:
+    """Epoch seconds for a datetime or ISO-8601 string, None if unparseable"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def build_where(
+    industry: Optional[str] = None,
+    competitor_id: Optional[str] = None,
+    created_after: Optional[Union[str, datetime]] = None,
+    created_before: Optional[Union[str, datetime]] = None,
+    **equals: Any
+) -> Optional[Dict[str, Any]]:
+    """
+    Build a Chroma `where` filter from common metadata conditions
+
+    Date bounds compare against created_at_ts, which is written for
+    documents indexed with a created_at field.
+    """
+    clauses = []
+    for key, value in {"industry": industry, "competitor_id": competitor_id, **equals}.items():
+        if value is not None:
+            clauses.append({key: {"$eq": value}})
+
+    for operator, bound in (("$gte", created_after), ("$lte", created_before)):
+        timestamp = _to_timestamp(bound)
+        if timestamp is not None:
+            clauses.append({"created_at_ts": {operator: timestamp}})
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
 class VectorStore:
-    """Vector store for embeddings and semantic search"""
+    """
+    Vector store for embeddings and semantic search
+
+    Nothing heavy happens at construction: the Chroma client and the
+    embedding model load on first use, or ahead of time via warm_up().
+    """
 
     def __init__(self):
-        """Initialize ChromaDB client and embedding model"""
-        self.client = chromadb.Client(Settings(
-            chroma_db_impl="duckdb+parquet",
-            persist_directory=settings.CHROMA_PERSIST_DIR
-        ))
+        """Set up an unloaded vector store"""
+        self.client = None
+        self.embedding_model = None
+        self.embedding_cache: Optional[EmbeddingCache] = None
+        self.collections: Dict[str, Any] = {}
+        self.keyword_indexes: Dict[str, BM25Index] = {}
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=len(COLLECTION_NAMES), thread_name_prefix="vector-search")
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the client and embedding model have been loaded"""
+        return self._loaded
+
+    def _load(self):
+        """Initialize ChromaDB client and embedding model (blocking, once)"""
+        if self._loaded:
+            return
+
+        with self._load_lock:
+            if self._loaded:
+                return
+
+            started = time.perf_counter()
+
+            # Deferred so importing this module stays cheap
+            import chromadb
+            from chromadb.config import Settings
+            from sentence_transformers import SentenceTransformer
+
+            # chromadb 0.4 rejects the legacy duckdb+parquet configuration
+            self.client = chromadb.PersistentClient(
+                path=settings.CHROMA_PERSIST_DIR,
+                settings=Settings(anonymized_telemetry=False)
+            )
+
+            # Initialize embedding model
+            self.embedding_model = SentenceTransformer(settings.EMBEDDING_MODEL)
+            self.embedding_cache = (
+                EmbeddingCache(
+                    settings.EMBEDDING_CACHE_DIR,
+                    settings.EMBEDDING_MODEL,
+                    self.embedding_model.get_sentence_embedding_dimension()
+                )
+                if settings.EMBEDDING_CACHE_ENABLED else None
+            )
+
+            # Create collections
+            self.competitors_collection = self._get_or_create_collection("competitors")
+            self.trends_collection = self._get_or_create_collection("trends")
+            self.findings_collection = self._get_or_create_collection("findings")
+            self.reports_collection = self._get_or_create_collection("reports")
+
+            self.collections = {
+                "competitors": self.competitors_collection,
+                "trends": self.trends_collection,
+                "findings": self.findings_collection,
+                "reports": self.reports_collection
+            }
+
+            if settings.KEYWORD_INDEX_ENABLED:
+                self.keyword_indexes = {
+                    name: BM25Index(settings.KEYWORD_INDEX_DIR, name, settings.KEYWORD_INDEX_COMPACT_EVERY)
+                    for name in self.collections
+                }
 
-        # Initialize embedding model
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+            self._loaded = True
+            app_logger.info(f"Vector store initialized in {time.perf_counter() - started:.1f}s")
 
-        # Create collections
-        self.competitors_collection = self._get_or_create_collection("competitors")
-        self.trends_collection = self._get_or_create_collection("trends")
-        self.findings_collection = self._get_or_create_collection("findings")
-        self.reports_collection = self._get_or_create_collection("reports")
+    async def ensure_loaded(self):
+        """Load the client and model without blocking the event loop"""
+        if not self._loaded:
+            await asyncio.to_thread(self._load)
 
-        app_logger.info("Vector store initialized")
+    def close(self):
+        """Flush keyword index logs into their snapshots"""
+        for index in self.keyword_indexes.values():
+            try:
+                index.close()
+            except Exception as e:
+                app_logger.error(f"Error closing {index.name} keyword index: {e}")
+
+    async def warm_up(self):
+        """Preload in the background; failures are logged and retried on first use"""
+        try:
+            await self.ensure_loaded()
+        except Exception as e:
+            app_logger.error(f"Vector store warm-up failed: {e}")
 
     def _get_or_create_collection(self, name: str):
-        """Get or create a collection"""
+        """Get or create a collection with the configured HNSW parameters"""
         try:
-            return self.client.get_or_create_collection(name)
+            if name not in {collection.name for collection in self.client.list_collections()}:
+                return self.client.create_collection(name, metadata=hnsw_metadata())
+
+            # HNSW parameters are fixed when a collection is created
+            collection = self.client.get_collection(name)
+            current = {**CHROMA_HNSW_DEFAULTS, **(collection.metadata or {})}
+            changed = {key: value for key, value in hnsw_metadata().items() if current.get(key) != value}
+            if changed:
+                app_logger.warning(
+                    f"Collection {name} was built with different HNSW settings than configured "
+                    f"({', '.join(changed)}); rebuild it with scripts/backfill_vector_store.py --rebuild"
+                )
+            return collection
         except Exception as e:
             app_logger.error(f"Error creating collection {name}: {e}")
             return None
 
+    async def reset_collection(self, name: str):
+        """Drop and recreate a collection (and its keyword index) with the configured HNSW parameters"""
+        await self.ensure_loaded()
+
+        def reset():
+            self.client.delete_collection(name)
+            collection = self.client.create_collection(name, metadata=hnsw_metadata())
+            self.collections[name] = collection
+            setattr(self, f"{name}_collection", collection)
+
+            keyword_index = self.keyword_indexes.get(name)
+            if keyword_index:
+                keyword_index.clear()
+
+        await asyncio.to_thread(reset)
+        app_logger.info(f"Reset vector store collection {name}")
+
     def embed_text(self, text: str) -> List[float]:
         """Generate embedding for text"""
         try:
-            embedding = self.embedding_model.encode(text)
-            return embedding.tolist()
+            return self.embed_texts([text])[0].tolist()
         except Exception as e:
             app_logger.error(f"Error generating embedding: {e}")
             return []
 
-    async def add_competitor(self, competitor: Dict[str, Any]):
-        """Add competitor to vector store"""
+    @staticmethod
+    def _clean_metadata(record: Dict[str, Any], exclude: Tuple[str, ...] = ()) -> Dict[str, Any]:
+        """Reduce a record to the scalar metadata values Chroma accepts"""
+        metadata = {}
+        for key, value in record.items():
+            if value is None or key in exclude:
+                continue
+            if isinstance(value, (str, int, float, bool)):
+                metadata[key] = value
+            else:
+                metadata[key] = json.dumps(value, default=str)
+
+            # Chroma range operators only compare numbers
+            if key in TIMESTAMP_FIELDS:
+                timestamp = _to_timestamp(value)
+                if timestamp is not None:
+                    metadata[f"{key}_ts"] = timestamp
+        return metadata
+
+    @staticmethod
+    def _score(distance: float) -> float:
+        """Convert a squared L2 distance between unit vectors to cosine similarity"""
+        return max(0.0, min(1.0, 1 - distance / 2))
+
+    def embed_texts(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Embed many texts into a single float32 matrix
+
+        Texts already in the embedding cache are read from it; the rest are
+        encoded together, batch_size at a time, and added to the cache.
+        """
+        self._load()
+        batch_size = batch_size or settings.VECTOR_EMBED_BATCH_SIZE
+        if not texts:
+            return np.zeros((0, self.embedding_model.get_sentence_embedding_dimension()), dtype=np.float32)
+        if not self.embedding_cache:
+            return self._encode(texts, batch_size)
+
+        cached = self.embedding_cache.get_many(texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        encoded = {}
+        if missing:
+            matrix = self._encode(missing, batch_size)
+            self.embedding_cache.put_many(missing, matrix)
+            encoded = dict(zip(missing, matrix))
+
+        return np.stack([vector if vector is not None else encoded[text] for text, vector in zip(texts, cached)])
+
+    def _encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Run the encoder over texts"""
+        embeddings = self.embedding_model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return embeddings.astype(np.float32, copy=False)
+
+    def keyword_index_stats(self) -> Dict[str, Any]:
+        """Per-collection keyword index sizes"""
+        if not settings.KEYWORD_INDEX_ENABLED:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "loaded": self._loaded,
+            "indexes": [index.stats() for index in self.keyword_indexes.values()]
+        }
+
+    def embedding_cache_stats(self) -> Dict[str, Any]:
+        """Embedding cache hit rate and size on disk"""
+        if not settings.EMBEDDING_CACHE_ENABLED:
+            return {"enabled": False}
+        if not self.embedding_cache:
+            return {"enabled": True, "loaded": False}
+        return {"enabled": True, "loaded": True, **self.embedding_cache.stats()}
+
+    async def add_many(
+        self,
+        collection_name: str,
+        records: List[Dict[str, Any]],
+        batch_size: Optional[int] = None
+    ) -> int:
+        """
+        Embed and write many records to a collection at once
+
+        All texts are encoded as one matrix and written with a single
+        collection.upsert, so re-indexing an existing id replaces it.
+        Encoding runs in a worker thread to keep the event loop free;
+        callers should keep batches within Chroma's max batch size.
+
+        Returns:
+            Number of records written (0 on failure)
+        """
+        if not records:
+            return 0
+
         try:
-            doc_id = competitor.get("id", str(uuid.uuid4()))
-            text = f"{competitor.get('name', '')} {competitor.get('description', '')} {competitor.get('industry', '')}"
+            await self.ensure_loaded()
+            collection = self.collections.get(collection_name)
+            if not collection:
+                return 0
+            return await asyncio.to_thread(self._write_batch, collection_name, collection, records, batch_size)
+        except Exception as e:
+            app_logger.error(f"Error adding {len(records)} documents to {collection_name}: {e}")
+            return 0
+
+    def _write_batch(
+        self,
+        collection_name: str,
+        collection,
+        records: List[Dict[str, Any]],
+        batch_size: Optional[int]
+    ) -> int:
+        """Encode and upsert one batch (blocking)"""
+        # Chroma rejects duplicate ids within a call; the last version wins
+        by_id = {str(record.get("id") or uuid.uuid4()): record for record in records}
 
-            self.competitors_collection.add(
-                documents=[text],
-                metadatas=[competitor],
-                ids=[doc_id]
+        if collection_name in CHUNKED_SECTIONS:
+            # Chunk counts change with the text, so drop the previous chunks first
+            self._delete_parents(collection_name, collection, list(by_id))
+            ids, texts, metadatas = self._chunk_records(collection_name, by_id)
+        else:
+            build_text = DOCUMENT_TEXT[collection_name]
+            ids = list(by_id)
+            texts = [build_text(record) for record in by_id.values()]
+            metadatas = [self._clean_metadata(record) for record in by_id.values()]
+
+        # One encoder pass for the whole batch, however many chunks it produced
+        embeddings = self.embed_texts(texts, batch_size)
+
+        limit = getattr(self.client, "max_batch_size", None) or 5000
+        for start in range(0, len(ids), limit):
+            collection.upsert(
+                ids=ids[start:start + limit],
+                documents=texts[start:start + limit],
+                embeddings=embeddings[start:start + limit].tolist(),
+                metadatas=metadatas[start:start + limit]
             )
 
-            app_logger.info(f"Added competitor to vector store: {doc_id}")
-        except Exception as e:
-            app_logger.error(f"Error adding competitor to vector store: {e}")
+        keyword_index = self.keyword_indexes.get(collection_name)
+        if keyword_index:
+            keyword_index.add_many(list(zip(ids, texts)))
+
+        return len(by_id)
+
+    def _chunk_records(
+        self,
+        collection_name: str,
+        records: Dict[str, Dict[str, Any]]
+    ) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+        """Split records into chunk ids, texts and metadata"""
+        sections = CHUNKED_SECTIONS[collection_name]
+        tokenizer = getattr(self.embedding_model, "tokenizer", None)
+        ids, texts, metadatas = [], [], []
+
+        for parent_id, record in records.items():
+            heading, body = sections(record)
+            chunks = chunk_text(
+                body, settings.CHUNK_MAX_TOKENS, settings.CHUNK_OVERLAP_TOKENS, tokenizer
+            ) or [""]
+            metadata = self._clean_metadata(record, exclude=CHUNK_METADATA_EXCLUDE)
+
+            for index, chunk in enumerate(chunks):
+                ids.append(f"{parent_id}#{index}")
+                texts.append(f"{heading}\n{chunk}".strip())
+                metadatas.append({
+                    **metadata,
+                    "parent_id": parent_id,
+                    "chunk_index": index,
+                    "chunk_count": len(chunks)
+                })
+
+        return ids, texts, metadatas
+
+    def _delete_parents(self, collection_name: str, collection, parent_ids: List[str]):
+        """Remove every chunk of the given parents (and any unchunked legacy copy)"""
+        stale = collection.get(where={"parent_id": {"$in": parent_ids}}, include=[])["ids"]
+        stale += collection.get(ids=parent_ids, include=[])["ids"]
+        if not stale:
+            return
+
+        collection.delete(ids=stale)
+        keyword_index = self.keyword_indexes.get(collection_name)
+        if keyword_index:
+            keyword_index.remove_many(stale)
+
+    async def add_competitors(self, competitors: List[Dict[str, Any]], batch_size: Optional[int] = None) -> int:
+        """Add many competitors to vector store"""
+        return await self.add_many("competitors", competitors, batch_size)
+
+    async def add_trends(self, trends: List[Dict[str, Any]], batch_size: Optional[int] = None) -> int:
+        """Add many trends to vector store"""
+        return await self.add_many("trends", trends, batch_size)
+
+    async def add_findings(self, findings: List[Dict[str, Any]], batch_size: Optional[int] = None) -> int:
+        """Add many research findings to vector store"""
+        return await self.add_many("findings", findings, batch_size)
+
+    async def add_reports(self, reports: List[Dict[str, Any]], batch_size: Optional[int] = None) -> int:
+        """Add many reports to vector store"""
+        return await self.add_many("reports", reports, batch_size)
+
+    async def add_competitor(self, competitor: Dict[str, Any]):
+        """Add competitor to vector store"""
+        if await self.add_competitors([competitor]):
+            app_logger.info(f"Added competitor to vector store: {competitor.get('id')}")
 
     async def add_trend(self, trend: Dict[str, Any]):
         """Add trend to vector store"""
+        if await self.add_trends([trend]):
+            app_logger.info(f"Added trend to vector store: {trend.get('id')}")
+
+    async def add_finding(self, finding: Dict[str, Any]):
+        """Add research finding to vector store"""
+        if await self.add_findings([finding]):
+            app_logger.info(f"Added finding to vector store: {finding.get('id')}")
+
+    async def add_report(self, report: Dict[str, Any]):
+        """Add report to vector store"""
+        if await self.add_reports([report]):
+            app_logger.info(f"Added report to vector store: {report.get('id')}")
+
+    async def list_ids(self, collection_name: str, page_size: int = 5000) -> Set[str]:
+        """Ids of the records indexed in a collection (parent ids for chunked collections)"""
+        await self.ensure_loaded()
+        collection = self.collections[collection_name]
+
+        def read_ids() -> Set[str]:
+            ids: Set[str] = set()
+            offset = 0
+            while True:
+                page = collection.get(include=[], limit=page_size, offset=offset)["ids"]
+                if collection_name in CHUNKED_SECTIONS:
+                    ids.update(chunk_id.rsplit("#", 1)[0] for chunk_id in page)
+                else:
+                    ids.update(page)
+                if len(page) < page_size:
+                    return ids
+                offset += page_size
+
+        return await asyncio.to_thread(read_ids)
+
+    async def delete_many(self, collection_name: str, ids: List[str]) -> int:
+        """Remove records (and all their chunks) from a collection and its keyword index"""
+        if not ids:
+            return 0
+
+        await self.ensure_loaded()
+        collection = self.collections[collection_name]
+
+        def delete():
+            if collection_name in CHUNKED_SECTIONS:
+                self._delete_parents(collection_name, collection, ids)
+                return
+            collection.delete(ids=ids)
+            keyword_index = self.keyword_indexes.get(collection_name)
+            if keyword_index:
+                keyword_index.remove_many(ids)
+
+        await asyncio.to_thread(delete)
+        return len(ids)
+
+    async def search(
+        self,
+        query: str,
+        collection_name: str = "all",
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        mode: str = "vector",
+        group_by_parent: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Search across collections
+
+        Modes:
+            vector  - semantic search over the Chroma collections
+            keyword - BM25 over the keyword indexes; the embedder is not used
+            hybrid  - both, fused with reciprocal rank fusion
+
+        In vector mode the query is embedded once, then every collection is
+        queried concurrently in a thread pool with that embedding. Scores
+        are normalized within each collection before the top n_results are
+        merged, so one collection's score scale can't crowd out the rest.
+        `where` is a Chroma metadata filter (see build_where) applied
+        inside each collection in every mode.
+
+        Each result carries its id, collection, document, metadata, raw
+        distance (None for keyword-only hits), a 0-1 score and the
+        normalized score used for ranking; hybrid results add rrf_score.
+
+        Findings and reports are stored as chunks, so by default their hits
+        are chunks (id "<parent id>#<n>"). With group_by_parent, chunk hits
+        are folded into one result per parent document, ranked by its best
+        chunk, with id set to the parent id and the matching chunk indexes
+        in matched_chunks.
+        """
         try:
-            doc_id = trend.get("id", str(uuid.uuid4()))
-            text = f"{trend.get('title', '')} {trend.get('description', '')} {' '.join(trend.get('keywords', []))}"
+            await self.ensure_loaded()
 
-            self.trends_collection.add(
-                documents=[text],
-                metadatas=[trend],
-                ids=[doc_id]
-            )
+            search_collections = [
+                (name, collection) for name, collection in (
+                    self.collections.items() if collection_name == "all"
+                    else [(collection_name, self.collections.get(collection_name))]
+                )
+                if collection
+            ]
+
+            # Several chunks of one parent may rank, so fetch extra before grouping
+            limit = n_results * settings.CHUNK_GROUP_OVERFETCH if group_by_parent else n_results
+
+            if mode == "keyword":
+                hits = await self._keyword_search(query, search_collections, limit, where)
+            elif mode == "hybrid":
+                hits = await self._hybrid_search(query, search_collections, limit, where)
+            else:
+                hits = await self._vector_search(query, search_collections, limit, where)
 
-            app_logger.info(f"Added trend to vector store: {doc_id}")
+            return self._group_by_parent(hits)[:n_results] if group_by_parent else hits
         except Exception as e:
-            app_logger.error(f"Error adding trend to vector store: {e}")
+            app_logger.error(f"Error searching vector store: {e}")
+            return []
 
-    async def add_finding(self, finding: Dict[str, Any]):
-        """Add research finding to vector store"""
-        try:
-            doc_id = finding.get("id", str(uuid.uuid4()))
-            text = f"{finding.get('title', '')} {finding.get('content', '')}"
+    async def _vector_search(
+        self,
+        query: str,
+        search_collections: List[Tuple[str, Any]],
+        n_results: int,
+        where: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Embed once, query collections concurrently, merge by normalized score"""
+        loop = asyncio.get_running_loop()
+
+        query_embedding = await loop.run_in_executor(self._executor, self.embed_text, query)
+        if not query_embedding:
+            return []
 
-            self.findings_collection.add(
-                documents=[text],
-                metadatas=[finding],
-                ids=[doc_id]
+        per_collection = await asyncio.gather(*(
+            loop.run_in_executor(
+                self._executor,
+                functools.partial(self._query_collection, name, collection, query_embedding, n_results, where)
             )
+            for name, collection in search_collections
+        ))
 
-            app_logger.info(f"Added finding to vector store: {doc_id}")
-        except Exception as e:
-            app_logger.error(f"Error adding finding to vector store: {e}")
+        results = [hit for hits in per_collection for hit in self._normalize_scores(hits)]
+        return heapq.nlargest(n_results, results, key=lambda hit: (hit["normalized_score"], hit["score"]))
 
-    async def add_report(self, report: Dict[str, Any]):
-        """Add report to vector store"""
-        try:
-            doc_id = report.get("id", str(uuid.uuid4()))
-            text = f"{report.get('title', '')} {report.get('summary', '')} {report.get('content', '')[:1000]}"
+    async def _keyword_search(
+        self,
+        query: str,
+        search_collections: List[Tuple[str, Any]],
+        n_results: int,
+        where: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """BM25 over each collection's keyword index, merged by normalized score"""
+        if not self.keyword_indexes:
+            return []
 
-            self.reports_collection.add(
-                documents=[text],
-                metadatas=[report],
-                ids=[doc_id]
+        loop = asyncio.get_running_loop()
+        per_collection = await asyncio.gather(*(
+            loop.run_in_executor(
+                self._executor,
+                functools.partial(self._keyword_query_collection, name, collection, query, n_results, where)
             )
+            for name, collection in search_collections
+        ))
 
-            app_logger.info(f"Added report to vector store: {doc_id}")
-        except Exception as e:
-            app_logger.error(f"Error adding report to vector store: {e}")
+        results = [hit for hits in per_collection for hit in hits]
+        return heapq.nlargest(n_results, results, key=lambda hit: hit["normalized_score"])
 
-    async def search(
+    async def _hybrid_search(
         self,
         query: str,
-        collection_name: str = "all",
-        n_results: int = 5
+        search_collections: List[Tuple[str, Any]],
+        n_results: int,
+        where: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Reciprocal rank fusion of vector and keyword rankings
+
+        Each list contributes 1 / (HYBRID_RRF_K + rank) per document, so
+        documents ranked well by both come first without having to
+        reconcile cosine and BM25 score scales.
+        """
+        candidates = n_results * 2
+        rankings = await asyncio.gather(
+            self._vector_search(query, search_collections, candidates, where),
+            self._keyword_search(query, search_collections, candidates, where)
+        )
+
+        fused: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for ranking in rankings:
+            for rank, hit in enumerate(ranking, start=1):
+                key = (hit["collection"], hit["id"])
+                entry = fused.setdefault(key, {**hit, "rrf_score": 0.0})
+                entry["rrf_score"] += 1 / (settings.HYBRID_RRF_K + rank)
+                if hit.get("distance") is not None:
+                    entry["distance"] = hit["distance"]
+                entry["score"] = max(entry["score"], hit["score"])
+
+        return heapq.nlargest(n_results, fused.values(), key=lambda hit: (hit["rrf_score"], hit["score"]))
+
+    def _query_collection(
+        self,
+        name: str,
+        collection,
+        query_embedding: List[float],
+        n_results: int,
+        where: Optional[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
-        """Search across collections"""
+        """Query one collection (blocking); errors only drop this collection's hits"""
         try:
-            results = []
+            # Querying an empty collection raises in chromadb
+            if not collection.count():
+                return []
 
-            collections = {
-                "competitors": self.competitors_collection,
-                "trends": self.trends_collection,
-                "findings": self.findings_collection,
-                "reports": self.reports_collection
-            }
+            search_results = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=n_results,
+                where=where or None
+            )
+        except Exception as e:
+            app_logger.error(f"Error searching {name} collection: {e}")
+            return []
 
-            search_collections = (
-                collections.values() if collection_name == "all"
-                else [collections.get(collection_name)]
+        hits = []
+        if search_results and search_results.get("metadatas"):
+            for i, metadata in enumerate(search_results["metadatas"][0]):
+                distance = search_results["distances"][0][i] if search_results.get("distances") else 0
+                hits.append({
+                    "id": search_results["ids"][0][i],
+                    "collection": name,
+                    "metadata": metadata,
+                    "distance": distance,
+                    "score": self._score(distance),
+                    "document": search_results["documents"][0][i] if search_results.get("documents") else ""
+                })
+        return hits
+
+    def _keyword_query_collection(
+        self,
+        name: str,
+        collection,
+        query: str,
+        n_results: int,
+        where: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """BM25 query against one collection's index (blocking)"""
+        index = self.keyword_indexes.get(name)
+        if not index:
+            return []
+
+        try:
+            # Over-fetch when filtering, since some hits may not pass `where`
+            ranked = index.search(query, n_results * 4 if where else n_results)
+            if not ranked:
+                return []
+
+            found = collection.get(
+                ids=[doc_id for doc_id, _ in ranked],
+                where=where or None,
+                include=["documents", "metadatas"]
             )
+        except Exception as e:
+            app_logger.error(f"Error keyword searching {name} collection: {e}")
+            return []
 
-            for collection in search_collections:
-                if collection:
-                    search_results = collection.query(
-                        query_texts=[query],
-                        n_results=n_results
-                    )
+        documents = {
+            doc_id: (found["documents"][i], found["metadatas"][i])
+            for i, doc_id in enumerate(found.get("ids", []))
+        }
+        top_score = ranked[0][1]
+
+        hits = []
+        for doc_id, bm25 in ranked:
+            if doc_id not in documents or len(hits) == n_results:
+                continue
+            document, metadata = documents[doc_id]
+            hits.append({
+                "id": doc_id,
+                "collection": name,
+                "metadata": metadata,
+                "distance": None,
+                "score": bm25 / top_score,
+                "normalized_score": bm25 / top_score,
+                "bm25": bm25,
+                "document": document
+            })
+        return hits
+
+    @staticmethod
+    def _group_by_parent(hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fold ranked chunk hits into one result per parent, keeping the best chunk"""
+        grouped: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for hit in hits:
+            parent_id = hit["metadata"].get("parent_id")
+            if parent_id is None:
+                grouped.setdefault((hit["collection"], hit["id"]), hit)
+                continue
 
-                    # Format results
-                    if search_results and search_results.get("metadatas"):
-                        for i, metadata in enumerate(search_results["metadatas"][0]):
-                            results.append({
-                                "metadata": metadata,
-                                "distance": search_results["distances"][0][i] if "distances" in search_results else 0,
-                                "document": search_results["documents"][0][i] if "documents" in search_results else ""
-                            })
+            key = (hit["collection"], parent_id)
+            if key not in grouped:
+                grouped[key] = {**hit, "id": parent_id, "chunk_id": hit["id"], "matched_chunks": []}
+            grouped[key]["matched_chunks"].append(hit["metadata"].get("chunk_index"))
 
-            # Sort by distance (relevance)
-            results.sort(key=lambda x: x["distance"])
+        return list(grouped.values())
 
-            return results[:n_results]
+    @staticmethod
+    def _normalize_scores(hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Min-max normalize scores within one collection's hits
+
+        A collection's best hit always maps to 1.0. With a single hit, or no
+        spread in scores, every hit ties for best at 1.0; keeping raw scores
+        there would rank a lone hit below even the worst normalized hit of a
+        collection with several, biasing the merge by hit count. Ties are
+        broken by raw score when collections are merged.
+        """
+        if not hits:
+            return hits
+
+        scores = [hit["score"] for hit in hits]
+        low, high = min(scores), max(scores)
+        for hit in hits:
+            hit["normalized_score"] = (hit["score"] - low) / (high - low) if high > low else 1.0
+        return hits
+
+    async def get_documents(self, ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Fetch documents by id from whichever collections hold them
+
+        For chunked collections the ids are parent ids and the first chunk
+        of each parent is returned.
+        """
+        if not ids:
+            return []
+
+        def read_documents() -> List[Dict[str, Any]]:
+            results = []
+            for name, collection in self.collections.items():
+                if not collection:
+                    continue
+                if name in CHUNKED_SECTIONS:
+                    found = collection.get(
+                        where={"$and": [{"parent_id": {"$in": ids}}, {"chunk_index": 0}]},
+                        include=["documents", "metadatas"]
+                    )
+                else:
+                    found = collection.get(ids=ids, include=["documents", "metadatas"])
+                for i, doc_id in enumerate(found.get("ids", [])):
+                    results.append({
+                        "id": doc_id,
+                        "collection": name,
+                        "metadata": found["metadatas"][i],
+                        "distance": 0.0,
+                        "score": 1.0,
+                        "document": found["documents"][i]
+                    })
+            return results
+
+        try:
+            await self.ensure_loaded()
+            # Chroma reads block, so keep them off the event loop
+            return await asyncio.to_thread(read_documents)
         except Exception as e:
-            app_logger.error(f"Error searching vector store: {e}")
+            app_logger.error(f"Error fetching documents from vector store: {e}")
             return []
 
     async def search_similar(
         self,
         text: str,
         collection_name: str,
-        n_results: int = 5
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        mode: str = "vector",
+        group_by_parent: bool = True
     ) -> List[Dict[str, Any]]:
-        """Find similar documents"""
-        return await self.search(text, collection_name, n_results)
+        """Find similar documents (one result per parent document)"""
+        return await self.search(text, collection_name, n_results, where, mode, group_by_parent)
 
 
 # Global instance
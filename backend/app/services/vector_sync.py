@@ -0,0 +1,319 @@
+"""
+Incremental Supabase -> vector store sync
+
+Each synced table keeps a high-water mark, the (timestamp, id) of the last
+row indexed, persisted to VECTOR_SYNC_STATE_PATH. A sync cycle pages through
+rows in ascending keyset order and upserts them in batches; unchanged text
+is served from the embedding cache, so only edited fields cost an encoder
+pass. Timestamps are set by the writer, and a row can commit after a
+later-stamped one, so a row may land behind the mark after it has moved on:
+each cycle therefore starts VECTOR_SYNC_LOOKBACK_SECONDS behind the mark
+(upserts are idempotent). Every few cycles the indexed ids are reconciled
+against the table: rows deleted upstream are removed from Chroma and the
+keyword index, and rows missing from the index are indexed.
+
+The worker runs as a background task in the API process (woken early by
+SupabaseClient writes) or standalone via scripts/sync_vector_store.py. In
+the API it waits for the embedding model to be loaded (by warm-up or first
+use) before its first cycle, so it never loads the model at startup itself.
+"""
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.logger import app_logger
+from app.core.metrics import latency_tracker
+from app.services.vector_store import vector_store
+from database.supabase_client import supabase_client
+import asyncio
+import json
+import os
+import time
+
+# Synced table -> (vector store collection, high-water mark column).
+# Findings and reports are rewritten by upserts, so every table is tracked
+# by updated_at, which a database trigger bumps on each update.
+SYNC_TABLES = {
+    "competitors": ("competitors", "updated_at"),
+    "trends": ("trends", "updated_at"),
+    "research_findings": ("findings", "updated_at"),
+    "reports": ("reports", "updated_at"),
+}
+
+# Ids per request when fetching rows missing from the index (bounded by URL length)
+RECONCILE_FETCH_SIZE = 100
+
+# How often a worker started with wait_for_model checks whether the model is loaded
+MODEL_WAIT_POLL_SECONDS = 1.0
+
+lag_tracker = latency_tracker("vector_sync_lag")
+
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    """Parse an ISO-8601 timestamp (naive values are UTC)"""
+    try:
+        moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _age_seconds(value: Any) -> Optional[float]:
+    """Seconds since an ISO-8601 timestamp"""
+    moment = _parse_time(value)
+    if moment is None:
+        return None
+    return max(0.0, (datetime.now(timezone.utc) - moment).total_seconds())
+
+
+def _position(value: Any, row_id: Any) -> Tuple[datetime, str]:
+    """Keyset position of a (timestamp, id) pair, for comparing against a mark"""
+    return _parse_time(value) or datetime.min.replace(tzinfo=timezone.utc), str(row_id or "")
+
+
+class VectorSyncWorker:
+    """Keeps the vector store collections in step with their Supabase tables"""
+
+    def __init__(
+        self,
+        state_path: str = settings.VECTOR_SYNC_STATE_PATH,
+        page_size: int = settings.VECTOR_SYNC_PAGE_SIZE,
+        interval_seconds: int = settings.VECTOR_SYNC_INTERVAL_SECONDS,
+        reconcile_every: int = settings.VECTOR_SYNC_RECONCILE_EVERY,
+        lookback_seconds: int = settings.VECTOR_SYNC_LOOKBACK_SECONDS
+    ):
+        self.state_path = Path(state_path)
+        self.page_size = page_size
+        self.interval_seconds = interval_seconds
+        self.reconcile_every = reconcile_every
+        self.lookback_seconds = lookback_seconds
+
+        self.marks: Dict[str, Dict[str, Any]] = self._load_marks()
+        self.cycles = 0
+        self.last_cycle_at: Optional[str] = None
+        self.table_stats: Dict[str, Dict[str, Any]] = {
+            table: {
+                "rows_synced": 0,
+                "rows_deleted": 0,
+                "rows_repaired": 0,
+                "last_batch_rows": 0,
+                "rows_per_second": 0.0,
+                "lag_seconds": None,
+                "errors": 0,
+                "last_error": None
+            }
+            for table in SYNC_TABLES
+        }
+
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    # State
+
+    def _load_marks(self) -> Dict[str, Dict[str, Any]]:
+        if not self.state_path.exists():
+            return {}
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except Exception as e:
+            app_logger.error(f"Could not read vector sync state, resyncing from scratch: {e}")
+            return {}
+
+    def _save_marks(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.state_path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(self.marks), encoding="utf-8")
+        os.replace(temporary, self.state_path)
+
+    def reset(self, table: Optional[str] = None):
+        """Forget high-water marks so the next cycle re-reads everything"""
+        if table:
+            self.marks.pop(table, None)
+        else:
+            self.marks = {}
+        self._save_marks()
+
+    # Sync
+
+    def notify(self, table: str, rows=None):
+        """Write listener: wake the worker when a synced table changes"""
+        if table in SYNC_TABLES:
+            self._wake.set()
+
+    def _cycle_start(self, table: str) -> Tuple[Optional[Any], Optional[str]]:
+        """Where a cycle starts reading: the mark, less the lookback window"""
+        mark = self.marks.get(table, {})
+        moment = _parse_time(mark.get("value")) if mark else None
+        if moment is None or not self.lookback_seconds:
+            return mark.get("value"), mark.get("id")
+        return (moment - timedelta(seconds=self.lookback_seconds)).isoformat(), None
+
+    async def sync_table(self, table: str) -> int:
+        """Index every row changed since the table's mark (and within the lookback window); return rows written"""
+        collection, column = SYNC_TABLES[table]
+        stats = self.table_stats[table]
+        started = time.perf_counter()
+        written = 0
+        after, after_id = self._cycle_start(table)
+
+        while True:
+            rows = await supabase_client.get_rows_changed_since(
+                table, column, after, after_id, limit=self.page_size
+            )
+            if not rows:
+                break
+
+            mark = self.marks.get(table, {})
+            mark_position = _position(mark.get("value"), mark.get("id")) if mark else None
+            new_rows = [
+                row for row in rows
+                if mark_position is None or _position(row.get(column), row.get("id")) > mark_position
+            ]
+
+            if new_rows:
+                stats["lag_seconds"] = _age_seconds(new_rows[0].get(column))
+            count = await vector_store.add_many(collection, rows)
+            if count < len({row.get("id") for row in rows}):
+                # Leave the mark where it is so the page is retried next cycle
+                raise RuntimeError(f"only {count} of {len(rows)} {table} rows were indexed")
+
+            # Rows re-read from the lookback window are not new, so they do not count towards lag
+            for row in new_rows:
+                age = _age_seconds(row.get(column))
+                if age is not None:
+                    lag_tracker.record(age * 1000)
+
+            last = rows[-1]
+            after, after_id = last.get(column), last.get("id")
+            if new_rows:
+                self.marks[table] = {"value": after, "id": after_id}
+                self._save_marks()
+            written += count
+
+            if len(rows) < self.page_size:
+                break
+
+        elapsed = time.perf_counter() - started
+        stats["lag_seconds"] = 0.0
+        stats["rows_synced"] += written
+        stats["last_batch_rows"] = written
+        stats["rows_per_second"] = round(written / elapsed, 1) if written and elapsed else 0.0
+        return written
+
+    async def reconcile(self, table: str) -> Dict[str, int]:
+        """
+        Remove indexed records whose rows no longer exist, and index rows the
+        incremental sync missed; return the number of records removed and added
+        """
+        collection, _ = SYNC_TABLES[table]
+        stats = self.table_stats[table]
+
+        # Snapshot the index before the table, so rows indexed in between are never seen as stale
+        indexed = await vector_store.list_ids(collection)
+
+        source = set()
+        after_id = None
+        while True:
+            ids = await supabase_client.get_ids(table, after_id=after_id, limit=self.page_size * 5)
+            source.update(ids)
+            if len(ids) < self.page_size * 5:
+                break
+            after_id = ids[-1]
+
+        stale = sorted(indexed - source)
+        if stale:
+            await vector_store.delete_many(collection, stale)
+            stats["rows_deleted"] += len(stale)
+            app_logger.info(f"Removed {len(stale)} deleted {table} rows from the vector store")
+
+        # Rows inserted after the index snapshot show up here too; re-adding them is harmless
+        missing = sorted(source - indexed)
+        repaired = 0
+        for start in range(0, len(missing), RECONCILE_FETCH_SIZE):
+            rows = await supabase_client.get_rows_by_ids(table, missing[start:start + RECONCILE_FETCH_SIZE])
+            if rows:
+                repaired += await vector_store.add_many(collection, rows)
+        if repaired:
+            stats["rows_repaired"] += repaired
+            app_logger.info(f"Indexed {repaired} {table} rows missing from the vector store")
+
+        return {"deleted": len(stale), "repaired": repaired}
+
+    async def run_once(self, reconcile: Optional[bool] = None) -> Dict[str, int]:
+        """Run one sync cycle over every table; return rows written per table"""
+        async with self._lock:
+            self.cycles += 1
+            if reconcile is None:
+                reconcile = self.reconcile_every > 0 and (self.cycles - 1) % self.reconcile_every == 0
+
+            written = {}
+            for table in SYNC_TABLES:
+                try:
+                    written[table] = await self.sync_table(table)
+                    if reconcile:
+                        await self.reconcile(table)
+                except Exception as e:
+                    written[table] = 0
+                    self.table_stats[table]["errors"] += 1
+                    self.table_stats[table]["last_error"] = str(e)
+                    app_logger.error(f"Vector sync failed for {table}: {e}")
+
+            self.last_cycle_at = datetime.utcnow().isoformat()
+            return written
+
+    async def run(self, wait_for_model: bool = False):
+        """Sync forever, every interval or as soon as a write is noticed"""
+        if wait_for_model and not vector_store.is_loaded:
+            app_logger.info("Vector sync worker waiting for the embedding model to load")
+            while not vector_store.is_loaded:
+                await asyncio.sleep(MODEL_WAIT_POLL_SECONDS)
+
+        app_logger.info("Vector sync worker started")
+        while True:
+            self._wake.clear()
+            await self.run_once()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self, wait_for_model: bool = False):
+        """
+        Start the worker as a background task on the running loop; with
+        wait_for_model, the first cycle waits until something else has loaded
+        the embedding model
+        """
+        if not supabase_client.client:
+            app_logger.warning("Supabase client not initialized - vector sync worker not started")
+            return
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self.run(wait_for_model=wait_for_model))
+
+    async def stop(self):
+        """Cancel the background task"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """High-water marks, lag and throughput per table"""
+        return {
+            "running": bool(self._task and not self._task.done()),
+            "cycles": self.cycles,
+            "last_cycle_at": self.last_cycle_at,
+            "tables": {
+                table: {"mark": self.marks.get(table), **stats}
+                for table, stats in self.table_stats.items()
+            },
+            "lag_ms": lag_tracker.summary()
+        }
+
+
+# Global instance
+vector_sync = VectorSyncWorker()
+supabase_client.add_write_listener(vector_sync.notify)
@@ -1,44 +1,209 @@
 """
 Supabase database client and operations
+
+Queries go straight to Supabase's PostgREST API through one shared
+httpx.AsyncClient, so database I/O never blocks the event loop and
+concurrent requests reuse pooled keep-alive connections.
 """
-from supabase import create_client, Client
-from typing import List, Dict, Any, Optional
+import base64
+import httpx
+import json
+from collections import OrderedDict
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from app.core.config import settings
 from app.core.logger import app_logger
 
+QueryParams = List[Tuple[str, Any]]
+WriteListener = Callable[[str, List[Dict[str, Any]]], None]
+
+
+def encode_cursor(row: Dict[str, Any], order_column: str) -> str:
+    """Encode the keyset position of a row as an opaque cursor"""
+    payload = json.dumps([row.get(order_column), row.get("id")])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    """Decode a cursor produced by encode_cursor; raises ValueError if malformed"""
+    try:
+        value, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return value, last_id
+
+
+def next_cursor(rows: List[Dict[str, Any]], limit: Optional[int], order_column: str = "created_at") -> Optional[str]:
+    """Return the cursor for the following page, or None on the last page"""
+    if not limit or len(rows) < limit:
+        return None
+    return encode_cursor(rows[-1], order_column)
+
 
 class SupabaseClient:
-    """Wrapper for Supabase operations"""
+    """Async wrapper for Supabase operations"""
 
     def __init__(self):
         try:
-            self.client: Client = create_client(
-                settings.SUPABASE_URL,
-                settings.SUPABASE_KEY
+            if not settings.SUPABASE_URL or not settings.SUPABASE_KEY:
+                raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set")
+
+            self.client: Optional[httpx.AsyncClient] = httpx.AsyncClient(
+                base_url=f"{settings.SUPABASE_URL.rstrip('/')}/rest/v1",
+                headers={
+                    "apikey": settings.SUPABASE_KEY,
+                    "Authorization": f"Bearer {settings.SUPABASE_KEY}"
+                },
+                limits=httpx.Limits(
+                    max_connections=settings.SUPABASE_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.SUPABASE_MAX_KEEPALIVE_CONNECTIONS
+                ),
+                timeout=settings.SUPABASE_TIMEOUT_SECONDS
             )
             app_logger.info("Supabase client initialized")
         except Exception as e:
             # Defer failure: allow application to start even if Supabase
-            # client cannot be created (version mismatch, network issue, etc.).
+            # client cannot be created (missing config, bad URL, etc.).
             app_logger.error(f"Failed to initialize Supabase client: {e}")
             self.client = None
 
+        # Reports only change through upsert_report (a retried job rewriting
+        # its own report), which invalidates them, so point lookups are
+        # cached per process, keyed by (report_id, columns)
+        self._report_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+
+        # Callbacks notified with (table, rows) after every successful write
+        self._write_listeners: List[WriteListener] = []
+
+    async def close(self):
+        """Close pooled connections"""
+        if self.client:
+            await self.client.aclose()
+
+    def add_write_listener(self, listener: WriteListener):
+        """Register a callback invoked with (table, rows) after each insert/update/upsert"""
+        self._write_listeners.append(listener)
+
+    def _notify_write(self, table: str, rows: List[Dict[str, Any]]):
+        """Notify write listeners; a failing listener never fails the write"""
+        for listener in self._write_listeners:
+            try:
+                listener(table, rows)
+            except Exception as e:
+                app_logger.error(f"Write listener failed for {table}: {e}")
+
+    # PostgREST helpers
+    async def _select(self, table: str, params: QueryParams) -> List[Dict[str, Any]]:
+        """Run a GET against a table and return the matching rows"""
+        response = await self.client.get(f"/{table}", params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def _insert(self, table: str, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Insert a row and return the stored representation"""
+        response = await self.client.post(
+            f"/{table}",
+            json=data,
+            headers={"Prefer": "return=representation"}
+        )
+        response.raise_for_status()
+        rows = response.json()
+        self._notify_write(table, rows)
+        return rows
+
+    async def _update(self, table: str, data: Dict[str, Any], params: QueryParams) -> List[Dict[str, Any]]:
+        """Update rows matching the filters and return them"""
+        response = await self.client.patch(
+            f"/{table}",
+            params=params,
+            json=data,
+            headers={"Prefer": "return=representation"}
+        )
+        response.raise_for_status()
+        rows = response.json()
+        self._notify_write(table, rows)
+        return rows
+
+    async def _upsert(self, table: str, data: Dict[str, Any], on_conflict: str) -> List[Dict[str, Any]]:
+        """Insert or merge a row on the given unique column"""
+        response = await self.client.post(
+            f"/{table}",
+            params=[("on_conflict", on_conflict)],
+            json=data,
+            headers={"Prefer": "resolution=merge-duplicates,return=representation"}
+        )
+        response.raise_for_status()
+        rows = response.json()
+        self._notify_write(table, rows)
+        return rows
+
+    async def _rpc(self, function: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Call a Postgres function exposed through PostgREST"""
+        response = await self.client.post(f"/rpc/{function}", json=params or {})
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    def _eq(value: Any) -> str:
+        """Format an equality filter value"""
+        if isinstance(value, bool):
+            return f"eq.{str(value).lower()}"
+        return f"eq.{value}"
+
+    @staticmethod
+    def _page_params(
+        order_column: str,
+        limit: Optional[int],
+        cursor: Optional[str],
+        columns: str
+    ) -> QueryParams:
+        """
+        Build select/order/limit params for keyset pagination
+
+        Rows are ordered by (order_column, id) descending; the cursor holds
+        the last row's values so the next page starts strictly after it.
+        """
+        if columns != "*":
+            selected = columns.split(",")
+            columns = ",".join(selected + [c for c in (order_column, "id") if c not in selected])
+
+        params: QueryParams = [
+            ("select", columns),
+            ("order", f"{order_column}.desc,id.desc")
+        ]
+
+        if cursor:
+            value, last_id = decode_cursor(cursor)
+            params.append((
+                "or",
+                f'({order_column}.lt."{value}",and({order_column}.eq."{value}",id.lt."{last_id}"))'
+            ))
+
+        if limit:
+            params.append(("limit", limit))
+
+        return params
+
     # Competitor Operations
-    async def get_competitors(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Fetch all competitors with optional filters"""
+    async def get_competitors(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        columns: str = "*"
+    ) -> List[Dict[str, Any]]:
+        """Fetch competitors (newest first) with optional filters and keyset pagination"""
         if not self.client:
             app_logger.error("Supabase client not initialized - cannot fetch competitors")
             return []
 
         try:
-            query = self.client.table("competitors").select("*")
+            params = self._page_params("created_at", limit, cursor, columns)
 
             if filters:
                 for key, value in filters.items():
-                    query = query.eq(key, value)
+                    params.append((key, self._eq(value)))
 
-            response = query.execute()
-            return response.data
+            return await self._select("competitors", params)
         except Exception as e:
             app_logger.error(f"Error fetching competitors: {e}")
             return []
@@ -50,8 +215,8 @@ class SupabaseClient:
             return None
 
         try:
-            response = self.client.table("competitors").select("*").eq("id", competitor_id).execute()
-            return response.data[0] if response.data else None
+            rows = await self._select("competitors", [("select", "*"), ("id", self._eq(competitor_id))])
+            return rows[0] if rows else None
         except Exception as e:
             app_logger.error(f"Error fetching competitor {competitor_id}: {e}")
             return None
@@ -63,8 +228,8 @@ class SupabaseClient:
             return None
 
         try:
-            response = self.client.table("competitors").insert(competitor_data).execute()
-            return response.data[0] if response.data else None
+            rows = await self._insert("competitors", competitor_data)
+            return rows[0] if rows else None
         except Exception as e:
             app_logger.error(f"Error creating competitor: {e}")
             return None
@@ -76,28 +241,33 @@ class SupabaseClient:
             return None
 
         try:
-            response = self.client.table("competitors").update(update_data).eq("id", competitor_id).execute()
-            return response.data[0] if response.data else None
+            rows = await self._update("competitors", update_data, [("id", self._eq(competitor_id))])
+            return rows[0] if rows else None
         except Exception as e:
             app_logger.error(f"Error updating competitor {competitor_id}: {e}")
             return None
 
     # Trend Operations
-    async def get_trends(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Fetch all trends with optional filters"""
+    async def get_trends(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        columns: str = "*"
+    ) -> List[Dict[str, Any]]:
+        """Fetch trends (newest first) with optional filters and keyset pagination"""
         if not self.client:
             app_logger.error("Supabase client not initialized - cannot fetch trends")
             return []
 
         try:
-            query = self.client.table("trends").select("*")
+            params = self._page_params("created_at", limit, cursor, columns)
 
             if filters:
                 for key, value in filters.items():
-                    query = query.eq(key, value)
+                    params.append((key, self._eq(value)))
 
-            response = query.order("created_at", desc=True).execute()
-            return response.data
+            return await self._select("trends", params)
         except Exception as e:
             app_logger.error(f"Error fetching trends: {e}")
             return []
@@ -109,27 +279,32 @@ class SupabaseClient:
             return None
 
         try:
-            response = self.client.table("trends").insert(trend_data).execute()
-            return response.data[0] if response.data else None
+            rows = await self._insert("trends", trend_data)
+            return rows[0] if rows else None
         except Exception as e:
             app_logger.error(f"Error creating trend: {e}")
             return None
 
     # Research Finding Operations
-    async def get_findings(self, competitor_id: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Fetch research findings, optionally filtered by competitor"""
+    async def get_findings(
+        self,
+        competitor_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        columns: str = "*"
+    ) -> List[Dict[str, Any]]:
+        """Fetch research findings (newest first), optionally filtered by competitor and paginated"""
         if not self.client:
             app_logger.error("Supabase client not initialized - cannot fetch findings")
             return []
 
         try:
-            query = self.client.table("research_findings").select("*")
+            params = self._page_params("created_at", limit, cursor, columns)
 
             if competitor_id:
-                query = query.eq("competitor_id", competitor_id)
+                params.append(("competitor_id", self._eq(competitor_id)))
 
-            response = query.order("created_at", desc=True).execute()
-            return response.data
+            return await self._select("research_findings", params)
         except Exception as e:
             app_logger.error(f"Error fetching findings: {e}")
             return []
@@ -141,49 +316,139 @@ class SupabaseClient:
             return None
 
         try:
-            response = self.client.table("research_findings").insert(finding_data).execute()
-            return response.data[0] if response.data else None
+            rows = await self._insert("research_findings", finding_data)
+            return rows[0] if rows else None
         except Exception as e:
             app_logger.error(f"Error creating finding: {e}")
             return None
 
+    async def upsert_finding(self, finding_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Create or replace a research finding by id, so a retried write never duplicates it"""
+        if not self.client:
+            app_logger.error("Supabase client not initialized - cannot upsert finding")
+            return None
+
+        try:
+            rows = await self._upsert("research_findings", finding_data, on_conflict="id")
+            return rows[0] if rows else None
+        except Exception as e:
+            app_logger.error(f"Error upserting finding: {e}")
+            return None
+
     # Report Operations
-    async def get_reports(self, limit: int = 50) -> List[Dict[str, Any]]:
-        """Fetch generated reports"""
+    async def get_reports(
+        self,
+        limit: Optional[int] = 50,
+        cursor: Optional[str] = None,
+        columns: str = "*"
+    ) -> List[Dict[str, Any]]:
+        """Fetch generated reports (newest first) with keyset pagination"""
         if not self.client:
             app_logger.error("Supabase client not initialized - cannot fetch reports")
             return []
 
         try:
-            response = self.client.table("reports").select("*").order("created_at", desc=True).limit(limit).execute()
-            return response.data
+            return await self._select("reports", self._page_params("created_at", limit, cursor, columns))
         except Exception as e:
             app_logger.error(f"Error fetching reports: {e}")
             return []
 
+    async def get_report_by_id(self, report_id: str, columns: str = "*") -> Optional[Dict[str, Any]]:
+        """Fetch a single report by ID, selecting only the given columns"""
+        cache_key = (report_id, columns)
+        cached = self._report_cache.get(cache_key)
+        if cached is not None:
+            self._report_cache.move_to_end(cache_key)
+            return dict(cached)
+
+        if not self.client:
+            app_logger.error("Supabase client not initialized - cannot fetch report by id")
+            return None
+
+        try:
+            rows = await self._select("reports", [
+                ("select", columns),
+                ("id", self._eq(report_id)),
+                ("limit", 1)
+            ])
+        except Exception as e:
+            app_logger.error(f"Error fetching report {report_id}: {e}")
+            return None
+
+        if not rows:
+            return None
+
+        self._report_cache[cache_key] = rows[0]
+        while len(self._report_cache) > settings.REPORT_CACHE_MAX_ENTRIES:
+            self._report_cache.popitem(last=False)
+
+        return dict(rows[0])
+
+    def _invalidate_report(self, report_id: Optional[str]):
+        """Drop every cached projection of a report"""
+        for key in [k for k in self._report_cache if k[0] == report_id]:
+            del self._report_cache[key]
+
     async def create_report(self, report_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Create a new report"""
         if not self.client:
             app_logger.error("Supabase client not initialized - cannot create report")
             return None
 
+        self._invalidate_report(report_data.get("id"))
+
         try:
-            response = self.client.table("reports").insert(report_data).execute()
-            return response.data[0] if response.data else None
+            rows = await self._insert("reports", report_data)
+            return rows[0] if rows else None
         except Exception as e:
             app_logger.error(f"Error creating report: {e}")
             return None
 
+    async def upsert_report(self, report_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Create or replace a report by id, so a retried job never duplicates it"""
+        if not self.client:
+            app_logger.error("Supabase client not initialized - cannot upsert report")
+            return None
+
+        self._invalidate_report(report_data.get("id"))
+
+        try:
+            rows = await self._upsert("reports", report_data, on_conflict="id")
+            return rows[0] if rows else None
+        except Exception as e:
+            app_logger.error(f"Error upserting report: {e}")
+            return None
+
+    # Analytics Operations
+    async def get_analytics_metrics(self, top_industry_limit: int = 5) -> Optional[Dict[str, Any]]:
+        """Fetch dashboard aggregates computed by the get_analytics_metrics() database function"""
+        if not self.client:
+            app_logger.error("Supabase client not initialized - cannot fetch analytics metrics")
+            return None
+
+        try:
+            return await self._rpc("get_analytics_metrics", {"top_industry_limit": top_industry_limit})
+        except Exception as e:
+            app_logger.error(f"Error fetching analytics metrics: {e}")
+            return None
+
     # Conversation Operations
-    async def get_conversations(self, user_id: str) -> List[Dict[str, Any]]:
-        """Fetch chat conversations for a user"""
+    async def get_conversations(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        columns: str = "*"
+    ) -> List[Dict[str, Any]]:
+        """Fetch chat conversations for a user (most recently updated first)"""
         if not self.client:
             app_logger.error("Supabase client not initialized - cannot fetch conversations")
             return []
 
         try:
-            response = self.client.table("conversations").select("*").eq("user_id", user_id).order("updated_at", desc=True).execute()
-            return response.data
+            params = self._page_params("updated_at", limit, cursor, columns)
+            params.append(("user_id", self._eq(user_id)))
+            return await self._select("conversations", params)
         except Exception as e:
             app_logger.error(f"Error fetching conversations: {e}")
             return []
@@ -195,8 +460,8 @@ class SupabaseClient:
             return None
 
         try:
-            response = self.client.table("conversations").insert(conversation_data).execute()
-            return response.data[0] if response.data else None
+            rows = await self._insert("conversations", conversation_data)
+            return rows[0] if rows else None
         except Exception as e:
             app_logger.error(f"Error creating conversation: {e}")
             return None
@@ -208,8 +473,8 @@ class SupabaseClient:
             return None
 
         try:
-            response = self.client.table("conversations").update(update_data).eq("id", conversation_id).execute()
-            return response.data[0] if response.data else None
+            rows = await self._update("conversations", update_data, [("id", self._eq(conversation_id))])
+            return rows[0] if rows else None
         except Exception as e:
             app_logger.error(f"Error updating conversation: {e}")
             return None
@@ -222,8 +487,8 @@ class SupabaseClient:
             return None
 
         try:
-            response = self.client.table("integration_settings").select("*").eq("user_id", user_id).execute()
-            return response.data[0] if response.data else None
+            rows = await self._select("integration_settings", [("select", "*"), ("user_id", self._eq(user_id))])
+            return rows[0] if rows else None
         except Exception as e:
             app_logger.error(f"Error fetching integration settings: {e}")
             return None
@@ -238,13 +503,188 @@ class SupabaseClient:
             # Add user_id to the data
             settings_data["user_id"] = user_id
 
-            # Upsert (insert or update if exists)
-            response = self.client.table("integration_settings").upsert(settings_data).execute()
-            return response.data[0] if response.data else None
+            # Upsert (insert or update if a row for this user exists)
+            rows = await self._upsert("integration_settings", settings_data, on_conflict="user_id")
+            return rows[0] if rows else None
         except Exception as e:
             app_logger.error(f"Error upserting integration settings: {e}")
             return None
 
 
+    # Dashboard snapshot Operations
+    async def get_latest_rows(self, table: str, limit: int, columns: str = "*") -> List[Dict[str, Any]]:
+        """
+        Fetch a table's newest rows
+
+        Raises on failure, so a precomputed view keeps its previous rows
+        instead of caching an error as an empty list.
+        """
+        if not self.client:
+            raise RuntimeError("Supabase client not initialized")
+
+        return await self._select(table, self._page_params("created_at", limit, None, columns))
+
+    async def fetch_analytics_metrics(self, top_industry_limit: int = 5) -> Optional[Dict[str, Any]]:
+        """Fetch dashboard aggregates like get_analytics_metrics, but raise on failure"""
+        if not self.client:
+            raise RuntimeError("Supabase client not initialized")
+
+        return await self._rpc("get_analytics_metrics", {"top_industry_limit": top_industry_limit})
+
+    # Change feed Operations
+    async def get_rows_changed_since(
+        self,
+        table: str,
+        column: str,
+        after: Optional[Any] = None,
+        after_id: Optional[str] = None,
+        limit: int = 500,
+        columns: str = "*"
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch rows whose (column, id) is past a high-water mark, oldest first
+
+        Without `after_id`, every row with column >= `after` is returned.
+        Raises on failure, so a sync loop retries from the same mark instead
+        of mistaking an error for "no changes".
+        """
+        if not self.client:
+            raise RuntimeError("Supabase client not initialized")
+
+        params: QueryParams = [("select", columns), ("order", f"{column}.asc,id.asc"), ("limit", limit)]
+        if after is not None and after_id is None:
+            params.append((column, f"gte.{after}"))
+        elif after is not None:
+            params.append(("or", f'({column}.gt."{after}",and({column}.eq."{after}",id.gt."{after_id}"))'))
+        return await self._select(table, params)
+
+    async def get_rows_by_ids(self, table: str, ids: List[str], columns: str = "*") -> List[Dict[str, Any]]:
+        """Fetch the rows with the given ids; raises on failure"""
+        if not self.client:
+            raise RuntimeError("Supabase client not initialized")
+        if not ids:
+            return []
+
+        params: QueryParams = [("select", columns), ("id", f"in.({','.join(ids)})")]
+        return await self._select(table, params)
+
+    async def get_ids(self, table: str, after_id: Optional[str] = None, limit: int = 1000) -> List[str]:
+        """
+        Fetch one page of a table's ids in ascending order
+
+        Raises on failure: callers use the full id set to detect deleted
+        rows, and an empty page must never be mistaken for an empty table.
+        """
+        if not self.client:
+            raise RuntimeError("Supabase client not initialized")
+
+        params: QueryParams = [("select", "id"), ("order", "id.asc"), ("limit", limit)]
+        if after_id:
+            params.append(("id", f"gt.{after_id}"))
+        return [row["id"] for row in await self._select(table, params)]
+
+    # Job Operations
+    async def create_job(self, job_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Insert a queued background job"""
+        if not self.client:
+            app_logger.error("Supabase client not initialized - cannot create job")
+            return None
+
+        try:
+            rows = await self._insert("jobs", job_data)
+            return rows[0] if rows else None
+        except Exception as e:
+            app_logger.error(f"Error creating job: {e}")
+            return None
+
+    async def get_job(self, job_id: str, columns: str = "*") -> Optional[Dict[str, Any]]:
+        """Fetch a single job by ID"""
+        if not self.client:
+            app_logger.error("Supabase client not initialized - cannot fetch job")
+            return None
+
+        try:
+            rows = await self._select("jobs", [("select", columns), ("id", self._eq(job_id))])
+            return rows[0] if rows else None
+        except Exception as e:
+            app_logger.error(f"Error fetching job {job_id}: {e}")
+            return None
+
+    async def get_jobs(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        columns: str = "*"
+    ) -> List[Dict[str, Any]]:
+        """Fetch jobs (newest first) with optional filters and keyset pagination"""
+        if not self.client:
+            app_logger.error("Supabase client not initialized - cannot fetch jobs")
+            return []
+
+        try:
+            params = self._page_params("created_at", limit, cursor, columns)
+
+            if filters:
+                for key, value in filters.items():
+                    params.append((key, self._eq(value)))
+
+            return await self._select("jobs", params)
+        except Exception as e:
+            app_logger.error(f"Error fetching jobs: {e}")
+            return []
+
+    async def update_job(
+        self,
+        job_id: str,
+        update_data: Dict[str, Any],
+        status: Optional[str] = None,
+        locked_by: Optional[str] = None,
+        attempts: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Update a job, optionally only while it has the given status, lease
+        owner and/or attempt count (which pins the update to one claim)
+
+        Returns None when no row matched, i.e. the job moved on (or was
+        claimed by another worker) in the meantime. Raises on failure, so a
+        worker never mistakes a lost write for a lost lease.
+        """
+        if not self.client:
+            raise RuntimeError("Supabase client not initialized")
+
+        params: QueryParams = [("id", self._eq(job_id))]
+        if status:
+            params.append(("status", self._eq(status)))
+        if locked_by:
+            params.append(("locked_by", self._eq(locked_by)))
+        if attempts is not None:
+            params.append(("attempts", f"eq.{attempts}"))
+        rows = await self._update("jobs", update_data, params)
+        return rows[0] if rows else None
+
+    async def claim_jobs(
+        self,
+        worker_id: str,
+        job_types: Optional[List[str]] = None,
+        limit: int = 1,
+        lease_seconds: int = 60
+    ) -> List[Dict[str, Any]]:
+        """
+        Atomically lease queued (or abandoned) jobs to a worker via the claim_jobs function
+
+        Raises on failure, so a worker backs off instead of reading an error as an empty queue.
+        """
+        if not self.client:
+            raise RuntimeError("Supabase client not initialized")
+
+        return await self._rpc("claim_jobs", {
+            "worker_id": worker_id,
+            "job_types": job_types,
+            "batch_size": limit,
+            "lease_seconds": lease_seconds
+        })
+
+
 # Global instance
 supabase_client = SupabaseClient()
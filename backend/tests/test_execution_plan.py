@@ -0,0 +1,107 @@
+"""
+Tests for the supervisor's executable agent DAG
+"""
+from agents.execution_plan import ExecutionPlan, PlanNode, node_cache_key
+from app.services.llm_cache import llm_cache
+import asyncio
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(llm_cache, "enabled", True)
+    llm_cache.clear()
+    yield
+    llm_cache.clear()
+
+
+def task_from_inputs(parameters, inputs):
+    return {"topic": parameters["topic"], "inputs": sorted(inputs)}
+
+
+def diamond(timeout_seconds=None):
+    """a -> (b, c) -> d, plus an independent e"""
+    return ExecutionPlan("test", [
+        PlanNode("a", "research", task_from_inputs),
+        PlanNode("b", "flaky", task_from_inputs, depends_on=["a"], timeout_seconds=timeout_seconds),
+        PlanNode("c", "research", task_from_inputs, depends_on=["a"]),
+        PlanNode("d", "report", task_from_inputs, depends_on=["b", "c"]),
+        PlanNode("e", "research", task_from_inputs),
+    ])
+
+
+def make_runner(behaviour):
+    calls = []
+
+    async def runner(agent, task):
+        calls.append(agent)
+        outcome = behaviour.get(agent, "success")
+        if outcome == "raise":
+            raise RuntimeError("429 rate limited")
+        if outcome == "hang":
+            await asyncio.sleep(10)
+        return {"agent": agent, "content": f"{agent} output", "metadata": {}, "status": outcome}
+
+    return runner, calls
+
+
+def statuses(run):
+    return {entry["node"]: entry["status"] for entry in run["trace"]}
+
+
+def test_plan_validation_rejects_cycles_and_unknown_dependencies():
+    with pytest.raises(ValueError, match="cycle"):
+        ExecutionPlan("bad", [
+            PlanNode("a", "x", task_from_inputs, depends_on=["b"]),
+            PlanNode("b", "x", task_from_inputs, depends_on=["a"]),
+        ])
+    with pytest.raises(ValueError, match="unknown"):
+        ExecutionPlan("bad", [PlanNode("a", "x", task_from_inputs, depends_on=["missing"])])
+    assert diamond().stages() == [["a", "e"], ["b", "c"], ["d"]]
+
+
+def test_successful_run_passes_outputs_along_edges():
+    runner, calls = make_runner({})
+    run = asyncio.run(diamond().run({"topic": "ai"}, runner))
+
+    assert run["status"] == "completed"
+    assert set(statuses(run).values()) == {"completed"}
+    assert sorted(calls) == ["flaky", "report", "research", "research", "research"]
+
+
+@pytest.mark.parametrize("behaviour, status", [
+    ("raise", "failed"),
+    ("error", "failed"),
+    ("hang", "timeout"),
+])
+def test_failed_step_skips_dependents_and_is_not_cached(behaviour, status):
+    runner, calls = make_runner({"flaky": behaviour})
+    plan = diamond(timeout_seconds=0.05)
+    run = asyncio.run(plan.run({"topic": "ai"}, runner))
+
+    assert statuses(run) == {"a": "completed", "b": status, "c": "completed", "d": "skipped", "e": "completed"}
+    assert "b" not in run["results"] and "d" not in run["results"]
+    assert "report" not in calls
+    # d was the only output depending on b; e still completed, so the run is partial
+    assert run["status"] == "partial"
+
+    # The failed step's output was never cached: a re-run executes it again
+    task = task_from_inputs({"topic": "ai"}, {"a": run["results"]["a"]})
+    assert asyncio.run(llm_cache.get(node_cache_key("flaky", task))) is None
+    runner, calls = make_runner({})
+    rerun = asyncio.run(plan.run({"topic": "ai"}, runner))
+    assert statuses(rerun) == {"a": "cached", "b": "completed", "c": "cached", "d": "completed", "e": "cached"}
+    assert sorted(calls) == ["flaky", "report"]
+
+
+def test_on_node_reports_every_step_as_it_settles():
+    seen = []
+
+    async def on_node(entry):
+        seen.append((entry["node"], entry["status"]))
+
+    runner, _ = make_runner({"research": "raise"})
+    run = asyncio.run(diamond().run({"topic": "ai"}, runner, on_node=on_node))
+
+    assert run["status"] == "failed"
+    assert dict(seen) == {"a": "failed", "b": "skipped", "c": "skipped", "d": "skipped", "e": "failed"}
@@ -0,0 +1,155 @@
+"""
+Tests for the job worker's claim/lease protocol, against an in-memory jobs table
+"""
+from datetime import datetime, timedelta
+from app.services import jobs
+from database.supabase_client import supabase_client
+import asyncio
+import copy
+import pytest
+
+
+class FakeJobsTable:
+    """The subset of the jobs table behaviour the worker pool relies on"""
+
+    def __init__(self):
+        self.rows = {}
+
+    async def create_job(self, data):
+        row = {"attempts": 0, "cancel_requested": False, "error": None, "result": None,
+               "locked_by": None, "locked_until": None, **data}
+        self.rows[data["id"]] = row
+        return copy.deepcopy(row)
+
+    async def get_job(self, job_id, columns="*"):
+        return copy.deepcopy(self.rows.get(job_id))
+
+    async def update_job(self, job_id, data, status=None, locked_by=None, attempts=None):
+        row = self.rows.get(job_id)
+        if (not row or (status and row["status"] != status) or (locked_by and row["locked_by"] != locked_by)
+                or (attempts is not None and row["attempts"] != attempts)):
+            return None
+        row.update(copy.deepcopy(data))
+        return copy.deepcopy(row)
+
+    async def claim_jobs(self, worker_id, job_types=None, limit=1, lease_seconds=60):
+        now = datetime.utcnow().isoformat()
+        for row in self.rows.values():
+            claimable = row["status"] == "queued" and row["run_after"] <= now
+            expired = row["status"] == "running" and row["locked_until"] < now
+            if claimable or expired:
+                row.update(
+                    status="running",
+                    locked_by=worker_id,
+                    locked_until=(datetime.utcnow() + timedelta(seconds=lease_seconds)).isoformat(),
+                    attempts=row["attempts"] + 1
+                )
+                return [copy.deepcopy(row)]
+        return []
+
+    def expire_lease(self, job_id):
+        self.rows[job_id]["locked_until"] = (datetime.utcnow() - timedelta(seconds=1)).isoformat()
+
+
+@pytest.fixture
+def table(monkeypatch):
+    fake = FakeJobsTable()
+    for name in ("create_job", "get_job", "update_job", "claim_jobs"):
+        monkeypatch.setattr(supabase_client, name, getattr(fake, name))
+
+    async def broadcast(message_type, data):
+        pass
+
+    monkeypatch.setattr(jobs, "broadcast_update", broadcast)
+    return fake
+
+
+def make_pool():
+    pool = jobs.JobWorkerPool(workers=1, poll_interval_seconds=0.01, lease_seconds=10, max_attempts=3, retry_base_seconds=0)
+
+    @pool.handler("noop")
+    async def noop(payload, job):
+        return {"ok": True}
+
+    return pool
+
+
+async def claim(pool):
+    claimed = await supabase_client.claim_jobs(pool.worker_id, list(pool.handlers), lease_seconds=pool.lease_seconds)
+    return claimed[0]
+
+
+def test_stale_worker_cannot_overwrite_the_new_owner(table):
+    async def scenario():
+        stale, owner = make_pool(), make_pool()
+        queued = await owner.enqueue("noop", {})
+
+        stale_claim = await claim(stale)
+        table.expire_lease(queued["id"])
+        owner_claim = await claim(owner)
+        assert owner_claim["attempts"] == 2
+
+        # The stale worker's outcome, requeue and progress writes are all rejected
+        await stale._finish(stale_claim, "completed", result={"stale": True})
+        await stale._retry_or_fail(stale_claim, "boom", jobs.JobContext(stale_claim, stale.worker_id))
+        await jobs.JobContext(stale_claim, stale.worker_id).save_progress(step="stale")
+        row = table.rows[queued["id"]]
+        assert (row["status"], row["locked_by"], row["result"], row["progress"]) == ("running", owner.worker_id, None, {})
+        assert stale.counts["completed"] == stale.counts["retried"] == 0
+
+        await owner._finish(owner_claim, "completed", result={"owner": True})
+        assert table.rows[queued["id"]]["status"] == "completed"
+        assert table.rows[queued["id"]]["result"] == {"owner": True}
+
+    asyncio.run(scenario())
+
+
+def test_earlier_claim_by_the_same_worker_is_rejected(table):
+    async def scenario():
+        pool = make_pool()
+        queued = await pool.enqueue("noop", {})
+
+        first = await claim(pool)
+        table.expire_lease(queued["id"])
+        second = await claim(pool)
+        assert first["locked_by"] == second["locked_by"]
+
+        # Same worker id, but the attempt count pins the write to the claim it came from
+        await pool._finish(first, "failed", error="late")
+        assert table.rows[queued["id"]]["status"] == "running"
+        await pool._finish(second, "completed")
+        assert table.rows[queued["id"]]["status"] == "completed"
+
+    asyncio.run(scenario())
+
+
+def test_worker_abandons_a_job_whose_lease_was_taken(table):
+    async def scenario():
+        pool = make_pool()
+        pool.lease_seconds = 0.15  # renew every 50ms
+        cancelled = asyncio.Event()
+
+        @pool.handler("slow")
+        async def slow(payload, job):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return {"finished": True}
+
+        queued = await pool.enqueue("slow", {})
+        job = await claim(pool)
+        execution = asyncio.create_task(pool._execute(job))
+        await asyncio.sleep(0.02)
+
+        # Another worker takes the job over while the handler is still running
+        table.rows[queued["id"]].update(locked_by="other-worker", attempts=2)
+        await asyncio.wait_for(execution, timeout=2)
+
+        assert cancelled.is_set()
+        row = table.rows[queued["id"]]
+        assert (row["status"], row["locked_by"], row["result"]) == ("running", "other-worker", None)
+        assert pool.counts == {"completed": 0, "failed": 0, "cancelled": 0, "retried": 0}
+
+    asyncio.run(scenario())
@@ -0,0 +1,75 @@
+"""
+Tests for incremental JSON parsing and repair of truncated model output
+"""
+from app.services.json_stream import IncrementalJSONParser, parse_json, repair_json
+import json
+import pytest
+
+DOCUMENT = {
+    "answer": "Acme cut prices by 20% \"last\" quarter – see [1].\nMore below.",
+    "confidence": 0.75,
+    "suggested_actions": ["Watch pricing", "Review {launch} notes"],
+    "details": {"nested": [1, 2, {"deep": "x"}]},
+    "final": True
+}
+
+
+def feed_in_chunks(text, size):
+    parser = IncrementalJSONParser()
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    return parser, events
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10_000])
+def test_chunk_split_parsing_matches_json_loads(size):
+    text = json.dumps(DOCUMENT, indent=2)
+    parser, events = feed_in_chunks(text, size)
+
+    assert parser.done
+    assert parser.fields == DOCUMENT
+    fields = [(field, value) for kind, field, value in events if kind == "field"]
+    assert fields == list(DOCUMENT.items())
+    # String deltas add up to the decoded value, whatever the chunk boundaries
+    answer = "".join(value for kind, field, value in events if kind == "delta" and field == "answer")
+    assert answer == DOCUMENT["answer"]
+
+
+def test_deltas_never_split_escapes_or_surrogate_pairs():
+    text = json.dumps({"answer": "tab\there \\ emoji \U0001F600 done"})
+    _, events = feed_in_chunks(text, 1)
+
+    deltas = [value for kind, _, value in events if kind == "delta"]
+    assert "".join(deltas) == "tab\there \\ emoji \U0001F600 done"
+    assert all(not ("\ud800" <= delta[-1] <= "\udbff") for delta in deltas)
+
+
+def test_text_after_the_object_is_ignored():
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": 1} trailing {"b": 2}')
+    assert parser.done
+    assert parser.fields == {"a": 1}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"answer": "cut off mid-str', {"answer": "cut off mid-str"}),
+    ('{"answer": "ok", "items": [1, 2', {"answer": "ok", "items": [1, 2]}),
+    ('{"answer": "ok", "confidence":', {"answer": "ok", "confidence": None}),
+    ('{"answer": "ok", "confid', {"answer": "ok"}),
+    ('{"answer": "ok",', {"answer": "ok"}),
+    ('{"a": {"b": [1, {"c": "d', {"a": {"b": [1, {"c": "d"}]}}),
+    ('{"answer": "ends in escape \\', {"answer": "ends in escape "}),
+])
+def test_repair_closes_truncated_output(text, expected):
+    assert json.loads(repair_json(text)) == expected
+
+
+def test_repair_strips_fences_prose_and_trailing_commas():
+    text = 'Here you go:\n```json\n{"items": [1, 2,], "answer": "a, } b",}\n```\nThanks!'
+    assert parse_json(text) == {"items": [1, 2], "answer": "a, } b"}
+
+
+def test_parse_json_raises_when_unrepairable():
+    with pytest.raises(ValueError):
+        parse_json("no json here")
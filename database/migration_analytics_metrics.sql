@@ -0,0 +1,45 @@
+-- Migration adding the get_analytics_metrics() RPC used by /analytics/metrics
+-- Run this in your Supabase SQL Editor
+
+-- Dashboard analytics aggregates, computed in the database so the API only
+-- receives the aggregated row instead of every competitor/trend/finding
+CREATE OR REPLACE FUNCTION get_analytics_metrics(top_industry_limit INTEGER DEFAULT 5)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    WITH finding_stats AS (
+        SELECT
+            COUNT(*) FILTER (WHERE created_at > (NOW() AT TIME ZONE 'utc') - INTERVAL '7 days') AS this_week,
+            COUNT(*) FILTER (WHERE sentiment = 'positive') AS positive,
+            COUNT(*) FILTER (WHERE sentiment = 'neutral') AS neutral,
+            COUNT(*) FILTER (WHERE sentiment = 'negative') AS negative
+        FROM research_findings
+    ),
+    industry_counts AS (
+        SELECT COALESCE(industry, 'Unknown') AS name, COUNT(*) AS count
+        FROM competitors
+        GROUP BY 1
+        ORDER BY count DESC
+        LIMIT top_industry_limit
+    )
+    SELECT jsonb_build_object(
+        'total_competitors', (SELECT COUNT(*) FROM competitors),
+        'active_trends', (SELECT COUNT(*) FROM trends WHERE status IN ('emerging', 'growing')),
+        'findings_this_week', finding_stats.this_week,
+        'reports_generated', (SELECT COUNT(*) FROM reports),
+        'sentiment_breakdown', jsonb_build_object(
+            'positive', finding_stats.positive,
+            'neutral', finding_stats.neutral,
+            'negative', finding_stats.negative
+        ),
+        'top_industries', COALESCE(
+            (SELECT jsonb_agg(jsonb_build_object('name', name, 'count', count) ORDER BY count DESC) FROM industry_counts),
+            '[]'::jsonb
+        )
+    )
+    FROM finding_stats;
+$$;
+
+-- Verify the function
+SELECT get_analytics_metrics();
@@ -0,0 +1,7 @@
+-- Migration for batch competitor analysis
+-- Run this in your Supabase SQL Editor
+
+-- Batch analyses write each competitor's finding with an upsert keyed on a
+-- stable id, so a batch resumed after a restart replaces rather than
+-- duplicates findings; the upsert needs update access on research_findings
+CREATE POLICY "Enable update access for all users" ON research_findings FOR UPDATE USING (true);
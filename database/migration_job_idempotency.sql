@@ -0,0 +1,7 @@
+-- Migration for idempotent background jobs
+-- Run this in your Supabase SQL Editor
+
+-- Report generation and automated analysis jobs write their report with an
+-- upsert keyed on an id derived from the job, so a retried job replaces
+-- rather than duplicates it; the upsert needs update access on reports
+CREATE POLICY "Enable update access for all users" ON reports FOR UPDATE USING (true);
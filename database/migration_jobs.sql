@@ -0,0 +1,73 @@
+-- Migration adding the durable background job queue
+-- Run this in your Supabase SQL Editor
+
+-- Long-running agent work (report generation, automated competitor
+-- analysis, trend discovery, competitor batches) is queued here and run by
+-- the API's job workers or scripts/run_job_worker.py
+CREATE TABLE IF NOT EXISTS jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    job_type VARCHAR(100) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued', -- queued, running, completed, failed, cancelled
+    payload JSONB DEFAULT '{}',
+    progress JSONB DEFAULT '{}',
+    result JSONB,
+    error TEXT,
+    priority INTEGER DEFAULT 1, -- lower runs first
+    attempts INTEGER DEFAULT 0,
+    max_attempts INTEGER DEFAULT 3,
+    cancel_requested BOOLEAN DEFAULT FALSE,
+    locked_by VARCHAR(255),
+    locked_until TIMESTAMP,
+    run_after TIMESTAMP DEFAULT NOW(),
+    created_at TIMESTAMP DEFAULT NOW(),
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_claimable ON jobs(priority, run_after) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs(locked_until) WHERE status = 'running';
+CREATE INDEX IF NOT EXISTS idx_jobs_created_id ON jobs(created_at DESC, id DESC);
+
+DROP TRIGGER IF EXISTS update_jobs_updated_at ON jobs;
+CREATE TRIGGER update_jobs_updated_at BEFORE UPDATE ON jobs
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Lease up to batch_size jobs to a worker. Queued jobs that are due are
+-- taken in priority order, along with running jobs whose lease has expired
+-- (their worker died). SKIP LOCKED lets concurrent workers claim without
+-- blocking on or double-claiming the same rows.
+CREATE OR REPLACE FUNCTION claim_jobs(
+    worker_id TEXT,
+    job_types TEXT[] DEFAULT NULL,
+    batch_size INTEGER DEFAULT 1,
+    lease_seconds INTEGER DEFAULT 60
+)
+RETURNS SETOF jobs
+LANGUAGE sql
+AS $$
+    UPDATE jobs
+    SET status = 'running',
+        locked_by = worker_id,
+        locked_until = (NOW() AT TIME ZONE 'utc') + make_interval(secs => lease_seconds),
+        attempts = attempts + 1,
+        started_at = COALESCE(started_at, NOW() AT TIME ZONE 'utc')
+    WHERE id IN (
+        SELECT id FROM jobs
+        WHERE (
+            (status = 'queued' AND run_after <= NOW() AT TIME ZONE 'utc')
+            OR (status = 'running' AND locked_until < NOW() AT TIME ZONE 'utc')
+        )
+        AND (job_types IS NULL OR job_type = ANY(job_types))
+        ORDER BY priority, run_after
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *;
+$$;
+
+ALTER TABLE jobs ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Enable read access for all users" ON jobs FOR SELECT USING (true);
+CREATE POLICY "Enable insert access for all users" ON jobs FOR INSERT WITH CHECK (true);
+CREATE POLICY "Enable update access for all users" ON jobs FOR UPDATE USING (true);
@@ -0,0 +1,25 @@
+-- Migration adding updated_at to research findings and reports
+-- Run this in your Supabase SQL Editor
+
+-- Findings and reports are rewritten in place by upserts (batch and
+-- automated analysis, report generation), so the vector store sync tracks
+-- them by updated_at like competitors and trends. Existing rows start at
+-- their created_at, which keeps current sync marks valid; the backfill runs
+-- before the triggers exist so it does not stamp every row with NOW()
+ALTER TABLE research_findings ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT NOW();
+ALTER TABLE reports ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT NOW();
+UPDATE research_findings SET updated_at = created_at WHERE created_at IS NOT NULL;
+UPDATE reports SET updated_at = created_at WHERE created_at IS NOT NULL;
+
+DROP TRIGGER IF EXISTS update_research_findings_updated_at ON research_findings;
+CREATE TRIGGER update_research_findings_updated_at BEFORE UPDATE ON research_findings
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_reports_updated_at ON reports;
+CREATE TRIGGER update_reports_updated_at BEFORE UPDATE ON reports
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE INDEX IF NOT EXISTS idx_findings_updated_id ON research_findings(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_reports_updated_id ON reports(updated_at, id);
+DROP INDEX IF EXISTS idx_findings_created_id;
+DROP INDEX IF EXISTS idx_reports_created_id;
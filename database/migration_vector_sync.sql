@@ -0,0 +1,9 @@
+-- Migration adding the indexes used by the incremental vector store sync
+-- Run this in your Supabase SQL Editor
+
+-- The sync worker pages through rows past a (timestamp, id) high-water mark
+-- in ascending order; these keep each page an index range scan
+CREATE INDEX IF NOT EXISTS idx_competitors_updated_id ON competitors(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_trends_updated_id ON trends(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_findings_created_id ON research_findings(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_reports_created_id ON reports(created_at, id);
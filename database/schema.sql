@@ -47,7 +47,8 @@ CREATE TABLE IF NOT EXISTS research_findings (
     sentiment VARCHAR(50) DEFAULT 'neutral',
     importance_score DECIMAL(3, 2) NOT NULL,
     metadata JSONB DEFAULT '{}',
-    created_at TIMESTAMP DEFAULT NOW()
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
 );
 
 -- Reports Table
@@ -60,7 +61,8 @@ CREATE TABLE IF NOT EXISTS reports (
     competitor_ids UUID[],
     trend_ids UUID[],
     generated_by VARCHAR(100) DEFAULT 'ai_agent',
-    created_at TIMESTAMP DEFAULT NOW()
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
 );
 
 -- Conversations Table (for chat)
@@ -117,6 +119,28 @@ CREATE TABLE IF NOT EXISTS products (
     updated_at TIMESTAMP DEFAULT NOW()
 );
 
+-- Background Jobs Table (durable queue for long-running agent work)
+CREATE TABLE IF NOT EXISTS jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    job_type VARCHAR(100) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued', -- queued, running, completed, failed, cancelled
+    payload JSONB DEFAULT '{}',
+    progress JSONB DEFAULT '{}',
+    result JSONB,
+    error TEXT,
+    priority INTEGER DEFAULT 1, -- lower runs first
+    attempts INTEGER DEFAULT 0,
+    max_attempts INTEGER DEFAULT 3,
+    cancel_requested BOOLEAN DEFAULT FALSE,
+    locked_by VARCHAR(255),
+    locked_until TIMESTAMP,
+    run_after TIMESTAMP DEFAULT NOW(),
+    created_at TIMESTAMP DEFAULT NOW(),
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
 -- Create indexes for better query performance
 CREATE INDEX idx_competitors_industry ON competitors(industry);
 CREATE INDEX idx_competitors_status ON competitors(status);
@@ -129,6 +153,23 @@ CREATE INDEX idx_conversations_user ON conversations(user_id);
 CREATE INDEX idx_social_mentions_competitor ON social_mentions(competitor_id);
 CREATE INDEX idx_products_competitor ON products(competitor_id);
 
+-- Composite indexes backing keyset (cursor) pagination on list endpoints
+CREATE INDEX idx_competitors_created_id ON competitors(created_at DESC, id DESC);
+CREATE INDEX idx_trends_created_id ON trends(created_at DESC, id DESC);
+CREATE INDEX idx_findings_competitor_created_id ON research_findings(competitor_id, created_at DESC, id DESC);
+CREATE INDEX idx_conversations_user_updated_id ON conversations(user_id, updated_at DESC, id DESC);
+
+-- Composite indexes backing the vector store sync's (updated_at, id) high-water marks
+CREATE INDEX idx_competitors_updated_id ON competitors(updated_at, id);
+CREATE INDEX idx_trends_updated_id ON trends(updated_at, id);
+CREATE INDEX idx_findings_updated_id ON research_findings(updated_at, id);
+CREATE INDEX idx_reports_updated_id ON reports(updated_at, id);
+
+-- Job queue: claimable jobs in pickup order, expired leases, and the job list
+CREATE INDEX idx_jobs_claimable ON jobs(priority, run_after) WHERE status = 'queued';
+CREATE INDEX idx_jobs_lease ON jobs(locked_until) WHERE status = 'running';
+CREATE INDEX idx_jobs_created_id ON jobs(created_at DESC, id DESC);
+
 -- Create function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -145,12 +186,94 @@ CREATE TRIGGER update_competitors_updated_at BEFORE UPDATE ON competitors
 CREATE TRIGGER update_trends_updated_at BEFORE UPDATE ON trends
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+CREATE TRIGGER update_research_findings_updated_at BEFORE UPDATE ON research_findings
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_reports_updated_at BEFORE UPDATE ON reports
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
 CREATE TRIGGER update_conversations_updated_at BEFORE UPDATE ON conversations
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
 CREATE TRIGGER update_products_updated_at BEFORE UPDATE ON products
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+CREATE TRIGGER update_jobs_updated_at BEFORE UPDATE ON jobs
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Lease up to batch_size jobs to a worker. Queued jobs that are due are
+-- taken in priority order, along with running jobs whose lease has expired
+-- (their worker died). SKIP LOCKED lets concurrent workers claim without
+-- blocking on or double-claiming the same rows.
+CREATE OR REPLACE FUNCTION claim_jobs(
+    worker_id TEXT,
+    job_types TEXT[] DEFAULT NULL,
+    batch_size INTEGER DEFAULT 1,
+    lease_seconds INTEGER DEFAULT 60
+)
+RETURNS SETOF jobs
+LANGUAGE sql
+AS $$
+    UPDATE jobs
+    SET status = 'running',
+        locked_by = worker_id,
+        locked_until = (NOW() AT TIME ZONE 'utc') + make_interval(secs => lease_seconds),
+        attempts = attempts + 1,
+        started_at = COALESCE(started_at, NOW() AT TIME ZONE 'utc')
+    WHERE id IN (
+        SELECT id FROM jobs
+        WHERE (
+            (status = 'queued' AND run_after <= NOW() AT TIME ZONE 'utc')
+            OR (status = 'running' AND locked_until < NOW() AT TIME ZONE 'utc')
+        )
+        AND (job_types IS NULL OR job_type = ANY(job_types))
+        ORDER BY priority, run_after
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *;
+$$;
+
+-- Dashboard analytics aggregates, computed in the database so the API only
+-- receives the aggregated row instead of every competitor/trend/finding
+CREATE OR REPLACE FUNCTION get_analytics_metrics(top_industry_limit INTEGER DEFAULT 5)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    WITH finding_stats AS (
+        SELECT
+            COUNT(*) FILTER (WHERE created_at > (NOW() AT TIME ZONE 'utc') - INTERVAL '7 days') AS this_week,
+            COUNT(*) FILTER (WHERE sentiment = 'positive') AS positive,
+            COUNT(*) FILTER (WHERE sentiment = 'neutral') AS neutral,
+            COUNT(*) FILTER (WHERE sentiment = 'negative') AS negative
+        FROM research_findings
+    ),
+    industry_counts AS (
+        SELECT COALESCE(industry, 'Unknown') AS name, COUNT(*) AS count
+        FROM competitors
+        GROUP BY 1
+        ORDER BY count DESC
+        LIMIT top_industry_limit
+    )
+    SELECT jsonb_build_object(
+        'total_competitors', (SELECT COUNT(*) FROM competitors),
+        'active_trends', (SELECT COUNT(*) FROM trends WHERE status IN ('emerging', 'growing')),
+        'findings_this_week', finding_stats.this_week,
+        'reports_generated', (SELECT COUNT(*) FROM reports),
+        'sentiment_breakdown', jsonb_build_object(
+            'positive', finding_stats.positive,
+            'neutral', finding_stats.neutral,
+            'negative', finding_stats.negative
+        ),
+        'top_industries', COALESCE(
+            (SELECT jsonb_agg(jsonb_build_object('name', name, 'count', count) ORDER BY count DESC) FROM industry_counts),
+            '[]'::jsonb
+        )
+    )
+    FROM finding_stats;
+$$;
+
 -- Enable Row Level Security (RLS)
 ALTER TABLE competitors ENABLE ROW LEVEL SECURITY;
 ALTER TABLE trends ENABLE ROW LEVEL SECURITY;
@@ -160,6 +283,7 @@ ALTER TABLE conversations ENABLE ROW LEVEL SECURITY;
 ALTER TABLE integration_settings ENABLE ROW LEVEL SECURITY;
 ALTER TABLE social_mentions ENABLE ROW LEVEL SECURITY;
 ALTER TABLE products ENABLE ROW LEVEL SECURITY;
+ALTER TABLE jobs ENABLE ROW LEVEL SECURITY;
 
 -- Create policies (for now, allow all authenticated users)
 -- In production, you'd want more granular policies
@@ -173,9 +297,11 @@ CREATE POLICY "Enable insert access for all users" ON trends FOR INSERT WITH CHE
 
 CREATE POLICY "Enable read access for all users" ON research_findings FOR SELECT USING (true);
 CREATE POLICY "Enable insert access for all users" ON research_findings FOR INSERT WITH CHECK (true);
+CREATE POLICY "Enable update access for all users" ON research_findings FOR UPDATE USING (true);
 
 CREATE POLICY "Enable read access for all users" ON reports FOR SELECT USING (true);
 CREATE POLICY "Enable insert access for all users" ON reports FOR INSERT WITH CHECK (true);
+CREATE POLICY "Enable update access for all users" ON reports FOR UPDATE USING (true);
 
 CREATE POLICY "Enable read access for all users" ON conversations FOR SELECT USING (true);
 CREATE POLICY "Enable insert access for all users" ON conversations FOR INSERT WITH CHECK (true);
@@ -187,3 +313,7 @@ CREATE POLICY "Enable insert access for all users" ON social_mentions FOR INSERT
 CREATE POLICY "Enable read access for all users" ON products FOR SELECT USING (true);
 CREATE POLICY "Enable insert access for all users" ON products FOR INSERT WITH CHECK (true);
 CREATE POLICY "Enable update access for all users" ON products FOR UPDATE USING (true);
+
+CREATE POLICY "Enable read access for all users" ON jobs FOR SELECT USING (true);
+CREATE POLICY "Enable insert access for all users" ON jobs FOR INSERT WITH CHECK (true);
+CREATE POLICY "Enable update access for all users" ON jobs FOR UPDATE USING (true);
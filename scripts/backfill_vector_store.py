@@ -0,0 +1,90 @@
+"""
+Backfill the vector store from Supabase
+
+Streams every row of the selected tables out of Supabase in keyset-paginated
+pages and writes each page to its Chroma collection with one batched
+embedding pass and a single upsert. The next page is fetched while the
+current one is being embedded. Re-running is safe: existing ids are
+replaced. --rebuild drops and recreates each collection first, which is
+needed for changed HNSW settings (VECTOR_HNSW_*) to take effect.
+
+Usage:
+    python scripts/backfill_vector_store.py --collections findings --page-size 500
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+
+COLLECTIONS = ["competitors", "trends", "findings", "reports"]
+
+
+async def backfill_collection(collection, fetch_page, vector_store, page_size, batch_size) -> int:
+    """Copy every row returned by `fetch_page` into `collection`; return rows written"""
+    from database.supabase_client import next_cursor
+
+    started = time.perf_counter()
+    written = 0
+    pending = asyncio.create_task(fetch_page(limit=page_size, cursor=None))
+
+    while pending:
+        rows = await pending
+        if not rows:
+            break
+
+        # Prefetch the next page while this one is embedded
+        cursor = next_cursor(rows, page_size)
+        pending = asyncio.create_task(fetch_page(limit=page_size, cursor=cursor)) if cursor else None
+
+        count = await vector_store.add_many(collection, rows, batch_size)
+        if count < len(rows):
+            print(f"{collection}: {len(rows) - count} of {len(rows)} rows in this page were not written")
+
+        written += count
+        elapsed = time.perf_counter() - started
+        print(f"{collection}: {written} rows in {elapsed:.1f}s ({written / elapsed:.0f} rows/s)")
+
+    return written
+
+
+async def main(args):
+    sys.path.insert(0, BACKEND_DIR)
+
+    from app.core.config import settings
+    from database.supabase_client import supabase_client
+    from app.services.vector_store import vector_store
+
+    page_size = args.page_size or settings.VECTOR_BACKFILL_PAGE_SIZE
+
+    fetchers = {
+        "competitors": supabase_client.get_competitors,
+        "trends": supabase_client.get_trends,
+        "findings": supabase_client.get_findings,
+        "reports": supabase_client.get_reports,
+    }
+
+    totals = {}
+    for collection in args.collections:
+        if args.rebuild:
+            await vector_store.reset_collection(collection)
+        totals[collection] = await backfill_collection(
+            collection, fetchers[collection], vector_store, page_size, args.batch_size
+        )
+
+    await supabase_client.close()
+    vector_store.close()
+
+    for collection, count in totals.items():
+        print(f"{collection:>12}: {count} rows indexed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collections", nargs="+", choices=COLLECTIONS, default=COLLECTIONS, help="Collections to backfill")
+    parser.add_argument("--page-size", type=int, default=None, help="Rows fetched and upserted per page (default VECTOR_BACKFILL_PAGE_SIZE)")
+    parser.add_argument("--rebuild", action="store_true", help="Drop and recreate collections with the configured HNSW settings first")
+    parser.add_argument("--batch-size", type=int, default=None, help="Encoder batch size (default VECTOR_EMBED_BATCH_SIZE)")
+    asyncio.run(main(parser.parse_args()))
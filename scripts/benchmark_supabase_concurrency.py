@@ -0,0 +1,127 @@
+"""
+Load benchmark for the async Supabase data layer
+
+Starts a local PostgREST stand-in that answers every request after a fixed
+delay, points SupabaseClient at it, and measures how throughput scales as
+more requests are issued concurrently. With a non-blocking client the
+wall time for a batch should stay close to a single round-trip until the
+connection pool is saturated.
+
+Usage:
+    python scripts/benchmark_supabase_concurrency.py --latency-ms 50 --requests 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+
+SAMPLE_ROWS = [
+    {
+        "id": f"00000000-0000-0000-0000-{i:012d}",
+        "name": f"Competitor {i}",
+        "industry": "Marketing Technology",
+        "status": "active",
+        "monitoring_score": 0.5
+    }
+    for i in range(20)
+]
+
+
+def make_handler(latency_seconds: float):
+    """Build a request handler that mimics PostgREST with fixed latency"""
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Buffer writes so headers and body leave in one segment
+        wbufsize = -1
+
+        def _reply(self, payload):
+            time.sleep(latency_seconds)
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            self.wfile.flush()
+
+        def do_GET(self):
+            self._reply(SAMPLE_ROWS)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            self._reply([json.loads(self.rfile.read(length) or b"{}")])
+
+        def log_message(self, format, *args):
+            pass
+
+    return StandInHandler
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def start_stand_in(latency_seconds: float) -> ThreadingHTTPServer:
+    """Start the PostgREST stand-in on a free local port"""
+    server = StandInServer(("127.0.0.1", 0), make_handler(latency_seconds))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run_batch(client, total: int, concurrency: int) -> float:
+    """Issue `total` reads with at most `concurrency` in flight; return wall time"""
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with gate:
+            rows = await client.get_competitors()
+            assert rows, "stand-in returned no rows"
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return time.perf_counter() - start
+
+
+async def main(args):
+    server = start_stand_in(args.latency_ms / 1000)
+    host, port = server.server_address
+
+    # Configure the backend before its settings module is imported
+    os.environ["SUPABASE_URL"] = f"http://{host}:{port}"
+    os.environ["SUPABASE_KEY"] = "benchmark-key"
+    os.environ["SUPABASE_MAX_CONNECTIONS"] = str(max(args.levels))
+    os.environ["SUPABASE_MAX_KEEPALIVE_CONNECTIONS"] = str(max(args.levels))
+    sys.path.insert(0, BACKEND_DIR)
+
+    from database.supabase_client import SupabaseClient
+
+    client = SupabaseClient()
+    await client.get_competitors()  # warm up the pool
+
+    print(f"PostgREST stand-in at {host}:{port}, latency {args.latency_ms} ms, {args.requests} requests per level")
+    print(f"{'concurrency':>12} {'wall (s)':>10} {'req/s':>10} {'speedup':>8}")
+
+    baseline = None
+    for level in args.levels:
+        elapsed = await run_batch(client, args.requests, level)
+        baseline = baseline or elapsed
+        print(f"{level:>12} {elapsed:>10.3f} {args.requests / elapsed:>10.1f} {baseline / elapsed:>7.1f}x")
+
+    await client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=50, help="Simulated PostgREST latency per request")
+    parser.add_argument("--requests", type=int, default=64, help="Requests issued per concurrency level")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 64], help="Concurrency levels to measure")
+    asyncio.run(main(parser.parse_args()))
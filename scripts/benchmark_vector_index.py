@@ -0,0 +1,152 @@
+"""
+Recall/latency/memory benchmark for vector index settings
+
+Builds a synthetic clustered corpus of unit vectors (MiniLM-sized by
+default) and compares, against exact brute-force search:
+
+  * HNSW at several M / ef_search settings, using the hnswlib build that
+    chromadb ships (chroma-hnswlib); the same parameters are exposed as
+    VECTOR_HNSW_M / VECTOR_HNSW_EF_CONSTRUCTION / VECTOR_HNSW_EF_SEARCH
+  * int8 scalar-quantized flat search, with and without re-ranking the
+    shortlist on full-precision vectors
+
+Memory is the estimated resident size of the vectors plus index links.
+
+Usage:
+    python scripts/benchmark_vector_index.py --corpus 200000 --queries 200 --k 10
+"""
+import argparse
+import time
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:  # shipped with chromadb as chroma-hnswlib
+    hnswlib = None
+
+
+def synthetic_corpus(size: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    """Unit vectors drawn around random cluster centres, like topical documents"""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, size)] + 0.6 * rng.standard_normal((size, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int):
+    """Brute-force ground truth and per-query latencies"""
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        scores = corpus @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        results.append(set(top[np.argsort(-scores[top])].tolist()))
+        latencies.append(time.perf_counter() - start)
+    return results, latencies
+
+
+class Int8Quantizer:
+    """Symmetric per-dimension int8 quantization"""
+
+    def __init__(self, vectors: np.ndarray):
+        peak = np.abs(vectors).max(axis=0)
+        self.scale = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.clip(np.rint(vectors / self.scale), -127, 127).astype(np.int8)
+
+
+def int8_search(codes, scale, full, query, k, rerank, block_rows=65536):
+    """Scan int8 codes, optionally re-rank the top `rerank` on full-precision vectors"""
+    weighted = query * scale  # fold the scales into the query instead of decoding codes
+    scores = np.empty(len(codes), dtype=np.float32)
+    for start in range(0, len(codes), block_rows):
+        block = codes[start:start + block_rows]
+        scores[start:start + len(block)] = block.astype(np.float32) @ weighted
+
+    shortlist = max(k, rerank)
+    candidates = np.argpartition(-scores, shortlist - 1)[:shortlist]
+    candidate_scores = full[candidates] @ query if rerank > k else scores[candidates]
+    return set(candidates[np.argsort(-candidate_scores)[:k]].tolist())
+
+
+def recall(found, truth) -> float:
+    return float(np.mean([len(f & t) / len(t) for f, t in zip(found, truth)]))
+
+
+def report(name, found, truth, latencies, memory_bytes, baseline_bytes):
+    p50 = np.percentile(latencies, 50) * 1000
+    p95 = np.percentile(latencies, 95) * 1000
+    print(
+        f"{name:<34} {recall(found, truth):>7.3f} {p50:>9.2f} {p95:>9.2f} "
+        f"{memory_bytes / 2**20:>9.1f} {baseline_bytes / memory_bytes:>6.1f}x"
+    )
+
+
+def main(args):
+    corpus = synthetic_corpus(args.corpus, args.dim, args.clusters, args.seed)
+
+    # Queries are perturbed corpus points, so each has a dense true neighbourhood
+    rng = np.random.default_rng(args.seed + 1)
+    queries = corpus[rng.integers(0, len(corpus), args.queries)]
+    queries = queries + 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    float_bytes = corpus.nbytes
+    print(f"corpus {args.corpus} x {args.dim}, {args.queries} queries, recall@{args.k} against exact search")
+    print(f"{'index':<34} {'recall':>7} {'p50 ms':>9} {'p95 ms':>9} {'MiB':>9} {'mem':>7}")
+
+    truth, latencies = exact_top_k(corpus, queries, args.k)
+    report("exact float32", truth, truth, latencies, float_bytes, float_bytes)
+
+    if hnswlib is None:
+        print("hnswlib not installed (pip install chroma-hnswlib); skipping HNSW")
+    else:
+        for m in args.m:
+            index = hnswlib.Index(space="ip", dim=args.dim)
+            index.init_index(max_elements=args.corpus, ef_construction=args.ef_construction, M=m)
+            start = time.perf_counter()
+            index.add_items(corpus, np.arange(args.corpus))
+            build_seconds = time.perf_counter() - start
+            # Level-0 links (2M per node) dominate the graph's size
+            memory = float_bytes + args.corpus * (2 * m * 4 + 4 + 8)
+
+            for ef in args.ef_search:
+                index.set_ef(max(ef, args.k))
+                found, latencies = [], []
+                for query in queries:
+                    start = time.perf_counter()
+                    labels, _ = index.knn_query(query, k=args.k)
+                    latencies.append(time.perf_counter() - start)
+                    found.append(set(labels[0].tolist()))
+                report(f"hnsw M={m} ef={ef} (build {build_seconds:.0f}s)", found, truth, latencies, memory, float_bytes)
+
+    quantizer = Int8Quantizer(corpus)
+    codes = quantizer.encode(corpus)
+    int8_bytes = codes.nbytes + quantizer.scale.nbytes
+
+    for rerank in args.rerank:
+        found, latencies = [], []
+        for query in queries:
+            start = time.perf_counter()
+            found.append(int8_search(codes, quantizer.scale, corpus, query, args.k, rerank))
+            latencies.append(time.perf_counter() - start)
+        # Full-precision vectors for re-ranking are read from disk (memory-mapped), not held in RAM
+        label = f"int8 flat, rerank {rerank}" if rerank > args.k else "int8 flat, no rerank"
+        report(label, found, truth, latencies, int8_bytes, float_bytes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=int, default=100000, help="Number of corpus vectors")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--dim", type=int, default=384, help="Vector dimension (all-MiniLM-L6-v2 is 384)")
+    parser.add_argument("--clusters", type=int, default=200, help="Topic clusters in the synthetic corpus")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query")
+    parser.add_argument("--m", type=int, nargs="+", default=[8, 16, 32], help="HNSW M values")
+    parser.add_argument("--ef-construction", type=int, default=100, help="HNSW ef_construction")
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[10, 50, 100], help="HNSW ef_search values")
+    parser.add_argument("--rerank", type=int, nargs="+", default=[0, 50, 200], help="int8 shortlist sizes re-ranked at full precision (0 = none)")
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
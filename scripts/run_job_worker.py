@@ -0,0 +1,55 @@
+"""
+Run background job workers outside the API process
+
+Claims jobs from the Supabase jobs table (see database/migration_jobs.sql)
+and runs them until interrupted. Start any number of these alongside, or
+instead of, the API's in-process workers; set JOB_WORKER_ENABLED=False on
+the API to leave all job execution to them. Jobs in flight when the worker
+is stopped are returned to the queue and resumed by the next worker.
+
+Progress and job_update messages are broadcast to WebSocket clients of the
+process that runs the job, so clients of the API should poll
+GET /api/v1/jobs/{job_id} when workers run separately.
+
+Usage:
+    python scripts/run_job_worker.py --workers 8
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+
+
+async def main(args):
+    sys.path.insert(0, BACKEND_DIR)
+
+    # Importing the endpoint modules registers their job handlers
+    from app.api.endpoints import competitors, reports, trends, workflows  # noqa: F401
+    from app.services.jobs import job_workers
+    from app.services.llm_clients import llm_clients
+    from database.supabase_client import supabase_client
+
+    if not supabase_client.client:
+        print("Supabase is not configured (SUPABASE_URL/SUPABASE_KEY); nothing to do")
+        return
+
+    job_workers.start(args.workers)
+    print(f"Job worker {job_workers.worker_id} running: {', '.join(sorted(job_workers.handlers))}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await job_workers.stop()
+        await supabase_client.close()
+        await llm_clients.close()
+        print(f"Stopped: {job_workers.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent jobs (default JOB_WORKERS)")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
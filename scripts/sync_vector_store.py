@@ -0,0 +1,61 @@
+"""
+Incrementally sync Supabase changes into the vector store
+
+Runs the same worker the API starts when VECTOR_SYNC_ENABLED is set: rows
+created or updated since each table's high-water mark are upserted in
+batches, rows deleted upstream are removed, and rows the incremental pass
+missed are indexed on reconcile. Run it here instead of in
+the API (set VECTOR_SYNC_ENABLED=False there) when several API workers
+share one vector store.
+
+Usage:
+    python scripts/sync_vector_store.py --once --reconcile
+    python scripts/sync_vector_store.py --interval 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+
+
+async def main(args):
+    sys.path.insert(0, BACKEND_DIR)
+
+    from database.supabase_client import supabase_client
+    from app.services.vector_store import vector_store
+    from app.services.vector_sync import vector_sync
+
+    if args.interval:
+        vector_sync.interval_seconds = args.interval
+    if args.reset:
+        vector_sync.reset()
+
+    try:
+        if args.once:
+            written = await vector_sync.run_once(reconcile=args.reconcile)
+            stats = vector_sync.stats()["tables"]
+            for table, count in written.items():
+                table_stats = stats[table]
+                print(
+                    f"{table:>18}: {count} rows synced ({table_stats['rows_per_second']} rows/s), "
+                    f"{table_stats['rows_deleted']} deleted, {table_stats['rows_repaired']} repaired, {table_stats['errors']} errors"
+                )
+        else:
+            await vector_sync.run()
+    finally:
+        await supabase_client.close()
+        vector_store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="Run a single sync cycle and exit")
+    parser.add_argument("--reconcile", action="store_true", help="With --once, also reconcile ids (remove rows deleted upstream, index missed ones)")
+    parser.add_argument("--interval", type=int, default=None, help="Seconds between cycles (default VECTOR_SYNC_INTERVAL_SECONDS)")
+    parser.add_argument("--reset", action="store_true", help="Forget high-water marks and re-sync every row")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass